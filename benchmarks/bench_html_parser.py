@@ -0,0 +1,83 @@
+"""
+Микробенчмарк разбора HTML в discovery: CPU на страницу для каждого бэкенда core.html_parser
+в сравнении с полным деревом BeautifulSoup(html, 'html.parser').
+
+  python benchmarks/bench_html_parser.py --links 500 --forms 20 --filler 5000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bs4 import BeautifulSoup
+from core.html_parser import BACKENDS, etree, parse_html
+
+
+def make_page(links: int, forms: int, filler: int) -> str:
+    """Тяжелая страница: много разметки, которая discovery не нужна"""
+    parts = ["<html><head><title>Heavy</title><script>var x = '<a href=\"/no\">';</script></head><body>"]
+    for i in range(filler):
+        parts.append(f'<div class="row r{i}"><span>item {i}</span><p>Lorem &amp; ipsum <b>{i}</b></p></div>')
+        if i % max(1, filler // max(1, links)) == 0:
+            parts.append(f'<a href="/page/{i}?a=1&amp;b=2">link {i}</a>')
+        if forms and i % max(1, filler // forms) == 0:
+            parts.append(f'<form action="/f/{i}" method="post"><input type="text" name="q{i}" value="v">'
+                         f'<textarea name="t"></textarea><select name="s"><option>1</option></select>'
+                         f'<input type="submit"></form>')
+    parts.append("</body></html>")
+    return "".join(parts)
+
+
+def full_tree(html: str):
+    """Исходный подход discovery-плагинов: полное дерево и find_all"""
+    soup = BeautifulSoup(html, 'html.parser')
+    links = [a['href'] for a in soup.find_all('a', href=True)]
+    forms = [[f.get('name') for f in form.find_all(['input', 'textarea', 'select'])] for form in soup.find_all('form')]
+    return links, forms
+
+
+def measure(fn, html: str, repeat: int) -> float:
+    """CPU-время на одну страницу, мс (лучшее из повторов)"""
+    best = None
+    for _ in range(repeat):
+        started = time.process_time()
+        fn(html)
+        elapsed = time.process_time() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return round(best * 1000, 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк HTML-парсеров discovery")
+    parser.add_argument("--links", type=int, default=500)
+    parser.add_argument("--forms", type=int, default=20)
+    parser.add_argument("--filler", type=int, default=5000, help="Число блоков разметки без ссылок")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    html = make_page(args.links, args.forms, args.filler)
+    expected_links, expected_forms = full_tree(html)
+
+    report = {"page_kb": len(html) // 1024, "cpu_ms_per_page": {"bs4-full-tree": measure(full_tree, html, args.repeat)}}
+    for name in BACKENDS:
+        if name == 'lxml' and etree is None:
+            continue
+        page = parse_html(html, name)
+        # Целевой разбор должен находить те же ссылки и поля форм
+        same = (page.links == expected_links and
+                [[f.name for f in form.fields] for form in page.forms] == expected_forms)
+        report["cpu_ms_per_page"][name] = measure(lambda h: parse_html(h, name), html, args.repeat)
+        report.setdefault("matches_full_tree", {})[name] = same
+
+    base = report["cpu_ms_per_page"]["bs4-full-tree"]
+    report["speedup"] = {name: round(base / ms, 1) for name, ms in report["cpu_ms_per_page"].items() if ms}
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""
+Поиск сигнатур ошибок (core/signatures.py) в телах ответов разного размера.
+
+Сравниваются:
+  legacy   — прежние списки подстрок плагинов SQLi (три прохода any(s in text));
+  combined — все сигнатуры одним выражением с именованными группами;
+  matcher  — SignatureMatcher: один проход по триггерам и проверка окон вокруг них.
+
+  python benchmarks/bench_signatures.py
+  python benchmarks/bench_signatures.py --sizes 50,2500 --repeat 20
+
+Для каждого способа печатаются время на ответ и число найденных сигнатур
+на страницах с внедренными сообщениями об ошибках — JSON в stdout.
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_similarity import Page
+from core.signatures import SIGNATURES, SignatureMatcher
+
+LEGACY_LISTS = (
+    ["syntax error", "mysql_fetch", "ORA-", "PostgreSQL"],
+    ["SQL syntax", "mysql_fetch", "ORA-", "SQL_SYNTAX_ERROR", "sqlite3.OperationalError", "near '"],
+    ["SQL_SYNTAX_ERROR", "syntax error", "near '", "mysql_fetch", "SQL syntax"],
+)
+
+ERRORS = (
+    "You have an error in your SQL syntax; check the manual that corresponds to your MySQL server version",
+    "<b>Warning</b>: mysql_fetch_array() expects parameter 1 to be resource in /var/www/a.php on line <b>7</b>",
+    "ERROR:  syntax error at or near \"'\" at character 31",
+    "Unclosed quotation mark after the character string ''.",
+    "ORA-01756: quoted string not properly terminated",
+    "sqlite3.OperationalError: unrecognized token: \"'\"",
+    "Traceback (most recent call last):\n  File \"app.py\", line 3",
+    "java.lang.NullPointerException\n\tat com.shop.Item.load(Item.java:42)",
+)
+
+
+def legacy(text: str):
+    return [s for names in LEGACY_LISTS for s in names if s in text]
+
+
+class CombinedRegex:
+    """Все сигнатуры в одном выражении: в каждой позиции re пробует все ветви"""
+    def __init__(self):
+        self.regex = re.compile("|".join(f"(?P<s{i}>{s.pattern})" for i, s in enumerate(SIGNATURES)))
+
+    def find_all(self, text: str):
+        return list({m.lastgroup for m in self.regex.finditer(text)})
+
+
+def timed(func, text: str, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func(text)
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк поиска сигнатур ошибок")
+    parser.add_argument("--sizes", default="5,50,500,2500", help="Число элементов на странице (2500 ≈ 450 КБ)")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    matcher, combined = SignatureMatcher(), CombinedRegex()
+    methods = {"legacy": legacy, "combined": combined.find_all, "matcher": matcher.find_all}
+    report = {"signatures": len(SIGNATURES), "pages": []}
+    for size in (int(s) for s in args.sizes.split(",")):
+        page = Page(rng, "catalog", size, minified=False)
+        clean = page.render()
+        broken = [page.render(body=f"<div class=error>{error}</div>") for error in ERRORS]
+        row = {"size_kb": len(clean) // 1024}
+        for name, func in methods.items():
+            row[name] = {
+                "ms": round(timed(func, clean, args.repeat), 3),
+                "detected": sum(1 for text in broken if func(text)),
+            }
+            print(f"[signatures] {row['size_kb']:4} KB {name:8} {row[name]['ms']:8.3f} ms "
+                  f"detected={row[name]['detected']}/{len(ERRORS)}", file=sys.stderr)
+        report["pages"].append(row)
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
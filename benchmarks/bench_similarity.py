@@ -0,0 +1,179 @@
+"""
+Точность и стоимость движков сравнения ответов (core/similarity.py) на размеченном корпусе.
+
+Корпус генерируется детерминированно: страницы каталога и статьи разных размеров
+(до ~500 КБ) и их варианты с разметкой:
+  same      — ответ не изменился по существу: новые CSRF-токен, время, id запроса,
+              отражение пейлоада (в т.ч. экранированное), сменившийся рекламный блок;
+  different — признак инъекции: страница ошибки СУБД, ошибка внутри шаблона,
+              пустая выдача, выдача другого размера (boolean-based), ошибка 500.
+Отдельно — короткие страницы, как /item в target_app.py.
+
+  python benchmarks/bench_similarity.py
+  python benchmarks/bench_similarity.py --engines legacy,minhash --sizes 5,50,500
+
+Для каждого движка печатаются точность, ложные срабатывания и пропуски,
+время на сравнение (с отпечатками и только compare) — JSON в stdout.
+"""
+import argparse
+import html
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from urllib.parse import quote_plus
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.similarity import DifflibEngine, ENGINES, get_engine, mask_dynamic
+
+PAYLOAD = "'"
+WORDS = ("lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor incididunt ut labore "
+         "et dolore magna aliqua enim ad minim veniam quis nostrud exercitation ullamco laboris nisi aliquip "
+         "ex ea commodo consequat duis aute irure in reprehenderit voluptate velit esse cillum").split()
+
+
+class Page:
+    """Страница из шаблона, частей контента и динамических значений"""
+    def __init__(self, rng: random.Random, kind: str, size: int, minified: bool):
+        self.rng = rng
+        self.kind = kind
+        self.minified = minified
+        self.items = [self._item(i) for i in range(size)]
+        self.sidebar = [self._sentence(6) for _ in range(3)]
+
+    def _sentence(self, n: int) -> str:
+        return " ".join(self.rng.choice(WORDS) for _ in range(n))
+
+    def _item(self, i: int) -> str:
+        if self.kind == "catalog":
+            return (f'<li class="item"><a href="/item/{i}">{self._sentence(3).title()}</a>'
+                    f'<span class="price">{self.rng.randint(1, 999)}.{self.rng.randint(0, 99):02d}</span>'
+                    f"<p>{self._sentence(12)}</p></li>")
+        return f"<p>{self._sentence(25)}.</p>"
+
+    def render(self, items=None, sidebar=None, body=None, query="1", dynamic_seed=0) -> str:
+        rng = random.Random(dynamic_seed)
+        token = "%032x" % rng.getrandbits(128)
+        stamp = f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} {rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}"
+        content = body if body is not None else "<ul>" + "".join(self.items if items is None else items) + "</ul>"
+        parts = [
+            "<!DOCTYPE html><html><head><title>Shop</title>",
+            f'<meta name="csrf-token" content="{token}"></head><body>',
+            '<nav><a href="/">Home</a> <a href="/catalog">Catalog</a> <a href="/about">About</a></nav>',
+            f'<form action="/search"><input name="q" value="{query}"><input type="hidden" name="csrf" value="{token}">'
+            "</form>",
+            f"<main><h1>Results for {query}</h1>{content}</main>",
+            "<aside>" + "".join(f"<div class=ad>{s}</div>" for s in (sidebar or self.sidebar)) + "</aside>",
+            f"<footer>Generated {stamp} request {rng.randint(10 ** 5, 10 ** 6)} &copy; Shop</footer></body></html>",
+        ]
+        return "".join(parts) if self.minified else "\n".join(parts)
+
+
+def build_corpus(sizes, seed: int = 1):
+    """Список (название, ответ до инъекции, ответ после, отличаются ли по разметке)"""
+    rng = random.Random(seed)
+    corpus = []
+    for kind in ("catalog", "article"):
+        for size in sizes:
+            for minified in (False, True):
+                page = Page(rng, kind, size, minified)
+                name = f"{kind}-{size}{'-min' if minified else ''}"
+                original = page.render(dynamic_seed=1)
+                half = page.items[:max(1, len(page.items) // 2)]
+                cases = {
+                    "dynamic": (page.render(dynamic_seed=2), False),
+                    "reflect": (page.render(query="1" + PAYLOAD, dynamic_seed=3), False),
+                    "reflect-escaped": (page.render(query=html.escape("1" + PAYLOAD), dynamic_seed=3), False),
+                    "rotate": (page.render(sidebar=[page._sentence(6) for _ in range(3)], dynamic_seed=4), False),
+                    "db-error": ("<html><body><b>Warning</b>: mysql_fetch_array() expects parameter 1 to be "
+                                 "resource, boolean given in /var/www/shop/item.php on line 42</body></html>", True),
+                    "error-in-layout": (page.render(body="<div class=error>You have an error in your SQL syntax; "
+                                                         "check the manual near ''1'''</div>", dynamic_seed=5), True),
+                    "empty": (page.render(items=[], body="<p>No results</p>", dynamic_seed=6), True),
+                    "boolean": (page.render(items=half, dynamic_seed=7), True),
+                    "http-500": ("<html><head><title>500 Internal Server Error</title></head><body><h1>Internal "
+                                 "Server Error</h1><p>The server encountered an internal error.</p></body></html>",
+                                 True),
+                }
+                for case, (injected, different) in cases.items():
+                    corpus.append((f"{name}/{case}", original, injected, different))
+    corpus += short_cases()
+    return corpus
+
+
+def short_cases():
+    """Короткие страницы (как /item в target_app.py): одно слово — заметная доля n-грамм"""
+    def page(body: str) -> str:
+        return f"<html><head><title>Bench</title></head><body>{body}</body></html>"
+    original = page("<p>Item 3: 1, 2</p>")
+    cases = {
+        "reflect-escaped": (page(f"<p>Item 3: {html.escape('1' + PAYLOAD)}, 2</p>"), False),
+        "reflect-encoded": (page(f"<p>Item 3: {quote_plus('1' + PAYLOAD)}, 2</p>"), False),
+        "db-error": (page("You have an error in your SQL syntax near '1''"), True),
+        "empty": (page("<p>Not found</p>"), True),
+    }
+    return [(f"short/{case}", original, injected, different) for case, (injected, different) in cases.items()]
+
+
+class LegacyEngine(DifflibEngine):
+    """Поведение до core/similarity: difflib.ratio() без маскирования и без отсечения"""
+    name = "legacy"
+
+    def differs(self, a, b):
+        score = self.compare(a, b)
+        return score < self.threshold, score
+
+
+def evaluate(engine, corpus, mask: bool):
+    errors, timings, compare_timings = [], [], []
+    for name, original, injected, different in corpus:
+        started = time.perf_counter()
+        a = mask_dynamic(original) if mask else original
+        b = mask_dynamic(injected, ignore=["1" + PAYLOAD]) if mask else injected
+        predicted, score = engine.differs(a, b)
+        timings.append(time.perf_counter() - started)
+
+        fa, fb = engine.fingerprint(a), engine.fingerprint(b)
+        started = time.perf_counter()
+        engine.compare(fa, fb)
+        compare_timings.append(time.perf_counter() - started)
+
+        if predicted != different:
+            errors.append({"case": name, "expected": "different" if different else "same", "score": round(score, 4)})
+    return {
+        "threshold": engine.threshold,
+        "accuracy": round(1 - len(errors) / len(corpus), 4),
+        "false_positives": sum(1 for e in errors if e["expected"] == "same"),
+        "false_negatives": sum(1 for e in errors if e["expected"] == "different"),
+        "mean_ms": round(statistics.mean(timings) * 1000, 3),
+        "max_ms": round(max(timings) * 1000, 3),
+        "compare_us": round(statistics.median(compare_timings) * 1e6, 1),
+        "errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк движков сравнения ответов")
+    parser.add_argument("--engines", default=",".join(["legacy"] + list(ENGINES)))
+    parser.add_argument("--sizes", default="5,50,500,2500", help="Число элементов на странице (2500 ≈ 500 КБ)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    corpus = build_corpus([int(s) for s in args.sizes.split(",")], args.seed)
+    report = {"cases": len(corpus), "largest_page_kb": max(len(c[1]) for c in corpus) // 1024, "engines": {}}
+    for name in args.engines.split(","):
+        engine = LegacyEngine() if name == "legacy" else get_engine(name)
+        result = evaluate(engine, corpus, mask=name != "legacy")
+        report["engines"][name] = result
+        print(f"[similarity] {name:8} accuracy={result['accuracy']:.3f} FP={result['false_positives']} "
+              f"FN={result['false_negatives']} mean={result['mean_ms']} ms max={result['max_ms']} ms "
+              f"compare={result['compare_us']} us", file=sys.stderr)
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+"""
+Time-based blind SQLi на эндпоинтах /blind/<i> тестового сайта (target_app.py).
+
+Сравниваются:
+  naive    — прежний подход: по каждому пейлоаду один запрос с фиксированной задержкой,
+             уязвимость — если ответ пришел не раньше задержки (и так confirm раз подряд);
+  plugin   — TimeBasedSQLiPlugin: задержка по измеренному разбросу эндпоинта,
+             одновременные пары «задержка + контроль» и последовательный тест.
+
+  python benchmarks/bench_time_sqli.py
+  python benchmarks/bench_time_sqli.py --blind 20 --injectable 4 --latency 200 --jitter 150
+
+Для каждого способа печатаются время, число запросов, найденные и ложные
+срабатывания — JSON в stdout.
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from target_app import SiteConfig, make_server
+from core.base_plugin import ScanContext
+from core.scheduler import WorkScheduler
+from core.stats import ScanStats
+from core.transport import HttpTransport
+from plugins.sqli_time_based import TimeBasedSQLiPlugin
+
+
+def endpoints(url: str, count: int):
+    return [f"{url}blind/{i}?id={i + 1}" for i in range(count)]
+
+
+def naive_check(session: HttpTransport, target: str, delay: float, confirm: int) -> bool:
+    """Пейлоады по очереди; совпадение — ответ не быстрее delay confirm раз подряд"""
+    base, _, query = target.partition("?")
+    name, _, value = query.partition("=")
+    for payload in TimeBasedSQLiPlugin.PAYLOADS:
+        text, actual = TimeBasedSQLiPlugin._render(payload, delay)
+        for _ in range(confirm):
+            try:
+                response = session.get(base, params={name: value + text}, cache=False, timeout=actual + 10)
+            except requests.RequestException:
+                break
+            if response.elapsed.total_seconds() < actual:
+                break
+        else:
+            return True
+    return False
+
+
+def run_naive(url: str, args) -> dict:
+    stats = ScanStats()
+    session = HttpTransport(pool_size=args.workers, timeout=10, stats=stats)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        flags = list(executor.map(lambda target: naive_check(session, target, args.naive_delay, args.naive_confirm),
+                                  endpoints(url, args.blind)))
+    elapsed = time.perf_counter() - started
+    session.close()
+    return summarize({i for i, flag in enumerate(flags) if flag}, elapsed, stats, args)
+
+
+def run_plugin(url: str, args) -> dict:
+    stats = ScanStats()
+    session = HttpTransport(pool_size=args.workers, timeout=10, stats=stats)
+    config = {"time_sqli_delay": args.delay}
+    context = ScanContext(target_url=url, session=session, config=config, stats=stats)
+    for target in endpoints(url, args.blind):
+        context.discovered_urls.add(target)
+    context.finish_discovery()
+    started = time.perf_counter()
+    results = WorkScheduler(args.workers, log=lambda message: None).run([TimeBasedSQLiPlugin(context)])
+    elapsed = time.perf_counter() - started
+    session.close()
+    found = {int(r.url.split("/blind/")[1].split("?")[0]) for r in results}
+    return summarize(found, elapsed, stats, args)
+
+
+def summarize(found: set, elapsed: float, stats: ScanStats, args) -> dict:
+    vulnerable = set(range(min(args.injectable, args.blind)))
+    return {
+        "time": round(elapsed, 2),
+        "requests": stats.to_dict()["requests"],
+        "detected": len(found & vulnerable),
+        "missed": len(vulnerable - found),
+        "false_positives": len(found - vulnerable),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк time-based SQLi")
+    parser.add_argument("--blind", type=int, default=10, help="Число эндпоинтов /blind/<i>")
+    parser.add_argument("--injectable", type=int, default=3, help="Из них уязвимых")
+    parser.add_argument("--latency", type=float, default=50.0, help="Задержка ответа сайта, мс")
+    parser.add_argument("--jitter", type=float, default=30.0, help="Разброс задержки, мс")
+    parser.add_argument("--workers", type=int, default=5)
+    parser.add_argument("--delay", type=float, default=1.0, help="Минимальная задержка пейлоада плагина, с")
+    parser.add_argument("--naive-delay", type=float, default=5.0, help="Задержка пейлоада naive, с")
+    parser.add_argument("--naive-confirm", type=int, default=2, help="Повторов для подтверждения в naive")
+    parser.add_argument("--methods", default="naive,plugin")
+    args = parser.parse_args()
+
+    site = SiteConfig(pages=1, forms=0, blind=args.blind, injectable=args.injectable,
+                      latency=args.latency, jitter=args.jitter)
+    server = make_server(site)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/"
+
+    methods = {"naive": run_naive, "plugin": run_plugin}
+    report = {"site": {"blind": args.blind, "injectable": args.injectable,
+                       "latency": args.latency, "jitter": args.jitter}}
+    try:
+        for name in args.methods.split(","):
+            row = report[name] = methods[name](url, args)
+            print(f"[time-sqli] {name:6} {row['time']:7.2f} s requests={row['requests']:5} "
+                  f"detected={row['detected']}/{min(args.injectable, args.blind)} "
+                  f"fp={row['false_positives']}", file=sys.stderr)
+    finally:
+        server.shutdown()
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
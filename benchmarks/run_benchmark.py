@@ -0,0 +1,220 @@
+"""
+Сквозной бенчмарк SightSec: ScannerEngine.start_scan против локального benchmarks/target_app.py.
+
+Каждый прогон выполняется в отдельном процессе (чистый пик RSS), тестовый сайт — в своем.
+Результат — JSON: время, страниц/с, запросов/с, пик RSS, находки; медиана по прогонам.
+
+  python benchmarks/run_benchmark.py --preset audit --pages 300 --latency 20 --output bench.json
+  python benchmarks/run_benchmark.py --preset audit --pages 300 --latency 20 --baseline bench.json
+
+С --baseline печатается сравнение, а при ухудшении больше --max-regression процентов
+или любом изменении находок (числа или распределения по важности) код возврата равен 1.
+"""
+import argparse
+import collections
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DISCOVERY_PLUGINS = ["Basic Crawler", "Link Spider", "HTML Form Finder"]
+
+# Фиксированные наборы плагинов: результаты разных версий сравнимы только на одном наборе
+PRESETS = {
+    "discovery": DISCOVERY_PLUGINS,
+    "audit": DISCOVERY_PLUGINS + [
+        "SQLi Heuristic Scanner", "SQL Injection Scanner", "Basic XSS Fuzzer",
+        "sensitive_files", "security_headers",
+    ],
+}
+
+# Метрика -> True, если больше — лучше
+METRICS = {
+    "total_time": False,
+    "pages_per_s": True,
+    "requests_per_s": True,
+    "peak_rss_kb": False,
+}
+
+
+def start_target(args) -> (subprocess.Popen, str):
+    """Запускает тестовый сайт в отдельном процессе и ждет его адрес"""
+    cmd = [sys.executable, os.path.join(ROOT, "benchmarks", "target_app.py"),
+           "--pages", str(args.pages), "--forms", str(args.forms), "--params", str(args.params),
+           "--injectable", str(args.injectable), "--fanout", str(args.fanout), "--orphans", str(args.orphans),
+           "--blind", str(args.blind), "--latency", str(args.latency), "--jitter", str(args.jitter)]
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, text=True)
+    line = proc.stdout.readline().strip()
+    if not line.startswith("READY "):
+        proc.kill()
+        raise RuntimeError(f"target_app не запустился: {line!r}")
+    return proc, line.split(" ", 1)[1]
+
+
+def _scan(url: str, plugins: list, scan_config: dict, quiet: bool, out):
+    """Выполняется в дочернем процессе: один прогон сканирования"""
+    os.chdir(ROOT)
+    from core.base_plugin import ScanContext
+    from core.engine import ScannerEngine
+    from core.plugin_manager import PluginManager
+
+    if quiet:
+        ScanContext.log = lambda self, message: None
+    pm = PluginManager(plugin_folder=os.path.join(ROOT, "plugins"),
+                       config_file=os.path.join(ROOT, "plugins_config.json"))
+    pm.discover_plugins()
+    pm.enabled_plugins = list(plugins)  # Не сохраняем в plugins_config.json
+
+    started = time.perf_counter()
+    results = ScannerEngine(pm).start_scan(url, scan_config)
+    total = time.perf_counter() - started
+
+    stats = results.stats.to_dict()
+    discovery = stats["phases"].get("discovery", {})
+    pages = discovery.get("requests", 0)
+    out.put({
+        "total_time": round(total, 3),
+        "pages": pages,
+        "pages_per_s": round(pages / discovery["wall_time"], 1) if discovery.get("wall_time") else None,
+        "requests": stats["requests"],
+        "requests_per_s": round(stats["requests"] / total, 1) if total else None,
+        "bytes_received": stats["bytes_received"],
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "findings": len(results),
+        "severities": dict(collections.Counter(r.severity for r in results)),
+        "phases": {name: phase["wall_time"] for name, phase in stats["phases"].items()},
+    })
+
+
+def run_once(url: str, plugins: list, scan_config: dict, quiet: bool = True) -> dict:
+    out = multiprocessing.Queue()
+    proc = multiprocessing.Process(target=_scan, args=(url, plugins, scan_config, quiet, out))
+    proc.start()
+    result = out.get()
+    proc.join()
+    return result
+
+
+def median_run(runs: list) -> dict:
+    result = {}
+    for key in ("total_time", "pages", "pages_per_s", "requests", "requests_per_s", "peak_rss_kb", "findings"):
+        values = [r[key] for r in runs if r.get(key) is not None]
+        result[key] = round(statistics.median(values), 3) if values else None
+    names = sorted({name for r in runs for name in r.get("severities", {})})
+    result["severities"] = {name: statistics.median(r.get("severities", {}).get(name, 0) for r in runs)
+                            for name in names}
+    return result
+
+
+def compare(current: dict, baseline: dict, max_regression: float) -> dict:
+    """Сравнивает медианы с базовым прогоном; изменение в процентах (положительное — лучше)"""
+    comparison = {}
+    for metric, higher_is_better in METRICS.items():
+        new, old = current.get(metric), baseline.get(metric)
+        if not new or not old:
+            continue
+        change = (new - old) / old * 100
+        if not higher_is_better:
+            change = -change
+        comparison[metric] = {
+            "baseline": old,
+            "current": new,
+            "change_pct": round(change, 1),
+            "regression": change < -max_regression,
+        }
+    # Находки должны совпадать (и по числу, и по важности): меньше — пропуски уязвимостей,
+    # больше — ложные срабатывания
+    if baseline.get("findings") is not None and current.get("findings") != baseline.get("findings"):
+        comparison["findings"] = {"baseline": baseline["findings"], "current": current["findings"],
+                                  "regression": True}
+    if baseline.get("severities") is not None and current.get("severities") != baseline.get("severities"):
+        comparison["severities"] = {"baseline": baseline["severities"], "current": current.get("severities"),
+                                    "regression": True}
+    return comparison
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сквозной бенчмарк SightSec")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="audit", help="Набор плагинов")
+    parser.add_argument("--repeat", type=int, default=3, help="Число прогонов (берется медиана)")
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--forms", type=int, default=20)
+    parser.add_argument("--params", type=int, default=2)
+    parser.add_argument("--injectable", type=int, default=3)
+    parser.add_argument("--fanout", type=int, default=4)
+    parser.add_argument("--orphans", type=int, default=0, help="Страниц, доступных только через sitemap")
+    parser.add_argument("--blind", type=int, default=0, help="Эндпоинтов /blind/<i> (time-based SQLi)")
+    parser.add_argument("--latency", type=float, default=10.0, help="Задержка ответа сайта, мс")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Разброс задержки, мс")
+    parser.add_argument("--config", default="{}", help="JSON с дополнительными параметрами сканирования")
+    parser.add_argument("--output", help="Файл для JSON-результата (иначе stdout)")
+    parser.add_argument("--baseline", help="JSON предыдущего прогона для сравнения")
+    parser.add_argument("--max-regression", type=float, default=10.0, help="Допустимое ухудшение, %%")
+    parser.add_argument("--verbose", action="store_true", help="Показывать лог сканирования")
+    args = parser.parse_args()
+
+    scan_config = {"timeout": 10}
+    scan_config.update(json.loads(args.config))
+    target = {k: getattr(args, k) for k in ("pages", "forms", "params", "injectable", "fanout", "orphans", "blind",
+                                   "latency", "jitter")}
+
+    proc, url = start_target(args)
+    try:
+        runs = []
+        for i in range(args.repeat):
+            run = run_once(url, PRESETS[args.preset], scan_config, quiet=not args.verbose)
+            print(f"[bench] run {i + 1}/{args.repeat}: {run['total_time']}s, "
+                  f"{run['pages_per_s']} pages/s, {run['requests_per_s']} req/s, "
+                  f"RSS {run['peak_rss_kb'] // 1024} MB", file=sys.stderr)
+            runs.append(run)
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    report = {
+        "benchmark": "sightsec-e2e",
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "preset": args.preset,
+        "plugins": PRESETS[args.preset],
+        "target": target,
+        "scan_config": scan_config,
+        "runs": runs,
+        "median": median_run(runs),
+    }
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("target") != target or baseline.get("preset") != args.preset:
+            print("[bench] ВНИМАНИЕ: параметры сайта или набор плагинов отличаются от базового прогона",
+                  file=sys.stderr)
+        report["comparison"] = compare(report["median"], baseline.get("median", {}), args.max_regression)
+        for metric, row in report["comparison"].items():
+            mark = "REGRESSION" if row["regression"] else "ok"
+            print(f"[bench] {metric}: {row['baseline']} -> {row['current']} "
+                  f"({row.get('change_pct', '-')}%) {mark}", file=sys.stderr)
+        if any(row["regression"] for row in report["comparison"].values()):
+            exit_code = 1
+
+    data = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(data)
+        print(f"[bench] saved: {args.output}", file=sys.stderr)
+    else:
+        print(data)
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
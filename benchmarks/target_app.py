@@ -0,0 +1,246 @@
+"""
+Локальное тестовое веб-приложение для бенчмарков SightSec.
+
+Структура сайта детерминирована и задается параметрами:
+  /                 — главная, ссылки на первые страницы
+  /page/<i>         — страница; ссылки на дочерние страницы (дерево), на /item/<i> и,
+                      для первых `forms` страниц, форма отправки на /form/<i>
+  /item/<i>?p0=..   — страница с `params` параметрами запроса
+  /form/<i>         — обработчик формы (четные — GET, нечетные — POST)
+  /orphan/<i>       — страницы без входящих ссылок (только в sitemap)
+  /blind/<i>?id=1   — `blind` эндпоинтов без вывода ошибок (ссылки со страниц /page/<i>)
+  /robots.txt       — ссылка на /sitemap_index.xml
+  /sitemap_index.xml, /sitemap-pages.xml.gz, /sitemap-orphans.xml — sitemap (индекс, gzip, обычный)
+
+Первые `injectable` объектов /item и /form уязвимы: кавычка в параметре дает ошибку SQL,
+ввод в форму отражается без экранирования (XSS). Остальные экранируют ввод.
+Первые `injectable` из /blind уязвимы к time-based SQLi: ответ всегда одинаковый, но
+пейлоад SLEEP(n) (четные, строковый контекст MySQL) или PG_SLEEP(n) (нечетные, числовой
+контекст PostgreSQL) задерживает ответ на n секунд.
+Каждый ответ задерживается на `latency` мс (± `jitter` мс).
+Ответы 200 содержат ETag; на If-None-Match с тем же значением возвращается 304.
+
+Запуск: python benchmarks/target_app.py --port 0 --pages 200 --forms 20 --latency 20
+После запуска печатает строку "READY <url>".
+"""
+import argparse
+import gzip
+import hashlib
+import html
+import random
+import re
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+
+_MYSQL_SLEEP = re.compile(r"^[^']*'.*\bSLEEP\(([\d.]+)\)", re.IGNORECASE)
+_PG_SLEEP = re.compile(r"^\d+ .*\bPG_SLEEP\(([\d.]+)\)", re.IGNORECASE)
+
+
+@dataclass
+class SiteConfig:
+    """Параметры тестового сайта"""
+    pages: int = 100        # Число страниц /page/<i>
+    forms: int = 10         # Число страниц с формой
+    params: int = 2         # Число параметров в ссылках /item/<i>
+    injectable: int = 3     # Число уязвимых /item и /form
+    fanout: int = 4         # Ссылок на дочерние страницы с каждой страницы
+    orphans: int = 0        # Страниц, доступных только через sitemap
+    blind: int = 0          # Число эндпоинтов /blind/<i>
+    latency: float = 0.0    # Искусственная задержка ответа, мс
+    jitter: float = 0.0     # Разброс задержки, мс
+    seed: int = 0
+
+
+class TargetHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, как у реальных серверов
+    disable_nagle_algorithm = True  # Заголовки и тело пишутся отдельно: без TCP_NODELAY +40 мс на ответ
+    site: SiteConfig = SiteConfig()
+    _random = random.Random(0)
+    _random_lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self._dispatch(parse_qs(urlparse(self.path).query))
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length).decode("utf-8", errors="replace") if length else ""
+        self._dispatch(parse_qs(body))
+
+    def do_HEAD(self):
+        self._dispatch({}, head=True)
+
+    def _dispatch(self, query: dict, head: bool = False):
+        self._delay()
+        path = urlparse(self.path).path
+        parts = path.strip("/").split("/")
+        site = self.site
+
+        if path in ("/", "/index.html"):
+            self._send(200, self._page(self._children(-1)))
+        elif path == "/robots.txt":
+            sitemap = f"http://{self.headers.get('Host', '')}/sitemap_index.xml"
+            self._send(200, f"User-agent: *\nDisallow:\nSitemap: {sitemap}\n", "text/plain", head)
+        elif path == "/sitemap_index.xml":
+            self._send(200, self._sitemap("sitemapindex", "sitemap",
+                                          ["/sitemap-pages.xml.gz", "/sitemap-orphans.xml"]), "application/xml", head)
+        elif path == "/sitemap-pages.xml.gz":
+            body = self._sitemap("urlset", "url", [f"/page/{i}" for i in range(site.pages)])
+            self._send(200, gzip.compress(body.encode("utf-8")), "application/x-gzip", head)
+        elif path == "/sitemap-orphans.xml":
+            self._send(200, self._sitemap("urlset", "url", [f"/orphan/{i}" for i in range(site.orphans)]),
+                       "application/xml", head)
+        elif len(parts) == 2 and parts[1].isdigit():
+            index = int(parts[1])
+            if parts[0] == "page" and index < site.pages:
+                self._send(200, self._render_page(index), head=head)
+            elif parts[0] == "orphan" and index < site.orphans:
+                self._send(200, self._page(f"<h1>Orphan {index}</h1>"), head=head)
+            elif parts[0] == "item" and index < site.pages:
+                self._send(200, self._render_item(index, query), head=head)
+            elif parts[0] == "form" and index < site.forms:
+                self._send(200, self._render_form_result(index, query), head=head)
+            elif parts[0] == "blind" and index < site.blind:
+                self._blind_sleep(index, query.get("id", [""])[0])
+                self._send(200, self._page(f"<p>Record {index}</p>"), head=head)
+            else:
+                self._send(404, self._page("Not Found"), head=head)
+        else:
+            self._send(404, self._page("Not Found"), head=head)
+
+    # --- Контент ---
+
+    def _children(self, index: int):
+        first = (index + 1) * self.site.fanout
+        return "".join(f'<a href="/page/{i}">page {i}</a>\n'
+                       for i in range(first, min(first + self.site.fanout, self.site.pages)))
+
+    def _render_page(self, index: int) -> str:
+        site = self.site
+        params = urlencode({f"p{k}": k + 1 for k in range(site.params)})
+        body = [f"<h1>Page {index}</h1>", self._children(index),
+                f'<a href="/item/{index}?{params}">item {index}</a>', '<a href="/">home</a>']
+        if index < site.blind:
+            body.append(f'<a href="/blind/{index}?id={index + 1}">record {index}</a>')
+        if index < site.forms:
+            method = "get" if index % 2 == 0 else "post"
+            body.append(
+                f'<form action="/form/{index}" method="{method}">'
+                '<input type="text" name="q" value="">'
+                '<input type="text" name="name" value="guest">'
+                '<input type="hidden" name="token" value="abc">'
+                '<input type="submit" name="go" value="Go"></form>'
+            )
+        return self._page("\n".join(body))
+
+    def _render_item(self, index: int, query: dict) -> str:
+        values = [v for vs in query.values() for v in vs]
+        if index < self.site.injectable and any("'" in v for v in values):
+            return self._page("You have an error in your SQL syntax near '" + html.escape(values[0]) + "'")
+        return self._page(f"<p>Item {index}: " + html.escape(", ".join(values)) + "</p>")
+
+    def _render_form_result(self, index: int, query: dict) -> str:
+        value = query.get("q", [""])[0]
+        if index < self.site.injectable:
+            if "'" in value:
+                return self._page("Warning: mysql_fetch_array(): SQL syntax error near '" + value + "'")
+            return self._page("<p>Results for " + value + "</p>")  # Отражение без экранирования
+        return self._page("<p>Results for " + html.escape(value) + "</p>")
+
+    def _blind_sleep(self, index: int, value: str):
+        """Эмуляция time-based SQLi: задержка, только если пейлоад синтаксически подходит к запросу"""
+        if index >= self.site.injectable:
+            return
+        if index % 2 == 0:  # MySQL: WHERE id = '<value>'
+            match = _MYSQL_SLEEP.search(value)
+        else:               # PostgreSQL: WHERE id = <value>
+            match = _PG_SLEEP.search(value)
+        if match:
+            time.sleep(min(float(match.group(1)), 30))
+
+    def _sitemap(self, root: str, entry: str, paths: list) -> str:
+        base = f"http://{self.headers.get('Host', '')}"
+        entries = "".join(f"<{entry}><loc>{base}{path}</loc></{entry}>\n" for path in paths)
+        return (f'<?xml version="1.0" encoding="UTF-8"?>\n'
+                f'<{root} xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n{entries}</{root}>\n')
+
+    @staticmethod
+    def _page(body: str) -> str:
+        return f"<html><head><title>Bench</title></head><body>{body}</body></html>"
+
+    # --- Транспорт ---
+
+    def _delay(self):
+        site = self.site
+        if site.latency <= 0 and site.jitter <= 0:
+            return
+        with self._random_lock:
+            jitter = self._random.uniform(-site.jitter, site.jitter) if site.jitter else 0.0
+        time.sleep(max(0.0, site.latency + jitter) / 1000)
+
+    def _send(self, status: int, body, content_type: str = "text/html; charset=utf-8", head: bool = False):
+        data = body if isinstance(body, bytes) else body.encode("utf-8")
+        etag = '"%s"' % hashlib.md5(data).hexdigest() if status == 200 else None
+        if etag and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        if etag:
+            self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        if not head:
+            self.wfile.write(data)
+
+
+def make_server(site: SiteConfig, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """Создает сервер с отдельным классом обработчика (несколько сайтов в одном процессе)"""
+    handler = type("BoundTargetHandler", (TargetHandler,), {
+        "site": site, "_random": random.Random(site.seed), "_random_lock": threading.Lock()
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Тестовое веб-приложение для бенчмарков SightSec")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=0, help="0 — свободный порт")
+    parser.add_argument("--pages", type=int, default=SiteConfig.pages)
+    parser.add_argument("--forms", type=int, default=SiteConfig.forms)
+    parser.add_argument("--params", type=int, default=SiteConfig.params)
+    parser.add_argument("--injectable", type=int, default=SiteConfig.injectable)
+    parser.add_argument("--fanout", type=int, default=SiteConfig.fanout)
+    parser.add_argument("--orphans", type=int, default=SiteConfig.orphans)
+    parser.add_argument("--blind", type=int, default=SiteConfig.blind)
+    parser.add_argument("--latency", type=float, default=SiteConfig.latency, help="Задержка ответа, мс")
+    parser.add_argument("--jitter", type=float, default=SiteConfig.jitter, help="Разброс задержки, мс")
+    parser.add_argument("--seed", type=int, default=SiteConfig.seed)
+    args = parser.parse_args()
+
+    site = SiteConfig(pages=args.pages, forms=args.forms, params=args.params, injectable=args.injectable,
+                      fanout=args.fanout, orphans=args.orphans, blind=args.blind, latency=args.latency, jitter=args.jitter, seed=args.seed)
+    server = make_server(site, args.host, args.port)
+    print(f"READY http://{args.host}:{server.server_address[1]}/", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
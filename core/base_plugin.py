@@ -1,8 +1,17 @@
+import asyncio
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
-from typing import List, Dict, Any
-import requests
+from typing import List, Dict, Any, Optional, Iterable, Callable
 from urllib.parse import urljoin
+from core.baseline import BaselineStore
+from core.cache import ResponseCache
+from core.frontier import canonicalize_url
+from core.scope import Scope
+from core.source_tree import SourceTree
+from core.stats import ScanStats
+from core.streams import DiscoveryStream, FormIndex
+from core.transport import AsyncTransport, HttpTransport
+from core.url_clusters import UrlTemplateIndex
 
 # --- 1.1. Структуры данных ---
 
@@ -19,10 +28,30 @@ class TargetForm:
     action_url: str     # Относительный или абсолютный URL отправки
     method: str         # GET или POST
     inputs: List[FormInput]
+    source_url: Optional[str] = None  # Страница, на которой найдена форма
+    pages: List[str] = field(default_factory=list)  # Все страницы с этой формой (заполняет FormIndex)
     
+    @classmethod
+    def from_parsed(cls, form, page_url: str) -> "TargetForm":
+        """
+        Форма из разобранной страницы (core/html_parser.ParsedForm). Единственное место,
+        где поля превращаются в FormInput: все discovery-плагины дают один отпечаток.
+        Поля без имени (кнопки отправки) не отправляются с формой и не учитываются.
+        """
+        inputs = [FormInput(f.name, f.type or 'text', f.value or '') for f in form.fields if f.name]
+        return cls(form.action or page_url, (form.method or 'GET').upper(), inputs, source_url=page_url)
+
     def get_full_url(self, base_url: str) -> str:
-        """Возвращает полный URL для отправки данных"""
-        return urljoin(base_url, self.action_url)
+        """Возвращает полный URL для отправки данных (относительно страницы формы, если она известна)"""
+        return urljoin(self.source_url or base_url, self.action_url)
+
+    def fingerprint(self, base_url: str) -> tuple:
+        """Отпечаток для дедупликации: URL отправки, метод, имена и типы полей"""
+        return (
+            canonicalize_url(self.get_full_url(base_url)),
+            self.method.upper(),
+            tuple(sorted((i.name, (i.type or '').lower()) for i in self.inputs))
+        )
 
 @dataclass
 class ScanResult:
@@ -34,15 +63,42 @@ class ScanResult:
     evidence: str          # Доказательство (пейлоад, скриншот и т.д.)
     response_snippet: str  # Часть ответа сервера
 
+class ScanResultList(list):
+    """Список ScanResult, возвращаемый движком; в stats — статистика сканирования (ScanStats)"""
+    def __init__(self, results: Iterable[ScanResult] = (), stats: Optional[ScanStats] = None):
+        super().__init__(results)
+        self.stats = stats
+
 @dataclass
 class ScanContext:
     """Общая память и состояние для всех плагинов в рамках одного сканирования"""
     target_url: str
-    session: requests.Session = field(default_factory=requests.Session) # Общая HTTP-сессия (куки, заголовки)
-    discovered_urls: set = field(default_factory=set) # URL для проверки
-    discovered_forms: List[TargetForm] = field(default_factory=list) # Формы для фаззинга
+    session: HttpTransport = field(default_factory=HttpTransport) # Общий потокобезопасный HTTP-транспорт (куки, заголовки, пул)
+    discovered_urls: DiscoveryStream = field(default_factory=DiscoveryStream) # URL для проверки (поток)
+    discovered_forms: FormIndex = field(default_factory=FormIndex) # Уникальные формы для фаззинга (поток с дедупликацией)
     config: Dict[str, Any] = field(default_factory=dict) # Конфиг (white-box path, таймауты)
+    source_tree: Optional[SourceTree] = None # Индекс исходников для white-box плагинов (строится один раз)
+    response_cache: Optional[ResponseCache] = None # Общий кэш ответов (используется транспортом)
+    async_http: Optional[AsyncTransport] = None # Асинхронный транспорт (только в engine_mode='async')
+    stats: Optional[ScanStats] = None # Статистика производительности по фазам и плагинам
+    url_templates: UrlTemplateIndex = field(default_factory=UrlTemplateIndex) # Представители шаблонов URL для аудита
+    scope: Optional[Scope] = None # Границы сканирования (по умолчанию из config)
+    baselines: Optional[BaselineStore] = None # Исходные ответы для плагинов инъекций (по умолчанию из config)
     
+    def __post_init__(self):
+        if self.scope is None:
+            self.scope = Scope.from_config(self.target_url, self.config)
+        if self.baselines is None:
+            self.baselines = BaselineStore(self.session, samples=self.config.get("baseline_samples", 2))
+        # Относительные action форм без страницы-источника разрешаются от цели
+        if isinstance(self.discovered_forms, FormIndex) and not self.discovered_forms.base_url:
+            self.discovered_forms.base_url = self.target_url
+
+    def finish_discovery(self):
+        """Закрывает потоки URL и форм: аудиторские плагины перестают ждать новых элементов"""
+        self.discovered_urls.close()
+        self.discovered_forms.close()
+
     def log(self, message: str):
         """Простой логгер для консоли (в реальном приложении - QWidget/DB)"""
         print(f"[CONTEXT] {message}")
@@ -70,6 +126,44 @@ class BasePlugin(ABC):
         """Обязательный метод, содержащий основную логику проверки"""
         pass
 
+    def work_units(self) -> Optional[Iterable[Callable[[], List[ScanResult]]]]:
+        """
+        Опционально: разбивает проверку на независимые единицы работы
+        (например, одна точка инъекции + один пейлоад), которые планировщик движка
+        выполняет параллельно. None — плагин выполняется целиком через run().
+        """
+        return None
+
+    def source_files(self) -> Optional[List[str]]:
+        """
+        Опционально (whitebox): список файлов, которые проверит плагин.
+        Если плагин возвращает список и реализует scan_files(), движок делит его на части
+        и проверяет их параллельно в пуле процессов. None — плагин выполняется целиком через run().
+        """
+        return None
+
+    def scan_files(self, file_paths: List[str]) -> List[ScanResult]:
+        """
+        Опционально (whitebox): проверяет часть файлов из source_files().
+        Без переопределения движок выполняет плагин целиком через run().
+        """
+        return []
+
+    async def run_async(self) -> List[ScanResult]:
+        """
+        Асинхронная точка входа (engine_mode='async').
+        По умолчанию — прослойка для синхронных плагинов: run() (или каждая единица работы)
+        выполняется в отдельном потоке. Плагины, умеющие работать с context.async_http,
+        переопределяют этот метод.
+        """
+        units = self.work_units()
+        if units is None:
+            return await asyncio.to_thread(self.run)
+        # Генератор единиц может ждать поток Discovery, поэтому собираем его вне event loop
+        units = await asyncio.to_thread(list, units)
+        batches = await asyncio.gather(*(asyncio.to_thread(unit) for unit in units))
+        return [r for batch in batches for r in batch]
+
     def teardown(self):
         """Опционально: очистка ресурсов после запуска"""
         pass
\ No newline at end of file
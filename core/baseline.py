@@ -0,0 +1,130 @@
+import difflib
+import threading
+from typing import Any, Callable, Dict, FrozenSet, Hashable, Iterable, Optional
+
+from core.frontier import canonicalize_url
+from core.signatures import ERROR_SIGNATURES
+from core.similarity import SimilarityEngine, mask_dynamic, tokenize_markup
+
+
+class Baseline:
+    """
+    Исходный («нормальный») ответ точки инъекции: статус, тело и динамические участки —
+    токены разметки, которые отличались между повторными запросами без пейлоада.
+    """
+    def __init__(self, response, dynamic: FrozenSet[str] = frozenset()):
+        self.status_code = response.status_code
+        self.text = response.text
+        self.dynamic = dynamic
+        self.masked = self.mask(self.text)
+        self._fingerprints: Dict[str, Any] = {}
+        self._signatures: Optional[FrozenSet[str]] = None
+
+    @property
+    def stable(self) -> bool:
+        """True — повторные ответы совпали после mask_dynamic()"""
+        return not self.dynamic
+
+    @property
+    def error_signatures(self) -> FrozenSet[str]:
+        """Имена сигнатур ошибок (core/signatures), которые есть уже в исходном ответе"""
+        if self._signatures is None:
+            self._signatures = frozenset(m.signature.name for m in ERROR_SIGNATURES.find_all(self.text))
+        return self._signatures
+
+    def new_errors(self, matches):
+        """Совпадения сигнатур, которых нет в исходном ответе (т.е. вызванные пейлоадом)"""
+        return [m for m in matches if m.signature.name not in self.error_signatures]
+
+    def mask(self, text: str, ignore: Iterable[str] = ()) -> str:
+        """
+        mask_dynamic() с отражениями ввода ignore, затем удаление измеренных динамических участков
+        """
+        text = mask_dynamic(text, ignore)
+        if not self.dynamic:
+            return text
+        return "".join(token for token in tokenize_markup(text) if token not in self.dynamic)
+
+    def differs(self, engine: SimilarityEngine, text: str, ignore: Iterable[str] = ()):
+        """(ответ отличается от исходного, похожесть); отпечаток исходного считается один раз"""
+        reference = self._fingerprints.get(engine.name)
+        if reference is None:
+            reference = self._fingerprints.setdefault(engine.name, engine.fingerprint(self.masked))
+        return engine.differs_from(reference, self.mask(text, ignore))
+
+
+class _Slot:
+    """Ячейка хранилища: первый поток делает запросы, остальные ждут на lock"""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.ready = False
+        self.baseline: Optional[Baseline] = None
+
+
+class BaselineStore:
+    """
+    Исходные ответы по URL и по формам, общие для всех плагинов инъекций.
+    Каждый ответ запрашивается samples раз (первый — через кэш ответов, остальные
+    мимо него); токены, отличающиеся между запросами, считаются динамическими
+    и маскируются при сравнении. Одновременные запросы одного ключа ждут первый.
+    """
+    def __init__(self, session, samples: int = 2, timeout: float = 5):
+        self.session = session
+        self.samples = max(1, samples)
+        self.timeout = timeout
+        self._slots: Dict[Hashable, _Slot] = {}
+        self._lock = threading.Lock()
+
+    def for_url(self, url: str) -> Optional[Baseline]:
+        """Исходный ответ на GET url (None — запрос не удался)"""
+        return self._get(("GET", canonicalize_url(url)),
+                         lambda cache: self.session.get(url, timeout=self.timeout, cache=cache))
+
+    def for_form(self, form, base_url: str) -> Optional[Baseline]:
+        """Исходный ответ на отправку формы со значениями по умолчанию"""
+        url = form.get_full_url(base_url)
+        data = {i.name: i.value for i in form.inputs}
+        if form.method == 'POST':
+            fetch = lambda cache: self.session.post(url, data=data, timeout=self.timeout, cache=cache)
+        else:
+            fetch = lambda cache: self.session.get(url, params=data, timeout=self.timeout, cache=cache)
+        return self._get(form.fingerprint(base_url), fetch)
+
+    def _get(self, key: Hashable, fetch: Callable[[Optional[bool]], Any]) -> Optional[Baseline]:
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is None:
+                slot = self._slots[key] = _Slot()
+        with slot.lock:
+            if not slot.ready:
+                try:
+                    slot.baseline = self._measure(fetch)
+                except Exception:
+                    slot.baseline = None  # Недоступную точку не запрашиваем повторно
+                slot.ready = True
+            return slot.baseline
+
+    def _measure(self, fetch: Callable[[Optional[bool]], Any]) -> Baseline:
+        response = fetch(None)
+        first = tokenize_markup(mask_dynamic(response.text))
+        dynamic = set()
+        for _ in range(self.samples - 1):
+            other = tokenize_markup(mask_dynamic(fetch(False).text))
+            if other == first:
+                continue
+            matcher = difflib.SequenceMatcher(None, first, other)
+            for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+                if tag != "equal":
+                    dynamic.update(first[i1:i2])
+                    dynamic.update(other[j1:j2])
+        return Baseline(response, frozenset(dynamic))
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    @property
+    def unstable(self) -> int:
+        """Число исходных ответов с динамическими участками"""
+        with self._lock:
+            slots = list(self._slots.values())
+        return sum(1 for slot in slots if slot.baseline is not None and not slot.baseline.stable)
@@ -27,7 +27,8 @@ class ScenarioExecutor:
                     if method == 'POST':
                         response = session.post(url, data=step.get('data', {}))
                     else: # GET, PUT, DELETE и т.д.
-                        response = session.request(method, url, params=step.get('params', {}))
+                        # Сценарий зависит от состояния сессии, поэтому кэш ответов не используем
+                        response = session.request(method, url, params=step.get('params', {}), cache=False)
                     
                     context.log(f"Step {step_id}: {method} {path} -> Status {response.status_code}")
 
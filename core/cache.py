@@ -0,0 +1,117 @@
+import threading
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Any, NamedTuple, Optional, Tuple
+import requests
+from requests.structures import CaseInsensitiveDict
+
+
+class CachedResponse(NamedTuple):
+    """
+    Неизменяемая запись кэша: ответ с уже загруженным телом, без соединения и потока.
+    Каждое попадание в кэш получает свой requests.Response (to_response), поэтому
+    потоки не делят .raw, .encoding и заголовки одного объекта.
+    """
+    status_code: int
+    url: str
+    reason: Optional[str]
+    headers: Tuple[Tuple[str, str], ...]
+    content: bytes
+    encoding: Optional[str]
+    elapsed: timedelta
+    request: Optional[requests.PreparedRequest]
+
+    @classmethod
+    def from_response(cls, response: requests.Response) -> "CachedResponse":
+        request = getattr(response, "request", None)
+        return cls(response.status_code, response.url, response.reason, tuple(response.headers.items()),
+                   response.content, response.encoding, response.elapsed,
+                   request.copy() if request is not None else None)
+
+    def to_response(self) -> requests.Response:
+        response = requests.Response()
+        response.status_code = self.status_code
+        response.url = self.url
+        response.reason = self.reason
+        response.headers = CaseInsensitiveDict(self.headers)
+        response._content = self.content
+        response._content_consumed = True
+        response.encoding = self.encoding
+        response.elapsed = self.elapsed
+        response.request = self.request.copy() if self.request is not None else None
+        return response
+
+
+class ResponseCache:
+    """
+    LRU-кэш HTTP-ответов в рамках одного сканирования.
+    Ключ — (метод, полный URL с параметрами, тело запроса). Вытеснение — по числу
+    записей и по суммарному размеру тел ответов. Хранятся неизменяемые CachedResponse;
+    get() каждый раз возвращает новую копию ответа.
+    """
+    CACHEABLE_METHODS = ("GET", "HEAD")
+
+    def __init__(self, max_entries: int = 2048, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple, Tuple[Any, int]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(method: str, url: str, params=None, data=None, json=None, allow_redirects: bool = True) -> Tuple:
+        """
+        Строит ключ так же, как requests собирает запрос (кодирование URL и тела).
+        allow_redirects входит в ключ: ответ с редиректом и конечная страница — разные записи.
+        """
+        prepared = requests.Request(method.upper(), url, params=params, data=data, json=json).prepare()
+        return (prepared.method, prepared.url, prepared.body, bool(allow_redirects))
+
+    def should_cache(self, method: str, cache: Optional[bool] = None, headers=None, stream=False) -> bool:
+        """
+        cache=None — решение по методу (только идемпотентные GET/HEAD без своих заголовков),
+        cache=False — запрос всегда идет на сервер, cache=True — принудительно кэшировать.
+        """
+        if stream:
+            return False
+        if cache is not None:
+            return cache
+        return method.upper() in self.CACHEABLE_METHODS and not headers
+
+    def get(self, key: Tuple) -> Optional[requests.Response]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return entry[0].to_response()
+
+    def put(self, key: Tuple, response: requests.Response, size: int):
+        if size > self.max_bytes:
+            return
+        response = CachedResponse.from_response(response)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= old[1]
+            self._entries[key] = (response, size)
+            self._size += size
+            while self._entries and (len(self._entries) > self.max_entries or self._size > self.max_bytes):
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._size
@@ -1,8 +1,18 @@
-import requests
-from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import os
+import threading
+from contextlib import nullcontext
 from typing import List
-from core.base_plugin import ScanContext, ScanResult
+from core.base_plugin import ScanContext, ScanResult, ScanResultList
 from core.plugin_manager import PluginManager
+from core.scheduler import WorkScheduler
+from core.cache import ResponseCache
+from core.source_tree import SourceTree
+from core.stats import ScanStats
+from core.whitebox import WhiteboxExecutor
+from core.throttle import AdaptiveThrottle
+from core.transport import AsyncTransport, HttpTransport
+from core.url_clusters import DEFAULT_SAMPLES_PER_TEMPLATE, UrlTemplateIndex
 
 class ScannerEngine:
     """
@@ -11,20 +21,53 @@ class ScannerEngine:
     def __init__(self, plugin_manager: PluginManager):
         self.pm = plugin_manager
         self.max_workers = 5 # Ограничение на количество параллельных потоков
+        self.async_limit = 200 # Ограничение на количество запросов в полёте в режиме 'async'
 
-    def start_scan(self, target_url: str, config: dict) -> List[ScanResult]:
-        
+    def start_scan(self, target_url: str, config: dict) -> ScanResultList:
+        """
+        Запускает сканирование. Возвращает список ScanResult;
+        статистика по фазам и плагинам доступна в атрибуте stats результата.
+        """
         # --- 1. Инициализация и Контекст ---
+        stats = ScanStats()
         
-        # Создаем новую сессию для каждого сканирования
-        session = requests.Session()
-        session.headers.update({"User-Agent": "SecScanner-Python-Core/1.0"})
+        # Создаем новый транспорт для каждого сканирования: пул соединений под параллелизм движка
+        workers = config.get("max_workers", self.max_workers)
+        async_mode = config.get("engine_mode") == "async"
+        # Общий кэш ответов: один и тот же URL не запрашивается повторно разными плагинами
+        cache = ResponseCache(
+            max_entries=config.get("cache_max_entries", 2048),
+            max_bytes=config.get("cache_max_bytes", 64 * 1024 * 1024)
+        ) if config.get("http_cache", True) else None
+        pool_size = config.get("async_limit", self.async_limit) if async_mode else workers
+        session = HttpTransport(
+            pool_size=pool_size,
+            timeout=config.get("timeout", HttpTransport.DEFAULT_TIMEOUT),
+            headers={"User-Agent": "SecScanner-Python-Core/1.0"},
+            cache=cache,
+            stats=stats,
+            # Тела ответов читаются потоком и обрезаются на этом пределе
+            max_response_bytes=config.get("max_response_bytes", 10 * 1024 * 1024)
+        )
         
         context = ScanContext(
             target_url=target_url,
             session=session,
-            config=config
+            response_cache=cache,
+            config=config,
+            stats=stats,
+            # Из URL одного шаблона (/item?id=1, /item?id=2, ...) аудит проверяет только первые N
+            url_templates=UrlTemplateIndex(config.get("samples_per_template", DEFAULT_SAMPLES_PER_TEMPLATE))
         )
+
+        # Адаптивный параллелизм по хостам: рост при стабильной задержке, откат при 429/503/таймаутах
+        if config.get("adaptive_concurrency", True):
+            session.throttle = AdaptiveThrottle(
+                initial=config.get("initial_concurrency", min(pool_size, self.max_workers)),
+                max_limit=pool_size,
+                max_rps=config.get("max_rps"),
+                log=context.log
+            )
         context.log(f"Начало сканирования {target_url}...")
 
         all_results: List[ScanResult] = []
@@ -33,7 +76,8 @@ class ScannerEngine:
 
         if not plugin_classes:
             context.log("ВНИМАНИЕ: Нет активных плагинов для запуска! Проверьте настройки.")
-            return []
+            stats.finish()
+            return ScanResultList([], stats)
 
         # --- 2. Разделение по фазам ---
         discovery_plugins = [cls(context) for cls in plugin_classes if cls.meta().get('type') == 'discovery']
@@ -41,55 +85,120 @@ class ScannerEngine:
         whitebox_plugins = [cls(context) for cls in plugin_classes if cls.meta().get('type') == 'whitebox']
        
         # --- 3. Фаза Discovery (Последовательно) ---
-        context.log("Phase 1: Discovery (Crawler, FormFinder)")
-        for plugin in discovery_plugins:
-            plugin.setup()
-            plugin.run()
-            plugin.teardown()
-            
-        context.log(f"Discovery завершено. Найдено URL: {len(context.discovered_urls)}, Форм: {len(context.discovered_forms)}")
-
+        # В режиме pipeline Discovery идет в фоне, а аудит потребляет URL и формы по мере появления
+        pipeline = config.get("pipeline", False)
+        discovery_thread = threading.Thread(target=self._run_discovery, args=(context, discovery_plugins))
+        if pipeline:
+            context.log("Pipeline mode: Discovery и Audit выполняются одновременно")
+            discovery_thread.start()
+        else:
+            self._run_discovery(context, discovery_plugins)
 
         # --- 4. Фаза Audit (Параллельно) ---
         context.log("Phase 2: Audit (SQLi, XSS, Fuzzing)")
+
+        with stats.phase("audit"):
+            if async_mode:
+                # Один event loop вместо пула потоков
+                audit_results = asyncio.run(self._run_audit_async(context, audit_plugins))
+            else:
+                audit_results = self._run_audit_threaded(context, audit_plugins, workers)
+        stats.count_findings("audit", audit_results)
+        all_results.extend(audit_results)
+
+        if pipeline:
+            discovery_thread.join()
         
-        audit_futures = []
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            # Сначала отправляем ВСЕ задачи
-            for plugin in audit_plugins:
-                audit_futures.append(executor.submit(self._run_audit_plugin, plugin))
-            
-            # Затем собираем результаты по мере готовности
-            from concurrent.futures import as_completed
-            for future in as_completed(audit_futures):
-                try:
-                    res = future.result()
-                    all_results.extend(res)
-                except Exception as exc:
-                     context.log(f"Thread Error: {exc}")
-        
-        # --- 5. Фаза White Box (Последовательно, т.к. может быть ресурсоемко) ---
+        # --- 5. Фаза White Box (CPU-bound: параллельно в пуле процессов) ---
         if config.get("local_source_path"):
             context.log("Phase 3: White Box (Code Analysis)")
-            for plugin in whitebox_plugins:
-                plugin.setup()
-                results = plugin.run()
-                all_results.extend(results)
-                plugin.teardown()
+            source_path = config["local_source_path"]
+            with stats.phase("whitebox"):
+                if os.path.isdir(source_path):
+                    # Один обход дерева исходников на все white-box плагины
+                    context.source_tree = SourceTree.scan(
+                        source_path, cache_bytes=config.get("source_cache_bytes", 32 * 1024 * 1024))
+                    context.log(f"Source tree: {len(context.source_tree.files)} файлов, "
+                                f"{context.source_tree.total_size // 1024} KB")
+                executor = WhiteboxExecutor(max_workers=config.get("whitebox_workers"), log=context.log)
+                whitebox_results = executor.run(whitebox_plugins, self.pm.plugin_files)
+            stats.count_findings("whitebox", whitebox_results)
+            all_results.extend(whitebox_results)
         else:
             context.log("Phase 3: White Box skipped (no source path provided)")
         
         
+        session.close()
+        if session.throttle is not None:
+            context.log(f"Throttle summary: {session.throttle.summary()}")
+        if cache is not None:
+            context.log(f"HTTP cache: hits={cache.hits}, misses={cache.misses}, entries={len(cache)}")
+        if context.url_templates.skipped:
+            context.log(f"URL templates: {context.url_templates.templates}, "
+                        f"пропущено однотипных URL: {context.url_templates.skipped}")
+        if len(context.baselines):
+            context.log(f"Baselines: {len(context.baselines)}, с динамическими участками: {context.baselines.unstable}")
+        stats.finish()
+        context.log(f"Stats: {stats.summary()}")
         context.log("Сканирование завершено.")
-        return all_results
+        return ScanResultList(all_results, stats)
+
+    def _run_discovery(self, context: ScanContext, discovery_plugins):
+        """Фаза Discovery; по завершении закрывает потоки URL и форм"""
+        context.log("Phase 1: Discovery (Crawler, FormFinder)")
+        stats = context.stats
+        try:
+            with stats.phase("discovery") if stats is not None else nullcontext():
+                for plugin in discovery_plugins:
+                    try:
+                        with self._track(context, "discovery", plugin):
+                            plugin.setup()
+                            results = plugin.run()
+                            plugin.teardown()
+                        if stats is not None and results:
+                            stats.count_findings("discovery", results)
+                    except Exception as e:
+                        context.log(f"FATAL error in {plugin.meta()['name']}: {e}")
+        finally:
+            context.finish_discovery()
+        forms = context.discovered_forms
+        context.log(f"Discovery завершено. Найдено URL: {len(context.discovered_urls)}, Форм: {len(forms)}"
+                    f" (уникальных из {getattr(forms, 'occurrences', len(forms))})")
+
+    def _run_audit_threaded(self, context: ScanContext, audit_plugins, workers: int) -> List[ScanResult]:
+        """Запускает единицы работы аудиторских плагинов в общем пуле потоков"""
+        return WorkScheduler(max_workers=workers, log=context.log).run(audit_plugins)
 
-    def _run_audit_plugin(self, plugin) -> List[ScanResult]:
-        """Внутренний метод для запуска аудиторского плагина"""
+    async def _run_audit_async(self, context: ScanContext, audit_plugins) -> List[ScanResult]:
+        """Запускает аудиторские плагины в одном event loop с общим асинхронным транспортом"""
+        limit = context.config.get("async_limit", self.async_limit)
+        async with AsyncTransport(context.session, limit=limit, timeout=context.session.timeout) as transport:
+            context.async_http = transport
+            context.log(f"Async mode: backend={transport.backend}, limit={limit}")
+            try:
+                batches = await asyncio.gather(
+                    *(self._run_audit_plugin_async(plugin) for plugin in audit_plugins)
+                )
+            finally:
+                context.async_http = None
+        return [r for batch in batches for r in batch]
+
+    async def _run_audit_plugin_async(self, plugin) -> List[ScanResult]:
+        """Запускает один аудиторский плагин через run_async()"""
         try:
-            plugin.setup()
-            results = plugin.run()
-            plugin.teardown()
+            # CPU не учитываем: поток event loop делят все плагины
+            with self._track(plugin.context, "audit", plugin, cpu=False):
+                plugin.setup()
+                results = await plugin.run_async()
+                plugin.teardown()
             return results
         except Exception as e:
-            plugin.context.log(f"FATAL error in {plugin.meta['name']}: {e}")
-            return []
\ No newline at end of file
+            plugin.context.log(f"FATAL error in {plugin.meta()['name']}: {e}")
+            return []
+
+    @staticmethod
+    def _track(context: ScanContext, phase: str, plugin, cpu: bool = True):
+        """Учет времени и запросов плагина в статистике сканирования"""
+        if context.stats is None:
+            return nullcontext()
+        return context.stats.track(phase, plugin.meta()['name'], cpu=cpu)
@@ -0,0 +1,92 @@
+import posixpath
+import re
+import string
+from collections import deque
+from typing import Tuple
+from urllib.parse import parse_qsl, quote, urlencode, urlsplit, urlunsplit
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# Символы пути, которые не нужно кодировать (RFC 3986: sub-delims, ':' '@' '/' и уже закодированные)
+_PATH_SAFE = "/:@!$&'()*+,;=%"
+_UNRESERVED = set(string.ascii_letters + string.digits + "-._~")
+_ESCAPE = re.compile(r"%([0-9A-Fa-f]{2})")
+
+
+def _normalize_escape(match) -> str:
+    """%7e -> ~, %2f -> %2F: декодируем только незарезервированные символы"""
+    char = chr(int(match.group(1), 16))
+    return char if char in _UNRESERVED else "%" + match.group(1).upper()
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Приводит URL к канонической форме для дедупликации:
+    схема и хост в нижнем регистре, без порта по умолчанию и фрагмента,
+    точки в пути разрешены, единообразное percent-кодирование,
+    параметры запроса отсортированы, без завершающего слэша (кроме корня).
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    netloc = f"[{host}]" if ":" in host else host  # IPv6
+    if parts.username:
+        netloc = f"{parts.username}{':' + parts.password if parts.password else ''}@{netloc}"
+    if port and port != DEFAULT_PORTS.get(scheme):
+        netloc = f"{netloc}:{port}"
+
+    path = quote(_ESCAPE.sub(_normalize_escape, parts.path), safe=_PATH_SAFE) or "/"
+    if "/." in path:
+        path = posixpath.normpath(path)
+        if path.startswith("//"):
+            path = "/" + path.lstrip("/")
+    if len(path) > 1 and path.endswith("/"):
+        path = path.rstrip("/") or "/"
+
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, netloc, path, query, ""))
+
+
+class CrawlFrontier:
+    """
+    Очередь обхода краулера: FIFO (deque) и множество уже виденных канонических URL.
+    Каждый URL попадает в очередь ровно один раз, поэтому время и память обхода
+    растут с числом уникальных страниц, а не ссылок.
+    """
+    def __init__(self):
+        self._queue: deque = deque()
+        self._seen = set()
+
+    def add(self, url: str, depth: int = 0) -> bool:
+        """Добавляет URL (без фрагмента); False — такой URL уже был в очереди"""
+        key = canonicalize_url(url)
+        if key in self._seen:
+            return False
+        self._seen.add(key)
+        self._queue.append((url.split("#", 1)[0], depth))
+        return True
+
+    def mark_seen(self, url: str):
+        """Отмечает URL виденным без постановки в очередь (уже посещен, например до возобновления)"""
+        self._seen.add(canonicalize_url(url))
+
+    def pop(self) -> Tuple[str, int]:
+        """Следующий URL для загрузки и его глубина"""
+        return self._queue.popleft()
+
+    def seen(self, url: str) -> bool:
+        return canonicalize_url(url) in self._seen
+
+    @property
+    def seen_count(self) -> int:
+        return len(self._seen)
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def __bool__(self) -> bool:
+        return bool(self._queue)
@@ -0,0 +1,203 @@
+import re
+from dataclasses import dataclass, field
+from html import unescape
+from html.parser import HTMLParser
+from typing import Callable, Dict, List, Optional
+
+try:
+    from lxml import etree
+except ImportError:  # lxml не обязателен: без него используется сканер тегов
+    etree = None
+
+# Элементы форм, которые нужны discovery-плагинам
+FIELD_TAGS = ('input', 'textarea', 'select')
+
+# Content-Type страниц, которые имеет смысл загружать и разбирать в discovery
+HTML_CONTENT_TYPES = ('text/html', 'application/xhtml+xml')
+
+
+@dataclass
+class FormField:
+    """Поле формы как в разметке: отсутствующие атрибуты — None"""
+    tag: str
+    name: Optional[str]
+    type: Optional[str]
+    value: Optional[str]
+
+
+@dataclass
+class ParsedForm:
+    action: Optional[str]
+    method: Optional[str]
+    fields: List[FormField] = field(default_factory=list)
+
+
+@dataclass
+class ParsedPage:
+    """Результат целевого разбора страницы: только ссылки и формы"""
+    links: List[str] = field(default_factory=list)   # Значения href тегов <a> (как в разметке)
+    forms: List[ParsedForm] = field(default_factory=list)
+
+
+class _Extractor:
+    """
+    Общая логика потокового извлечения (SAX): дерево документа не строится,
+    материализуются только <a href>, <form> и их поля.
+    """
+    def __init__(self):
+        self.page = ParsedPage()
+        self._form: Optional[ParsedForm] = None
+
+    def start(self, tag: str, attrs: Dict[str, Optional[str]]):
+        if tag == 'a':
+            href = attrs.get('href')
+            if href is not None:
+                self.page.links.append(href)
+        elif tag == 'form':
+            # Вложенные формы браузер игнорирует: поля относятся к внешней
+            if self._form is None:
+                self._form = ParsedForm(attrs.get('action'), attrs.get('method'))
+                self.page.forms.append(self._form)
+        elif tag in FIELD_TAGS and self._form is not None:
+            self._form.fields.append(FormField(tag, attrs.get('name'), attrs.get('type'), attrs.get('value')))
+
+    def end(self, tag: str):
+        if tag == 'form':
+            self._form = None
+
+
+class _StreamingParser(HTMLParser):
+    """Потоковый парсер на стандартной библиотеке"""
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.extractor = _Extractor()
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'a' or tag == 'form' or tag in FIELD_TAGS:
+            self.extractor.start(tag, dict(attrs))
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+
+    def handle_endtag(self, tag):
+        if tag == 'form':
+            self.extractor.end(tag)
+
+
+# Сканер тегов: комментарии и содержимое script/style пропускаются целиком,
+# из остальной разметки выбираются только нужные теги. Длина значения атрибута ограничена,
+# чтобы незакрытая кавычка не приводила к квадратичному поиску.
+_TAG_SCANNER = re.compile(
+    r"<!--.*?-->"
+    r"|<(?P<raw>script|style)\b[^>]*>.*?</(?P=raw)\s*>"
+    r"|<(?P<end>/?)(?P<tag>a|form|input|textarea|select)\b"
+    r"(?P<attrs>(?:[^>\"']|\"[^\"]{0,8192}\"|'[^']{0,8192}')*)>",
+    re.IGNORECASE | re.DOTALL
+)
+_TEXTAREA_END = re.compile(r"</textarea\s*>", re.IGNORECASE)
+_ATTRIBUTE = re.compile(r"""([^\s"'>/=]+)(\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]*)))?""")
+
+
+def _attributes(raw: str) -> Dict[str, Optional[str]]:
+    attrs = {}
+    for name, assignment, dq, sq, bare in _ATTRIBUTE.findall(raw):
+        # Атрибут без значения (<input disabled>) — None, как в html.parser
+        attrs[name.lower()] = unescape(dq or sq or bare) if assignment else None
+    return attrs
+
+
+def _parse_fast(html: str) -> ParsedPage:
+    """Потоковый сканер тегов на регулярных выражениях (самый быстрый без lxml)"""
+    extractor = _Extractor()
+    pos = 0
+    while True:
+        match = _TAG_SCANNER.search(html, pos)
+        if match is None:
+            break
+        pos = match.end()
+        tag = match.group('tag')
+        if tag is None:
+            continue  # Комментарий или script/style
+        tag = tag.lower()
+        if match.group('end'):
+            extractor.end(tag)
+            continue
+        extractor.start(tag, _attributes(match.group('attrs')))
+        if tag == 'textarea':
+            # Содержимое textarea — текст, а не разметка
+            close = _TEXTAREA_END.search(html, pos)
+            if close is not None:
+                pos = close.start()
+    return extractor.page
+
+
+class _LxmlTarget(_Extractor):
+    """Цель парсера lxml: события start/end приходят из C-парсера"""
+    def data(self, data):
+        pass
+
+    def close(self):
+        return self.page
+
+
+def _parse_stdlib(html: str) -> ParsedPage:
+    parser = _StreamingParser()
+    parser.feed(html)
+    parser.close()
+    return parser.extractor.page
+
+
+def _parse_lxml(html: str) -> ParsedPage:
+    if not html.strip():
+        return ParsedPage()
+    # Байты, а не str: lxml отвергает строки с объявлением кодировки
+    parser = etree.HTMLParser(target=_LxmlTarget(), encoding='utf-8')
+    return etree.fromstring(html.encode('utf-8', errors='replace'), parser)
+
+
+def _parse_bs4(html: str) -> ParsedPage:
+    """Разбор через BeautifulSoup, но в дерево попадают только <a> и <form> (SoupStrainer)"""
+    from bs4 import BeautifulSoup, SoupStrainer
+    soup = BeautifulSoup(html, 'lxml' if etree is not None else 'html.parser',
+                         parse_only=SoupStrainer(['a', 'form']))
+    page = ParsedPage()
+    for tag in soup.find_all(['a', 'form']):
+        if tag.name == 'a':
+            if tag.get('href') is not None:
+                page.links.append(tag['href'])
+        elif tag.find_parent('form') is None:
+            form = ParsedForm(tag.get('action'), tag.get('method'))
+            for inp in tag.find_all(list(FIELD_TAGS)):
+                form.fields.append(FormField(inp.name, inp.get('name'), inp.get('type'), inp.get('value')))
+            page.forms.append(form)
+    return page
+
+
+BACKENDS: Dict[str, Callable[[str], ParsedPage]] = {
+    'lxml': _parse_lxml,
+    'fast': _parse_fast,
+    'stdlib': _parse_stdlib,
+    'bs4': _parse_bs4,
+}
+
+
+def default_backend() -> str:
+    return 'lxml' if etree is not None else 'fast'
+
+
+def parse_html(html: str, backend: Optional[str] = None) -> ParsedPage:
+    """
+    Извлекает ссылки и формы из HTML.
+    backend: 'lxml' (C-парсер), 'fast' (сканер тегов), 'stdlib' (html.parser, SAX),
+    'bs4' (BeautifulSoup + SoupStrainer) или None/'auto' — самый быстрый доступный
+    (параметр конфига html_parser).
+    """
+    if not backend or backend == 'auto':
+        backend = default_backend()
+    if backend == 'lxml' and etree is None:
+        backend = 'fast'
+    try:
+        parse = BACKENDS[backend]
+    except KeyError:
+        raise ValueError(f"Unknown HTML parser backend: {backend}")
+    return parse(html)
@@ -2,7 +2,7 @@ import os
 import json
 import importlib.util
 import inspect
-from typing import List, Type
+from typing import Dict, List, Type
 from core.base_plugin import BasePlugin
 
 class PluginManager:
@@ -14,6 +14,7 @@ class PluginManager:
         self.config_file = config_file
         self.loaded_plugin_classes: List[Type[BasePlugin]] = []
         self.enabled_plugins: List[str] = [] # Хранит имена (meta['name']) активных плагинов
+        self.plugin_files: Dict[Type[BasePlugin], str] = {} # Класс -> файл модуля (для загрузки в дочерних процессах)
 
     def discover_plugins(self):
         """Сканирует папку и загружает классы, затем загружает конфиг выбора."""
@@ -42,6 +43,7 @@ class PluginManager:
                     # Проверяем, что класс еще не загружен
                     if obj not in self.loaded_plugin_classes:
                         self.loaded_plugin_classes.append(obj)
+                        self.plugin_files[obj] = os.path.abspath(file_path)
         except Exception as e:
             print(f"[!] Error loading {filename}: {e}")
 
@@ -57,8 +59,9 @@ class PluginManager:
             except Exception as e:
                 print(f"[!] Error reading config: {e}")
         else:
-            # Если конфига нет, включаем все плагины по умолчанию
-            self.enabled_plugins = [cls.meta()['name'] for cls in self.loaded_plugin_classes]
+            # Если конфига нет, включаем все плагины, кроме выключенных по умолчанию (default_enabled)
+            self.enabled_plugins = [cls.meta()['name'] for cls in self.loaded_plugin_classes
+                                    if cls.meta().get('default_enabled', True)]
             self._save_config()
 
     def _save_config(self):
@@ -0,0 +1,155 @@
+import queue
+import threading
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, List, Optional
+from core.base_plugin import BasePlugin, ScanResult
+
+WorkUnit = Callable[[], List[ScanResult]]
+
+_END = object()  # Маркер конца единиц работы плагина
+
+
+class _PluginWork:
+    """
+    Состояние одного плагина внутри планировщика.
+    Единицы работы вычитываются из генератора плагина отдельным потоком-подавателем:
+    генератор может блокироваться в ожидании потока Discovery, не останавливая остальных.
+    """
+    def __init__(self, plugin: BasePlugin, units: Iterable[WorkUnit], backlog: int,
+                 wake: threading.Event, log, phase: str):
+        self.plugin = plugin
+        self.phase = phase
+        self.in_flight = 0
+        self.exhausted = False
+        self.finished = False
+        self.next_index = 0
+        self.results = {}  # индекс единицы -> результаты (для детерминированного порядка)
+        self._queue = queue.Queue(maxsize=backlog)
+        self._wake = wake
+        self._log = log
+        self._feeder = threading.Thread(target=self._feed, args=(units,), daemon=True)
+        self._feeder.start()
+
+    @property
+    def name(self) -> str:
+        return self.plugin.meta()['name']
+
+    def _feed(self, units: Iterable[WorkUnit]):
+        stats = self.plugin.context.stats
+        try:
+            # Запросы, сделанные генератором, тоже приписываются плагину
+            with stats.attribute(self.phase, self.name) if stats is not None else nullcontext():
+                for unit in units:
+                    self._queue.put(unit)
+                    self._wake.set()
+        except Exception as e:
+            self._log(f"FATAL error in {self.name}: {e}")
+        finally:
+            self._queue.put(_END)
+            self._wake.set()
+
+    def take(self) -> Optional[WorkUnit]:
+        """Берет готовую единицу работы без ожидания; помечает плагин исчерпанным по маркеру конца"""
+        if self.exhausted:
+            return None
+        try:
+            unit = self._queue.get_nowait()
+        except queue.Empty:
+            return None
+        if unit is _END:
+            self.exhausted = True
+            return None
+        stats = self.plugin.context.stats
+        return stats.bind(self.phase, self.name, unit) if stats is not None else unit
+
+    @property
+    def done(self) -> bool:
+        return self.exhausted and self.in_flight == 0
+
+    def collected(self) -> List[ScanResult]:
+        return [r for i in sorted(self.results) for r in self.results[i]]
+
+
+class WorkScheduler:
+    """
+    Глобальный планировщик фазы Audit.
+    Плагины отдают независимые единицы работы (BasePlugin.work_units), а планировщик
+    раздает их общему пулу потоков, каждый раз выбирая плагин с наименьшим числом
+    выполняющихся единиц. Так медленный плагин не занимает один поток, пока остальные простаивают.
+    Плагин без work_units() выполняется одной единицей через run().
+    """
+    def __init__(self, max_workers: int, log: Callable[[str], None] = print, phase: str = "audit"):
+        self.max_workers = max_workers
+        self.log = log
+        self.phase = phase
+
+    def run(self, plugins: List[BasePlugin]) -> List[ScanResult]:
+        wake = threading.Event()
+        work = []
+        for plugin in plugins:
+            try:
+                plugin.setup()
+                units = plugin.work_units()
+                work.append(_PluginWork(
+                    plugin, units if units is not None else [plugin.run],
+                    backlog=self.max_workers * 4, wake=wake, log=self.log, phase=self.phase
+                ))
+            except Exception as e:
+                self.log(f"FATAL error in {plugin.meta()['name']}: {e}")
+
+        pending = {}
+        cursor = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while True:
+                wake.clear()
+
+                # 1. Собираем завершенные единицы
+                for future in [f for f in pending if f.done()]:
+                    item, index = pending.pop(future)
+                    item.in_flight -= 1
+                    try:
+                        item.results[index] = future.result() or []
+                    except Exception as e:
+                        self.log(f"FATAL error in {item.name}: {e}")
+                    self._finish(item)
+
+                # 2. Заполняем свободные слоты, соблюдая справедливость между плагинами
+                while len(pending) < self.max_workers:
+                    cursor += 1
+                    # Меньше всего выполняющихся единиц; при равенстве — по кругу
+                    candidates = sorted(
+                        (w for w in work if not w.exhausted),
+                        key=lambda w: (w.in_flight, (work.index(w) - cursor) % len(work))
+                    )
+                    submitted = False
+                    for item in candidates:
+                        unit = item.take()
+                        if unit is None:
+                            self._finish(item)
+                            continue
+                        future = executor.submit(unit)
+                        future.add_done_callback(lambda _: wake.set())
+                        pending[future] = (item, item.next_index)
+                        item.next_index += 1
+                        item.in_flight += 1
+                        submitted = True
+                        break
+                    if not submitted:
+                        break
+
+                if not pending and all(w.exhausted for w in work):
+                    break
+
+                # 3. Ждем завершения единицы или появления новой работы
+                wake.wait(timeout=1.0)
+
+        return [r for item in work for r in item.collected()]
+
+    def _finish(self, item: _PluginWork):
+        if item.done and not item.finished:
+            item.finished = True
+            try:
+                item.plugin.teardown()
+            except Exception as e:
+                self.log(f"Teardown error in {item.name}: {e}")
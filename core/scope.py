@@ -0,0 +1,110 @@
+import fnmatch
+import re
+from typing import Any, Dict, Iterable, Optional, Pattern
+from urllib.parse import urlsplit
+
+from core.frontier import DEFAULT_PORTS
+
+# Расширения статических ресурсов: их незачем обходить и атаковать
+STATIC_EXTENSIONS = (
+    "css", "js", "map", "png", "jpg", "jpeg", "gif", "svg", "ico", "webp", "bmp",
+    "woff", "woff2", "ttf", "eot", "otf", "mp3", "mp4", "avi", "webm", "pdf",
+)
+
+
+def _compile_globs(patterns: Iterable[str]) -> Optional[Pattern]:
+    """Список glob-шаблонов -> одно регулярное выражение"""
+    patterns = list(patterns or ())
+    if not patterns:
+        return None
+    return re.compile("|".join(f"(?:{fnmatch.translate(p)})" for p in patterns), re.IGNORECASE)
+
+
+def _compile_regexes(patterns: Iterable[str]) -> Optional[Pattern]:
+    patterns = list(patterns or ())
+    if not patterns:
+        return None
+    try:
+        return re.compile("|".join(f"(?:{p})" for p in patterns))
+    except re.error as e:
+        raise ValueError(f"Invalid scope regex {patterns}: {e}")
+
+
+def _netloc(parts) -> str:
+    """host[:port] без порта по умолчанию, в нижнем регистре"""
+    host = (parts.hostname or "").lower()
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    if port and port != DEFAULT_PORTS.get(parts.scheme.lower()):
+        return f"{host}:{port}"
+    return host
+
+
+class Scope:
+    """
+    Границы сканирования, общие для discovery и audit: glob-шаблоны хостов и путей,
+    регулярные выражения include/exclude по полному URL, исключаемые расширения
+    и максимальная глубина. Правила компилируются один раз при создании.
+
+    Шаблон хоста без порта подходит к любому порту; по умолчанию в scope
+    только хост цели (с ее портом).
+    """
+    def __init__(self, target_url: str, hosts: Iterable[str] = (), include_paths: Iterable[str] = (),
+                 exclude_paths: Iterable[str] = (), include_regex: Iterable[str] = (),
+                 exclude_regex: Iterable[str] = (), exclude_extensions: Iterable[str] = (),
+                 max_depth: Optional[int] = None):
+        self.target_url = target_url
+        self.max_depth = max_depth
+        self._hosts = _compile_globs(hosts or [_netloc(urlsplit(target_url))])
+        self._include_paths = _compile_globs(include_paths)
+        self._exclude_paths = _compile_globs(exclude_paths)
+        self._include_regex = _compile_regexes(include_regex)
+        self._exclude_regex = _compile_regexes(exclude_regex)
+        self._extensions = frozenset(ext.lower().lstrip(".") for ext in exclude_extensions or ())
+
+    @classmethod
+    def from_config(cls, target_url: str, config: Dict[str, Any]) -> "Scope":
+        """Параметры конфига: scope_hosts, scope_include, scope_exclude, scope_include_regex,
+        scope_exclude_regex, scope_exclude_extensions, crawl_max_depth"""
+        return cls(
+            target_url,
+            hosts=config.get("scope_hosts"),
+            include_paths=config.get("scope_include"),
+            exclude_paths=config.get("scope_exclude"),
+            include_regex=config.get("scope_include_regex"),
+            exclude_regex=config.get("scope_exclude_regex"),
+            exclude_extensions=config.get("scope_exclude_extensions"),
+            max_depth=config.get("crawl_max_depth"),
+        )
+
+    def allows(self, url: str, depth: Optional[int] = None) -> bool:
+        """True — URL в scope (depth — глубина обхода, если известна)"""
+        if depth is not None and self.max_depth is not None and depth > self.max_depth:
+            return False
+        parts = urlsplit(url)
+        if parts.scheme.lower() not in DEFAULT_PORTS:
+            return False  # mailto:, javascript: и т.п.
+
+        netloc = _netloc(parts)
+        if not self._hosts.match(netloc) and not self._hosts.match(netloc.rsplit(":", 1)[0]):
+            return False
+
+        path = parts.path or "/"
+        if self._include_paths is not None and not self._include_paths.match(path):
+            return False
+        if self._exclude_paths is not None and self._exclude_paths.match(path):
+            return False
+        if self._extensions:
+            name = path.rsplit("/", 1)[-1]
+            if "." in name and name.rsplit(".", 1)[-1].lower() in self._extensions:
+                return False
+        if self._include_regex is not None and not self._include_regex.search(url):
+            return False
+        if self._exclude_regex is not None and self._exclude_regex.search(url):
+            return False
+        return True
+
+    def allows_depth(self, depth: int) -> bool:
+        return self.max_depth is None or depth <= self.max_depth
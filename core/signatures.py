@@ -0,0 +1,143 @@
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+SQL = "sql"                # Ошибки СУБД и драйверов
+STACKTRACE = "stacktrace"  # Трассировки стека языков и платформ
+FRAMEWORK = "framework"    # Отладочные страницы и ошибки фреймворков
+
+
+@dataclass(frozen=True)
+class Signature:
+    """
+    Сигнатура ошибки в ответе: регулярное выражение, категория и СУБД (если есть).
+    triggers — литералы, хотя бы один из которых входит в любое совпадение pattern;
+    по ним сигнатура находит кандидатов (см. SignatureMatcher).
+    """
+    name: str
+    pattern: str
+    triggers: Tuple[str, ...]
+    category: str
+    dbms: Optional[str] = None
+
+
+class SignatureMatch(NamedTuple):
+    signature: Signature
+    text: str  # Совпавший фрагмент ответа
+
+
+# Чувствительны к регистру, как и сами сообщения. Совпадение не длиннее SignatureMatcher.WINDOW.
+# Триггеры по возможности начинаются с заглавной буквы или знака: позиций-кандидатов меньше
+SIGNATURES = (
+    Signature("mysql-syntax", r"You have an error in your SQL syntax|check the manual that corresponds to your "
+                              r"(?:MySQL|MariaDB) server version|SQL syntax.{0,80}?MySQL",
+              ("SQL", "MariaDB"), SQL, "MySQL"),
+    Signature("mysql-function", r"mysqli?_(?:fetch_\w+|num_rows|query|connect|result)\(|"
+                                r"mysql_fetch|Warning.{0,40}?mysqli?_",
+              ("_fetch", "_num_rows", "_query", "_connect", "_result", "Warning"), SQL, "MySQL"),
+    Signature("mysql-driver", r"MySQLSyntaxErrorException|com\.mysql\.jdbc|MySqlException|pymysql\.err|"
+                              r"MySQLdb\.\w*(?:Error|exceptions)",
+              ("SQL", "Sql", ".jdbc", ".err"), SQL, "MySQL"),
+    Signature("postgresql", r"PostgreSQL.{0,40}?ERROR|ERROR:\s+syntax error at or near|pg_(?:query|exec)\(\)|"
+                            r"PG::\w+Error|psycopg2?\.\w*(?:errors|Error)|org\.postgresql\.util\.PSQLException|"
+                            r"unterminated quoted string at or near",
+              ("SQL", "ERROR", "_query", "_exec", "::", "Error", ".errors", "quoted string"), SQL, "PostgreSQL"),
+    Signature("mssql", r"Unclosed quotation mark after the character string|Microsoft OLE DB Provider for SQL Server|"
+                       r"\[SQL Server\]|System\.Data\.SqlClient\.SqlException|Incorrect syntax near",
+              ("SQL", "Sql", "Unclosed quotation", "Incorrect syntax"), SQL, "MSSQL"),
+    Signature("oracle", r"ORA-\d{5}|quoted string not properly terminated|oracle\.jdbc",
+              ("ORA-", "quoted string", ".jdbc"), SQL, "Oracle"),
+    Signature("sqlite", r"sqlite3\.OperationalError|SQLite3?::\w+|SQLITE_ERROR|SQLiteException|"
+                        r"unrecognized token:|near \"[^\"]{0,40}\": syntax error",
+              (".OperationalError", "SQL", "unrecognized token", "yntax error"), SQL, "SQLite"),
+    Signature("db2", r"DB2 SQL error|CLI Driver.{0,40}?DB2|SQLCODE=-\d+",
+              ("SQL", "CLI Driver"), SQL, "DB2"),
+    Signature("orm-statement", r"ActiveRecord::StatementInvalid|Illuminate\\Database\\QueryException|"
+                               r"django\.db\.utils\.\w+Error|sqlalchemy\.exc\.\w+Error|"
+                               r"org\.hibernate\.exception\.\w+",
+              ("::", "QueryException", ".db.utils.", ".exc.", ".hibernate."), SQL),
+    # Общие признаки без конкретной СУБД (в т.ч. собственные сообщения приложений)
+    Signature("sql-syntax", r"SQL syntax|SQL_SYNTAX_ERROR|[Ss]yntax error|SYNTAX ERROR",
+              ("SQL", "yntax error", "ERROR"), SQL),
+
+    Signature("python-traceback", r"Traceback \(most recent call last\)", ("Traceback",), STACKTRACE),
+    Signature("java-exception", r"at (?:java|javax|org|com)\.[\w$.]+\(\w+\.java:\d+\)|"
+                                r"java\.lang\.\w+(?:Exception|Error)\b",
+              (".java:", ".lang."), STACKTRACE),
+    Signature("dotnet-exception", r"Server Error in '[^']{0,80}' Application|System\.\w+(?:\.\w+)*Exception\b",
+              ("Server Error in", "System."), STACKTRACE),
+    Signature("node-stack", r"at \S+ \((?:/|[A-Z]:\\)[^)\n]{1,200}\.js:\d+:\d+\)", (".js:",), STACKTRACE),
+    Signature("php-error", r"<b>(?:Fatal error|Warning|Parse error|Notice)</b>:.{0,300}? on line <b>\d+</b>|"
+                           r"PHP (?:Fatal error|Warning|Parse error):",
+              ("</b>:", "PHP "), FRAMEWORK),
+    Signature("django-debug", r"You're seeing this error because you have <code>DEBUG = True</code>",
+              ("DEBUG = True",), FRAMEWORK),
+    Signature("werkzeug-debug", r"Werkzeug Debugger|werkzeug\.exceptions\.\w+", ("Werkzeug", ".exceptions."), FRAMEWORK),
+    Signature("rails-error", r"Action Controller: Exception caught", ("Action Controller",), FRAMEWORK),
+)
+
+
+def _overlaps(trigger: str, other: str) -> bool:
+    """other может начинаться внутри совпадения trigger"""
+    return other in trigger or any(trigger.endswith(other[:k]) for k in range(1, min(len(trigger), len(other))))
+
+
+class SignatureMatcher:
+    """
+    Поиск всех сигнатур за один проход по телу ответа. Триггеры всех сигнатур собраны
+    в одно регулярное выражение из литералов (re быстро пропускает позиции по первому
+    символу); полные выражения сигнатур проверяются только в окне вокруг найденного
+    триггера. Одно выражение из всех сигнатур целиком в re в разы медленнее:
+    в каждой позиции пробуются десятки ветвей.
+    """
+    WINDOW = 512  # Максимальная длина совпадения сигнатуры
+
+    def __init__(self, signatures: Iterable[Signature] = SIGNATURES, categories: Optional[Iterable[str]] = None):
+        categories = set(categories) if categories is not None else None
+        self.signatures = [s for s in signatures if categories is None or s.category in categories]
+        self._patterns = {s.name: re.compile(s.pattern) for s in self.signatures}
+        self._by_trigger: Dict[str, List[Signature]] = {}
+        for signature in self.signatures:
+            for trigger in signature.triggers:
+                self._by_trigger.setdefault(trigger, []).append(signature)
+        # finditer не находит триггеры, перекрытые уже найденным (".OperationalError" и "Error",
+        # "ERROR" и "ORA-"), поэтому совпавший триггер проверяет и их сигнатуры
+        triggers = sorted(self._by_trigger, key=len, reverse=True)
+        candidates = {t: list(self._by_trigger[t]) for t in triggers}
+        for trigger in triggers:
+            for other in triggers:
+                if other != trigger and _overlaps(trigger, other):
+                    candidates[trigger] += [s for s in self._by_trigger[other] if s not in candidates[trigger]]
+        self._by_trigger = candidates
+        self._triggers = re.compile("|".join(map(re.escape, triggers)))
+
+    def search(self, text: str) -> Optional[SignatureMatch]:
+        """Первое совпадение в тексте или None"""
+        matches = self.find_all(text)
+        return matches[0] if matches else None
+
+    def find_all(self, text: str) -> List[SignatureMatch]:
+        """По одному совпадению на каждую найденную сигнатуру, в порядке появления в тексте"""
+        found: Dict[str, Tuple[int, SignatureMatch]] = {}
+        searched: Dict[str, int] = {}  # Сигнатура -> до какой позиции текст уже проверен
+        for hit in self._triggers.finditer(text):
+            for signature in self._by_trigger[hit.group()]:
+                if signature.name in found:
+                    continue
+                start = max(hit.start(), searched.get(signature.name, 0)) - self.WINDOW
+                end = hit.end() + self.WINDOW
+                searched[signature.name] = end
+                match = self._patterns[signature.name].search(text, max(start, 0), end)
+                if match:
+                    found[signature.name] = (match.start(), SignatureMatch(signature, match.group()))
+        return [match for _, match in sorted(found.values(), key=lambda item: item[0])]
+
+
+# Общий экземпляр: выражение компилируется один раз на процесс
+ERROR_SIGNATURES = SignatureMatcher()
+
+
+def describe(match: SignatureMatch) -> str:
+    """Подпись совпадения для отчета: сигнатура и СУБД"""
+    signature = match.signature
+    return f"{signature.name} ({signature.dbms})" if signature.dbms else signature.name
@@ -0,0 +1,186 @@
+import difflib
+import heapq
+import html
+import re
+from typing import Any, Callable, Dict, Iterable, Optional, Set, Tuple
+from urllib.parse import quote, quote_plus
+
+# Динамический контент, который меняется между одинаковыми запросами:
+# длинные hex/base64-токены (CSRF, сессии, nonce) и числа (время, даты, счетчики)
+_DYNAMIC = re.compile(r"[A-Za-z0-9+/_-]{24,}={0,2}|[0-9a-fA-F]{16,}|\d+")
+_WORDS = re.compile(r"\w+")
+_TOKENS = re.compile(r"<[^>]*>|[^<]+")
+
+
+def reflections(value: str) -> Set[str]:
+    """Формы, в которых приложение может отразить значение: как есть, HTML-экранированное, URL-кодированное"""
+    escaped = html.escape(value)
+    return {value, escaped, escaped.replace("&#x27;", "&#39;"), html.escape(value, quote=False),
+            quote_plus(value), quote(value)}
+
+
+def mask_dynamic(text: str, ignore: Iterable[str] = ()) -> str:
+    """
+    Убирает из ответа динамические фрагменты и отражения ввода (ignore — например,
+    пейлоад и исходное значение параметра; маскируются его экранированные и URL-кодированные
+    формы в любом регистре), чтобы сравнение видело только изменения, вызванные инъекцией.
+    """
+    forms = {form for value in ignore if value for form in reflections(value)}
+    if forms:
+        pattern = "|".join(map(re.escape, sorted(forms, key=len, reverse=True)))
+        text = re.sub(pattern, "0", text, flags=re.IGNORECASE)  # Тот же заполнитель, что и для чисел
+    return _DYNAMIC.sub("0", text)
+
+
+def tokenize_markup(text: str) -> list:
+    """Токены разметки: теги и текст между ними"""
+    return _TOKENS.findall(text)
+
+
+class SimilarityEngine:
+    """
+    Оценка похожести двух ответов от 0 до 1. fingerprint() считается один раз на ответ
+    (его можно хранить), compare() сравнивает отпечатки. differs() — решение
+    «ответы отличаются» с порогом движка.
+    """
+    name = "base"
+    threshold = 0.95
+
+    def __init__(self, threshold: Optional[float] = None):
+        if threshold is not None:
+            self.threshold = threshold
+
+    def fingerprint(self, text: str) -> Any:
+        return text
+
+    def compare(self, a: Any, b: Any) -> float:
+        raise NotImplementedError
+
+    def ratio(self, a: str, b: str) -> float:
+        return self.compare(self.fingerprint(a), self.fingerprint(b))
+
+    def differs(self, a: str, b: str) -> Tuple[bool, float]:
+        """(ответы отличаются, похожесть)"""
+        return self.differs_from(self.fingerprint(a), b)
+
+    def differs_from(self, reference: Any, text: str) -> Tuple[bool, float]:
+        """Как differs(), но с готовым отпечатком эталонного ответа"""
+        score = self.compare(reference, self.fingerprint(text))
+        return score < self.threshold, score
+
+
+class DifflibEngine(SimilarityEngine):
+    """
+    Посимвольный difflib (исходное поведение). Верхние оценки real_quick_ratio/quick_ratio
+    отсекают заведомо разные ответы без квадратичного ratio().
+    """
+    name = "difflib"
+
+    def compare(self, a: str, b: str) -> float:
+        return difflib.SequenceMatcher(None, a, b).ratio()
+
+    def differs_from(self, a: str, b: str) -> Tuple[bool, float]:
+        if a == b:
+            return False, 1.0
+        matcher = difflib.SequenceMatcher(None, a, b)
+        for bound in (matcher.real_quick_ratio, matcher.quick_ratio):
+            score = bound()
+            if score < self.threshold:
+                return True, score
+        score = matcher.ratio()
+        return score < self.threshold, score
+
+
+class TokenDiffEngine(SimilarityEngine):
+    """difflib по токенам разметки (теги и текст между ними) вместо символов"""
+    name = "tokens"
+
+    def fingerprint(self, text: str) -> list:
+        return tokenize_markup(text)
+
+    def compare(self, a: list, b: list) -> float:
+        if a == b:
+            return 1.0
+        return difflib.SequenceMatcher(None, a, b, autojunk=False).ratio()
+
+
+def _shingles(text: str, size: int = 3) -> frozenset:
+    """Хэши n-грамм слов: порядок слов учитывается, дубликаты схлопываются"""
+    words = _WORDS.findall(text)
+    if len(words) < size:
+        return frozenset([hash(tuple(words))])
+    return frozenset(map(hash, zip(*(words[i:] for i in range(size)))))
+
+
+class ShingleEngine(SimilarityEngine):
+    """
+    Точное сходство Жаккара по множествам n-грамм слов (операции над множествами — в C).
+    Короткие ответы (меньше min_shingles n-грамм) сравниваются посимвольно с порогом
+    char_threshold: на них одно слово меняет слишком большую долю n-грамм.
+    """
+    name = "shingle"
+    threshold = 0.85  # Jaccard по n-граммам строже посимвольного ratio: одно слово меняет n n-грамм
+    min_shingles = 32
+    char_threshold = DifflibEngine.threshold
+
+    def fingerprint(self, text: str):
+        shingles = _shingles(text)
+        return text if len(shingles) < self.min_shingles else shingles
+
+    def compare(self, a, b) -> float:
+        if isinstance(a, str) and isinstance(b, str):
+            return difflib.SequenceMatcher(None, a, b).ratio()
+        # Короткий и длинный ответ: короткий переводится в n-граммы
+        a, b = (_shingles(x) if isinstance(x, str) else x for x in (a, b))
+        return self.compare_sets(a, b)
+
+    def differs_from(self, reference, text: str) -> Tuple[bool, float]:
+        other = self.fingerprint(text)
+        score = self.compare(reference, other)
+        short = isinstance(reference, str) and isinstance(other, str)
+        return score < (self.char_threshold if short else self.threshold), score
+
+    def compare_sets(self, a: frozenset, b: frozenset) -> float:
+        if not a and not b:
+            return 1.0
+        return len(a & b) / len(a | b)
+
+
+class MinHashEngine(ShingleEngine):
+    """
+    MinHash (bottom-k): отпечаток — k наименьших хэшей n-грамм, сравнение — оценка
+    сходства Жаккара за O(k) независимо от размера страниц. Отпечатки компактны
+    и подходят для хранения базовых ответов.
+    """
+    name = "minhash"
+    k = 256
+
+    def fingerprint(self, text: str):
+        shingles = super().fingerprint(text)
+        if isinstance(shingles, str) or len(shingles) <= self.k:
+            return shingles
+        return frozenset(heapq.nsmallest(self.k, shingles))
+
+    def compare_sets(self, a: frozenset, b: frozenset) -> float:
+        if len(a) < self.k and len(b) < self.k:
+            return super().compare_sets(a, b)  # Короткие страницы: отпечаток — полное множество
+        union = sorted(a | b)[:self.k]
+        return len((a & b).intersection(union)) / len(union)
+
+
+ENGINES: Dict[str, Callable[..., SimilarityEngine]] = {
+    "difflib": DifflibEngine,
+    "tokens": TokenDiffEngine,
+    "shingle": ShingleEngine,
+    "minhash": MinHashEngine,
+}
+
+DEFAULT_ENGINE = "minhash"
+
+
+def get_engine(name: Optional[str] = None, threshold: Optional[float] = None) -> SimilarityEngine:
+    """Движок по имени (параметры конфига similarity и similarity_threshold)"""
+    try:
+        return ENGINES[name or DEFAULT_ENGINE](threshold)
+    except KeyError:
+        raise ValueError(f"Unknown similarity engine: {name}")
@@ -0,0 +1,147 @@
+import gzip
+import io
+import xml.etree.ElementTree as ET
+from collections import deque
+from typing import BinaryIO, Callable, Iterator, List, Optional, Tuple
+from urllib.parse import urljoin
+
+from core.scope import Scope
+
+# Предел размера распакованного sitemap по протоколу sitemaps.org (защита от gzip-бомб)
+MAX_SITEMAP_BYTES = 50 * 1024 * 1024
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+def parse_robots(text: str) -> Tuple[List[str], List[str]]:
+    """
+    Разбирает robots.txt: возвращает (адреса Sitemap, пути из Allow/Disallow без шаблонов).
+    Закрытые для роботов пути — часто как раз то, что интересно сканеру.
+    """
+    sitemaps, paths = [], []
+    for line in text.splitlines():
+        line = line.split("#", 1)[0].strip()
+        if ":" not in line:
+            continue
+        field, value = line.split(":", 1)
+        field, value = field.strip().lower(), value.strip()
+        if field == "sitemap" and value:
+            sitemaps.append(value)
+        elif field in ("allow", "disallow") and value.startswith("/") and "*" not in value:
+            paths.append(value.rstrip("$"))
+    return sitemaps, paths
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def iter_sitemap(source: BinaryIO) -> Iterator[Tuple[str, str]]:
+    """
+    Потоковый разбор sitemap (iterparse): выдает ('url', loc) для <urlset>
+    и ('sitemap', loc) для <sitemapindex>. Обработанные элементы сразу удаляются
+    из дерева, поэтому память не растет с числом URL.
+    """
+    kind, root = None, None
+    for event, element in ET.iterparse(source, events=("start", "end")):
+        name = _local_name(element.tag)
+        if event == "start":
+            if root is None:
+                root = element
+            elif name in ("url", "sitemap"):
+                kind = name
+            continue
+        if name == "loc" and kind and element.text:
+            yield kind, element.text.strip()
+        elif name in ("url", "sitemap"):
+            kind = None
+            root.clear()
+
+
+class _LimitedReader(io.RawIOBase):
+    """Поток, который обрывается после limit байт"""
+    def __init__(self, source: BinaryIO, limit: int):
+        self.source = source
+        self.remaining = limit
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if self.remaining <= 0:
+            return 0
+        data = self.source.read(min(len(buffer), self.remaining))
+        self.remaining -= len(data)
+        buffer[:len(data)] = data
+        return len(data)
+
+
+class SitemapSeeder:
+    """
+    Источник начальных URL для краулера: robots.txt (Sitemap, Allow/Disallow)
+    и sitemap.xml, включая индексы sitemap и gzip. Ответы читаются потоком.
+    Sitemap вне scope (из robots.txt или индекса) не загружаются.
+    """
+    def __init__(self, session, timeout: float = 10, max_sitemaps: int = 50,
+                 max_bytes: int = MAX_SITEMAP_BYTES, log: Optional[Callable[[str], None]] = None,
+                 scope: Optional[Scope] = None):
+        self.session = session
+        self.scope = scope
+        self.timeout = timeout
+        self.max_sitemaps = max_sitemaps
+        self.max_bytes = max_bytes
+        self.log = log or (lambda message: None)
+
+    def discover(self, target_url: str) -> Iterator[str]:
+        """Выдает найденные URL по мере чтения (без дедупликации — ее делает frontier)"""
+        sitemaps, paths = self._read_robots(urljoin(target_url, "/robots.txt"))
+        for path in paths:
+            yield urljoin(target_url, path)
+
+        queue = deque(sitemaps or [urljoin(target_url, "/sitemap.xml")])
+        seen = set()
+        while queue and len(seen) < self.max_sitemaps:
+            sitemap_url = queue.popleft()
+            if sitemap_url in seen:
+                continue
+            seen.add(sitemap_url)
+            if self.scope is not None and not self.scope.allows(sitemap_url):
+                self.log(f"Sitemap: {sitemap_url} вне scope, пропущен")
+                continue
+            for kind, loc in self._read_sitemap(sitemap_url):
+                if kind == "sitemap":
+                    queue.append(urljoin(sitemap_url, loc))
+                else:
+                    yield urljoin(sitemap_url, loc)
+
+    def _read_robots(self, url: str) -> Tuple[List[str], List[str]]:
+        try:
+            response = self.session.get(url, timeout=self.timeout)
+        except Exception as e:
+            self.log(f"Sitemap: robots.txt недоступен: {e}")
+            return [], []
+        if response.status_code != 200:
+            return [], []
+        return parse_robots(response.text)
+
+    def _read_sitemap(self, url: str) -> Iterator[Tuple[str, str]]:
+        try:
+            response = self.session.get(url, timeout=self.timeout, stream=True)
+        except Exception as e:
+            self.log(f"Sitemap: ошибка загрузки {url}: {e}")
+            return
+        try:
+            if response.status_code != 200:
+                return
+            response.raw.decode_content = True  # Content-Encoding: gzip распаковывает urllib3
+            stream = io.BufferedReader(_LimitedReader(response.raw, self.max_bytes))
+            if stream.peek(2)[:2] == GZIP_MAGIC:  # Файл sitemap.xml.gz
+                stream = io.BufferedReader(_LimitedReader(gzip.GzipFile(fileobj=stream), self.max_bytes))
+            count = 0
+            for item in iter_sitemap(stream):
+                count += 1
+                yield item
+            self.log(f"Sitemap: {url} — {count} записей")
+        except (ET.ParseError, OSError, EOFError) as e:
+            self.log(f"Sitemap: не удалось разобрать {url}: {e}")
+        finally:
+            response.close()
@@ -0,0 +1,122 @@
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+
+@dataclass
+class SourceFile:
+    """Один файл исходного кода в индексе"""
+    path: str       # Абсолютный (или переданный) путь
+    rel_path: str   # Путь относительно корня
+    name: str       # Имя файла
+    size: int       # Размер в байтах
+    language: str   # PYTHON, PHP, ... или UNKNOWN
+
+
+class SourceTree:
+    """
+    Индекс дерева исходников, общий для всех white-box плагинов одного сканирования.
+    Обход файловой системы выполняется один раз с общими правилами исключения,
+    содержимое файлов декодируется лениво и кэшируется с ограничением по объему.
+    """
+    IGNORED_DIRS = {'.git', 'node_modules', '__pycache__'}
+
+    LANGUAGES = {
+        '.py': 'PYTHON',
+        '.js': 'JAVASCRIPT',
+        '.php': 'PHP',
+        '.java': 'JAVA',
+        '.cpp': 'CPP',
+        '.c': 'C',
+        '.cs': 'CSHARP',
+        '.rb': 'RUBY',
+        '.go': 'GO'
+    }
+
+    def __init__(self, root: str, files: Optional[Iterable[SourceFile]] = None,
+                 cache_bytes: int = 32 * 1024 * 1024):
+        self.root = root
+        self.files: List[SourceFile] = list(files or [])
+        self._by_path: Dict[str, SourceFile] = {f.path: f for f in self.files}
+        self.cache_bytes = cache_bytes
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._cache_size = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def scan(cls, root: str, ignored_dirs: Optional[Iterable[str]] = None,
+             cache_bytes: int = 32 * 1024 * 1024) -> "SourceTree":
+        """Строит индекс одним обходом (порядок файлов совпадает с os.walk)"""
+        ignored = set(ignored_dirs) if ignored_dirs is not None else cls.IGNORED_DIRS
+        files = []
+        stack = [root]
+        while stack:
+            current = stack.pop()
+            try:
+                with os.scandir(current) as it:
+                    entries = list(it)
+            except OSError:
+                continue
+            subdirs = []
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in ignored:
+                            subdirs.append(entry.path)
+                    elif entry.is_file():
+                        files.append(SourceFile(
+                            path=entry.path,
+                            rel_path=os.path.relpath(entry.path, root),
+                            name=entry.name,
+                            size=entry.stat().st_size,
+                            language=cls.detect_language(entry.name)
+                        ))
+                except OSError:
+                    continue
+            stack.extend(reversed(subdirs))
+        return cls(root, files, cache_bytes)
+
+    @classmethod
+    def detect_language(cls, path: str) -> str:
+        """Определяет язык программирования по расширению файла"""
+        return cls.LANGUAGES.get(os.path.splitext(path)[1].lower(), 'UNKNOWN')
+
+    def get(self, path: str) -> Optional[SourceFile]:
+        return self._by_path.get(path)
+
+    def size_of(self, path: str) -> int:
+        entry = self._by_path.get(path)
+        if entry is not None:
+            return entry.size
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
+
+    @property
+    def total_size(self) -> int:
+        return sum(f.size for f in self.files)
+
+    def read_text(self, path: str) -> str:
+        """Возвращает декодированное содержимое файла (UTF-8, ошибки игнорируются)"""
+        with self._lock:
+            content = self._cache.get(path)
+            if content is not None:
+                self._cache.move_to_end(path)
+                return content
+
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            content = f.read()
+
+        size = len(content)
+        if size <= self.cache_bytes:
+            with self._lock:
+                if path not in self._cache:
+                    self._cache[path] = content
+                    self._cache_size += size
+                while self._cache_size > self.cache_bytes:
+                    _, evicted = self._cache.popitem(last=False)
+                    self._cache_size -= len(evicted)
+        return content
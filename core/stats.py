@@ -0,0 +1,275 @@
+import contextvars
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+
+# Плагин, от имени которого выполняется текущий код: (фаза, имя).
+# Переменная контекста наследуется asyncio-задачами и asyncio.to_thread
+_CURRENT: contextvars.ContextVar[Optional[Tuple[str, str]]] = contextvars.ContextVar(
+    "sightsec_current_plugin", default=None)
+
+# Запросы, сделанные вне плагинов (движок, сценарии)
+ENGINE = ("engine", "engine")
+
+
+class LatencySample:
+    """Выборка задержек фиксированного размера (reservoir sampling) для перцентилей"""
+    def __init__(self, size: int = 4096):
+        self.size = size
+        self.count = 0
+        self.values: List[float] = []
+        self._random = random.Random(0)
+
+    def add(self, value: float):
+        self.count += 1
+        if len(self.values) < self.size:
+            self.values.append(value)
+            return
+        slot = self._random.randrange(self.count)
+        if slot < self.size:
+            self.values[slot] = value
+
+    def extend(self, other: "LatencySample"):
+        for value in other.values:
+            self.add(value)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.values:
+            return None
+        ordered = sorted(self.values)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+    def to_dict(self) -> dict:
+        """Перцентили в миллисекундах"""
+        result = {}
+        for name, q in (("p50", 0.50), ("p90", 0.90), ("p99", 0.99), ("max", 1.0)):
+            value = self.percentile(q)
+            result[name] = None if value is None else round(value * 1000, 1)
+        return result
+
+
+class PluginStats:
+    """Счетчики одного плагина в одной фазе"""
+    def __init__(self, phase: str, name: str):
+        self.phase = phase
+        self.name = name
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.busy_time = 0.0    # Сумма длительностей единиц работы
+        self.cpu_time: Optional[float] = 0.0  # None — не измеряется (async-режим)
+        self.units = 0
+        self.failures = 0       # Исключения в коде плагина
+        self.requests = 0
+        self.cache_hits = 0
+        self.errors = 0         # Ошибки HTTP-запросов (таймауты, соединение)
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.findings = 0
+        self.latency = LatencySample()
+
+    @property
+    def wall_time(self) -> float:
+        """От начала первой единицы работы до конца последней"""
+        if self.started is None or self.finished is None:
+            return 0.0
+        return self.finished - self.started
+
+    def to_dict(self) -> dict:
+        return {
+            "phase": self.phase,
+            "name": self.name,
+            "wall_time": round(self.wall_time, 3),
+            "busy_time": round(self.busy_time, 3),
+            "cpu_time": None if self.cpu_time is None else round(self.cpu_time, 3),
+            "units": self.units,
+            "failures": self.failures,
+            "requests": self.requests,
+            "cache_hits": self.cache_hits,
+            "errors": self.errors,
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "latency_ms": self.latency.to_dict(),
+            "findings": self.findings,
+        }
+
+
+class ScanStats:
+    """
+    Статистика производительности сканирования по фазам и плагинам.
+    Запросы приписываются плагину через переменную контекста (track/bind),
+    поэтому транспорту не нужно знать, кто его вызвал.
+    """
+    def __init__(self):
+        self.plugins: Dict[Tuple[str, str], PluginStats] = {}
+        self.phases: Dict[str, List[float]] = {}  # фаза -> [начало, конец]
+        self.started = time.monotonic()
+        self.finished: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def _get(self, key: Tuple[str, str]) -> PluginStats:
+        entry = self.plugins.get(key)
+        if entry is None:
+            entry = self.plugins[key] = PluginStats(*key)
+        return entry
+
+    # --- Фазы и плагины ---
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            with self._lock:
+                span = self.phases.setdefault(name, [started, started])
+                span[0] = min(span[0], started)
+                span[1] = time.monotonic()
+
+    @contextmanager
+    def track(self, phase: str, name: str, cpu: bool = True):
+        """
+        Выполняет блок от имени плагина: учитывает время, CPU текущего потока и исключения.
+        cpu=False — для корутин, где время потока делится между задачами.
+        """
+        key = (phase, name)
+        token = _CURRENT.set(key)
+        started, cpu_started = time.monotonic(), time.thread_time()
+        failed = False
+        try:
+            yield
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            _CURRENT.reset(token)
+            finished = time.monotonic()
+            with self._lock:
+                entry = self._get(key)
+                entry.started = started if entry.started is None else min(entry.started, started)
+                entry.finished = finished if entry.finished is None else max(entry.finished, finished)
+                entry.busy_time += finished - started
+                entry.units += 1
+                entry.failures += failed
+                if not cpu or entry.cpu_time is None:
+                    entry.cpu_time = None
+                else:
+                    entry.cpu_time += time.thread_time() - cpu_started
+
+    @contextmanager
+    def attribute(self, phase: str, name: str):
+        """Приписывает запросы блока плагину, не учитывая время (например, поток-подаватель)"""
+        token = _CURRENT.set((phase, name))
+        try:
+            yield
+        finally:
+            _CURRENT.reset(token)
+
+    def bind(self, phase: str, name: str, fn: Callable) -> Callable:
+        """Оборачивает единицу работы для выполнения в другом потоке"""
+        def run(*args, **kwargs):
+            with self.track(phase, name):
+                return fn(*args, **kwargs)
+        return run
+
+    def add_time(self, phase: str, name: str, started_at: float, wall: float, cpu: float, failures: int = 0):
+        """Учитывает время, измеренное в другом процессе (white-box пул); started_at — time.time()"""
+        started = time.monotonic() - (time.time() - started_at)
+        with self._lock:
+            entry = self._get((phase, name))
+            entry.started = started if entry.started is None else min(entry.started, started)
+            entry.finished = started + wall if entry.finished is None else max(entry.finished, started + wall)
+            entry.busy_time += wall
+            entry.units += 1
+            entry.failures += failures
+            if entry.cpu_time is not None:
+                entry.cpu_time += cpu
+
+    def count_findings(self, phase: str, results: Iterable):
+        with self._lock:
+            for result in results:
+                self._get((phase, result.plugin_name)).findings += 1
+
+    # --- HTTP ---
+
+    def record_request(self, latency: float, sent: int, received: int, error: bool = False):
+        key = _CURRENT.get() or ENGINE
+        with self._lock:
+            entry = self._get(key)
+            entry.requests += 1
+            entry.errors += error
+            entry.bytes_sent += sent
+            entry.bytes_received += received
+            if not error:
+                entry.latency.add(latency)
+
+    def record_cache_hit(self):
+        key = _CURRENT.get() or ENGINE
+        with self._lock:
+            self._get(key).cache_hits += 1
+
+    def finish(self):
+        self.finished = time.monotonic()
+
+    # --- Отчет ---
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            plugins = [p for p in self.plugins.values() if p.units or p.requests or p.findings]
+            phases = {}
+            for name, (started, finished) in self.phases.items():
+                members = [p for p in plugins if p.phase == name]
+                latency = LatencySample()
+                for p in members:
+                    latency.extend(p.latency)
+                cpu = [p.cpu_time for p in members]
+                phases[name] = {
+                    "wall_time": round(finished - started, 3),
+                    "cpu_time": None if None in cpu else round(sum(cpu), 3),
+                    "requests": sum(p.requests for p in members),
+                    "cache_hits": sum(p.cache_hits for p in members),
+                    "errors": sum(p.errors for p in members),
+                    "bytes_sent": sum(p.bytes_sent for p in members),
+                    "bytes_received": sum(p.bytes_received for p in members),
+                    "latency_ms": latency.to_dict(),
+                    "findings": sum(p.findings for p in members),
+                }
+            end = self.finished or time.monotonic()
+            return {
+                "total_time": round(end - self.started, 3),
+                "requests": sum(p.requests for p in plugins),
+                "bytes_sent": sum(p.bytes_sent for p in plugins),
+                "bytes_received": sum(p.bytes_received for p in plugins),
+                "phases": phases,
+                "plugins": [p.to_dict() for p in sorted(plugins, key=lambda p: -p.wall_time)],
+            }
+
+    def summary(self, top: int = 3) -> str:
+        """Короткая сводка для лога: итоги и самые медленные плагины"""
+        data = self.to_dict()
+        slowest = ", ".join(f"{p['name']} {p['wall_time']}s/{p['requests']} req"
+                            for p in data["plugins"][:top] if p["phase"] != "engine")
+        return (f"{data['total_time']}s, requests={data['requests']}, "
+                f"received={data['bytes_received'] // 1024} KB; slowest: {slowest or '-'}")
+
+
+def request_size(method: str, url: str, headers=None, body=None) -> int:
+    """Примерный размер HTTP-запроса в байтах: стартовая строка, заголовки и тело"""
+    parts = urlsplit(url)
+    target = (parts.path or "/") + ("?" + parts.query if parts.query else "")
+    size = len(method) + len(target) + 11 + len(parts.netloc) + 8  # "... HTTP/1.1\r\n" + Host
+    for name, value in (headers or {}).items():
+        size += len(str(name)) + len(str(value)) + 4
+    if isinstance(body, (bytes, str)):
+        size += len(body)
+    elif isinstance(body, dict):
+        size += len(urlencode(body, doseq=True))
+    return size + 2
+
+
+def response_size(headers, content_length: Optional[int]) -> int:
+    """Примерный размер HTTP-ответа в байтах: строка статуса, заголовки и тело"""
+    size = 17 + sum(len(str(k)) + len(str(v)) + 4 for k, v in (headers or {}).items()) + 2
+    return size + (content_length or 0)
@@ -0,0 +1,112 @@
+import threading
+from typing import Any, Dict, Hashable, Iterable, Iterator, Optional
+
+
+class DiscoveryStream:
+    """
+    Потокобезопасная коллекция результатов Discovery (URL или формы).
+    Ведет себя как set/list для старого кода (add/append, in, len, итерация по снимку),
+    а stream() позволяет аудиторским плагинам получать новые элементы по мере
+    их появления — до сигнала конца потока close().
+    """
+    def __init__(self, unique: bool = True):
+        self._items = []
+        self._seen = set() if unique else None
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def add(self, item: Any) -> bool:
+        """Добавляет элемент. Возвращает False, если такой элемент уже был (unique=True)"""
+        with self._cond:
+            if self._seen is not None:
+                if item in self._seen:
+                    return False
+                self._seen.add(item)
+            self._items.append(item)
+            self._cond.notify_all()
+            return True
+
+    append = add
+
+    def update(self, items: Iterable[Any]):
+        for item in items:
+            self.add(item)
+
+    def close(self):
+        """Сигнал конца потока: Discovery завершено, новых элементов не будет"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def wait_closed(self, timeout: Optional[float] = None) -> bool:
+        with self._cond:
+            return self._cond.wait_for(lambda: self._closed, timeout)
+
+    def stream(self) -> Iterator[Any]:
+        """Отдает все элементы с начала и ждет новых, пока поток не закрыт"""
+        index = 0
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: index < len(self._items) or self._closed)
+                if index >= len(self._items):
+                    return
+                batch = self._items[index:]
+            index += len(batch)
+            yield from batch
+
+    def __iter__(self) -> Iterator[Any]:
+        with self._cond:
+            return iter(list(self._items))
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, item: Any) -> bool:
+        with self._cond:
+            if self._seen is not None:
+                return item in self._seen
+            return item in self._items
+
+
+class FormIndex(DiscoveryStream):
+    """
+    Поток форм с дедупликацией по отпечатку (TargetForm.fingerprint): разрешенный
+    URL отправки, метод, отсортированные имена и типы полей. Одна и та же форма
+    (поиск, логин) на разных страницах попадает в поток один раз, а страницы,
+    где она встречается, накапливаются в form.pages.
+    """
+    def __init__(self, base_url: str = ""):
+        super().__init__(unique=False)
+        self.base_url = base_url
+        self.occurrences = 0  # Сколько раз формы добавлялись (с повторами)
+        self._by_fingerprint: Dict[Hashable, Any] = {}
+        self._pages = set()
+
+    def add(self, form: Any) -> bool:
+        """Добавляет форму. False — такая форма уже есть (отмечается только страница)"""
+        key = form.fingerprint(self.base_url)
+        with self._cond:
+            self.occurrences += 1
+            known = self._by_fingerprint.get(key)
+            if known is None:
+                known = self._by_fingerprint[key] = form
+                self._items.append(form)
+                self._cond.notify_all()
+            if form.source_url and (key, form.source_url) not in self._pages:
+                self._pages.add((key, form.source_url))
+                known.pages.append(form.source_url)
+            return known is form
+
+    append = add
+
+    def get(self, fingerprint: Hashable) -> Optional[Any]:
+        with self._cond:
+            return self._by_fingerprint.get(fingerprint)
+
+    def __contains__(self, form: Any) -> bool:
+        with self._cond:
+            return form.fingerprint(self.base_url) in self._by_fingerprint
@@ -0,0 +1,165 @@
+import math
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Optional
+from urllib.parse import urlparse
+
+# Статусы, означающие перегрузку цели
+OVERLOAD_STATUSES = (429, 503)
+
+
+class HostLimiter:
+    """
+    AIMD-ограничитель запросов к одному хосту.
+    Лимит одновременных запросов растет за каждое «окно» успешных ответов со стабильной
+    задержкой (удваивается до первого отката, как slow start в TCP, затем +1) и уменьшается
+    вдвое при 429/503, таймаутах, ошибках соединения или росте p95.
+    Дополнительно соблюдается потолок запросов в секунду (max_rps).
+    """
+    def __init__(self, host: str, initial: int, max_limit: int, min_limit: int = 1,
+                 max_rps: Optional[float] = None, window: int = 20, p95_factor: float = 2.0,
+                 cooldown: float = 1.0, log: Callable[[str], None] = print):
+        self.host = host
+        self.max_limit = max(1, max_limit)
+        self.min_limit = max(1, min(min_limit, self.max_limit))
+        self.limit = float(max(self.min_limit, min(initial, self.max_limit)))
+        self.max_rps = max_rps
+        self.p95_factor = p95_factor
+        self.cooldown = cooldown
+        self.log = log
+        self.in_flight = 0
+        self.throttle_events = 0
+        self._window = window
+        self._latencies = deque(maxlen=window)
+        self._successes = 0
+        self._slow_start = True
+        self._baseline_p95: Optional[float] = None
+        self._last_decrease = 0.0
+        self._paused_until = 0.0
+        self._next_slot = 0.0
+        self._waiters = deque()  # Очередь потоков, ожидающих слот (acquire)
+        self._cond = threading.Condition()
+
+    def try_acquire(self) -> float:
+        """Занимает слот. 0 — слот получен, иначе — через сколько секунд повторить попытку"""
+        with self._cond:
+            now = time.monotonic()
+            if now < self._paused_until:
+                return self._paused_until - now
+            if self.in_flight >= int(self.limit):
+                return 0.05
+            if self.max_rps:
+                if now < self._next_slot:
+                    return self._next_slot - now
+                self._next_slot = max(now, self._next_slot) + 1.0 / self.max_rps
+            self.in_flight += 1
+            return 0.0
+
+    def acquire(self):
+        """
+        Блокирующее получение слота (для потоков). Ожидающие получают слоты по очереди:
+        поток, только что освободивший слот, не обгоняет тех, кто ждет дольше.
+        """
+        ticket = object()
+        with self._cond:
+            self._waiters.append(ticket)
+            try:
+                while True:
+                    delay = self.try_acquire() if self._waiters[0] is ticket else 0.05
+                    if delay == 0:
+                        return
+                    self._cond.wait(timeout=delay)
+            finally:
+                self._waiters.remove(ticket)
+                self._cond.notify_all()
+
+    def cancel(self):
+        """Освобождает слот без учета результата (ошибка, не связанная с перегрузкой цели)"""
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def release(self, latency: float, status: Optional[int] = None, error: Optional[Exception] = None,
+                retry_after: Optional[str] = None):
+        """Освобождает слот и учитывает результат запроса (error — таймаут или ошибка соединения)"""
+        with self._cond:
+            self.in_flight -= 1
+            if error is not None:
+                self._decrease(f"{type(error).__name__}")
+            elif status in OVERLOAD_STATUSES:
+                self._decrease(f"HTTP {status}")
+                self._pause(retry_after)
+            else:
+                self._latencies.append(latency)
+                self._successes += 1
+                if len(self._latencies) >= self._window and self._successes >= max(self._window, int(self.limit)):
+                    self._successes = 0
+                    self._evaluate()
+            self._cond.notify_all()
+
+    def _evaluate(self):
+        p95 = self.p95()
+        if self._baseline_p95 is None:
+            self._baseline_p95 = p95
+        if p95 > self._baseline_p95 * self.p95_factor:
+            self._decrease(f"p95 {p95 * 1000:.0f}ms > {self._baseline_p95 * 1000:.0f}ms")
+            return
+        # Задержка стабильна: медленно подстраиваем базовую линию и добавляем один слот
+        self._baseline_p95 = 0.8 * self._baseline_p95 + 0.2 * p95
+        if self.limit < self.max_limit:
+            old = int(self.limit)
+            step = self.limit if self._slow_start else 1
+            self.limit = min(self.max_limit, self.limit + step)
+            self.log(f"Throttle [{self.host}]: limit {old} -> {int(self.limit)} (p95 {p95 * 1000:.0f}ms)")
+
+    def _decrease(self, reason: str):
+        now = time.monotonic()
+        self.throttle_events += 1
+        # Ответы на уже отправленные запросы не должны обвалить лимит несколько раз подряд
+        if now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        self._slow_start = False
+        old = int(self.limit)
+        self.limit = max(self.min_limit, math.floor(self.limit / 2))
+        self._latencies.clear()
+        self._successes = 0
+        self.log(f"Throttle [{self.host}]: limit {old} -> {int(self.limit)} ({reason})")
+
+    def _pause(self, retry_after: Optional[str]):
+        """Учитывает Retry-After (в секундах) у ответов 429/503"""
+        if retry_after and retry_after.strip().isdigit():
+            self._paused_until = max(self._paused_until, time.monotonic() + min(int(retry_after), 60))
+
+    def p95(self) -> float:
+        if not self._latencies:
+            return 0.0
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+
+class AdaptiveThrottle:
+    """Реестр ограничителей: по одному HostLimiter на хост цели"""
+    def __init__(self, initial: int, max_limit: int, max_rps: Optional[float] = None,
+                 log: Callable[[str], None] = print):
+        self.initial = initial
+        self.max_limit = max_limit
+        self.max_rps = max_rps
+        self.log = log
+        self._hosts: Dict[str, HostLimiter] = {}
+        self._lock = threading.Lock()
+
+    def for_url(self, url: str) -> HostLimiter:
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            limiter = self._hosts.get(host)
+            if limiter is None:
+                limiter = HostLimiter(host, self.initial, self.max_limit, max_rps=self.max_rps, log=self.log)
+                self._hosts[host] = limiter
+            return limiter
+
+    def summary(self) -> str:
+        return ", ".join(
+            f"{h.host}: limit={int(h.limit)}, throttled={h.throttle_events}" for h in self._hosts.values()
+        )
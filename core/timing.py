@@ -0,0 +1,84 @@
+import math
+import threading
+from typing import Optional
+
+# Нижняя граница разброса задержки, с: на локальной цели он почти нулевой,
+# и без нее тест решал бы по одной случайной паре
+MIN_SIGMA = 0.01
+
+
+class LatencyStats:
+    """Онлайн-оценка среднего и стандартного отклонения задержки (алгоритм Уэлфорда)"""
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, value: float):
+        with self._lock:
+            self.count += 1
+            delta = value - self.mean
+            self.mean += delta / self.count
+            self._m2 += delta * (value - self.mean)
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self._m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+    def pair_sigma(self) -> float:
+        """Разброс разности задержек двух независимых запросов к эндпоинту"""
+        return max(MIN_SIGMA, math.sqrt(2) * self.std)
+
+
+def choose_delay(sigma: float, min_delay: float, max_delay: float, separation: float = 4.0) -> float:
+    """Задержка пейлоада: в separation раз больше разброса пар, в пределах [min_delay, max_delay]"""
+    return min(max_delay, max(min_delay, separation * sigma))
+
+
+class DelayTest:
+    """
+    Последовательный критерий отношения вероятностей (SPRT, Вальд) для time-based проверок.
+    Наблюдение — разность задержек пары одновременных запросов: с пейлоадом задержки
+    и контрольного. H0: разность ~ N(0, sigma²) — пейлоад не исполняется,
+    H1: разность ~ N(delay, sigma²). Тест останавливается, как только логарифм
+    отношения правдоподобия пересекает границу: alpha — доля ложных срабатываний,
+    beta — доля пропусков.
+
+    Наблюдения обрезаются до [-delay, 2 * delay], чтобы один выброс задержки не решал
+    исход; H1 принимается не раньше min_pairs пар.
+    """
+    def __init__(self, delay: float, sigma: float, alpha: float = 0.001, beta: float = 0.01,
+                 min_pairs: int = 2, max_pairs: int = 6):
+        self.delay = delay
+        self.sigma = max(MIN_SIGMA, sigma)
+        self.min_pairs = min_pairs
+        self.max_pairs = max_pairs
+        self.upper = math.log((1 - beta) / alpha)
+        self.lower = math.log(beta / (1 - alpha))
+        self.llr = 0.0
+        self.pairs = 0
+        self.total = 0.0
+
+    def add(self, diff: float) -> Optional[bool]:
+        """Учитывает пару; возвращает decision"""
+        diff = min(max(diff, -self.delay), 2 * self.delay)
+        self.llr += self.delay / self.sigma ** 2 * (diff - self.delay / 2)
+        self.pairs += 1
+        self.total += diff
+        return self.decision
+
+    @property
+    def decision(self) -> Optional[bool]:
+        """True — задержка подтверждена, False — нет (или пары исчерпаны), None — нужна еще пара"""
+        if self.llr <= self.lower:
+            return False
+        if self.llr >= self.upper and self.pairs >= self.min_pairs:
+            return True
+        if self.pairs >= self.max_pairs:
+            return False
+        return None
+
+    @property
+    def mean_shift(self) -> float:
+        return self.total / self.pairs if self.pairs else 0.0
@@ -0,0 +1,428 @@
+import asyncio
+import email.message
+import time
+from dataclasses import dataclass
+from typing import Any, Iterable, Optional
+import requests
+from requests.adapters import HTTPAdapter
+from requests.cookies import MockRequest, MockResponse, RequestsCookieJar, get_cookie_header
+from requests.structures import CaseInsensitiveDict
+from core.cache import ResponseCache
+from core.stats import ScanStats, request_size, response_size
+from core.throttle import AdaptiveThrottle
+
+try:
+    import aiohttp
+except ImportError:  # aiohttp не обязателен: без него используется пул потоков
+    aiohttp = None
+
+
+class _LockedCookieJar(RequestsCookieJar):
+    """Cookie jar, который можно безопасно разделять между потоками"""
+    def __iter__(self):
+        # CookieJar сам блокирует запись, но не итерацию: отдаем снимок под блокировкой
+        with self._cookies_lock:
+            return iter(list(super().__iter__()))
+
+
+class HttpTransport:
+    """
+    Потокобезопасный HTTP-транспорт для синхронных плагинов (context.session).
+    Одна requests.Session с пулом соединений под параллелизм движка (keep-alive на хост),
+    общим cookie jar под блокировкой, таймаутом по умолчанию, общим кэшем ответов,
+    адаптивным ограничением параллелизма по хостам и учетом статистики запросов.
+
+    Политика загрузки: тело читается потоком и не больше max_response_bytes
+    (остальное отбрасывается, response.truncated=True); content_types в запросе
+    позволяет не загружать тело ответа с другим Content-Type (response.skipped=True).
+    """
+    DEFAULT_TIMEOUT = 10
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, pool_size: int = 10, timeout: Optional[float] = DEFAULT_TIMEOUT,
+                 headers: Optional[dict] = None, cache: Optional[ResponseCache] = None,
+                 throttle: Optional[AdaptiveThrottle] = None, stats: Optional[ScanStats] = None,
+                 max_response_bytes: Optional[int] = None):
+        self.pool_size = pool_size
+        self.max_response_bytes = max_response_bytes
+        self.timeout = timeout
+        self.cache = cache
+        self.throttle = throttle
+        self.stats = stats
+        self.session = requests.Session()
+        self.session.cookies = _LockedCookieJar()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        if headers:
+            self.session.headers.update(headers)
+
+    @property
+    def headers(self):
+        return self.session.headers
+
+    @property
+    def cookies(self):
+        return self.session.cookies
+
+    def request(self, method: str, url: str, cache: Optional[bool] = None, max_bytes: Optional[int] = None,
+                content_types: Optional[Iterable[str]] = None, throttled: bool = True,
+                **kwargs: Any) -> requests.Response:
+        """
+        Аналог requests.Session.request; подставляет таймаут по умолчанию.
+        cache=False отключает кэш для запроса (см. ResponseCache.should_cache).
+        max_bytes — предел тела ответа (по умолчанию max_response_bytes транспорта),
+        content_types — префиксы Content-Type, для которых тело нужно загрузить.
+        throttled=False — запрос идет в обход адаптивного ограничителя хоста (time-based проверки:
+        параллелизм такие плагины ограничивают сами, а задержка ответа намеренная).
+        """
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+
+        key = self._cache_key(method, url, cache, kwargs)
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                if self.stats is not None:
+                    self.stats.record_cache_hit()
+                return cached
+
+        limit = self.max_response_bytes if max_bytes is None else max_bytes
+        # Явный stream=True — вызывающий код читает тело сам
+        policy = None if kwargs.get("stream") else (limit, tuple(content_types or ()))
+        response = self._send(method, url, policy=policy, throttled=throttled, **kwargs)
+        # Неполные ответы в кэш не попадают: другим плагинам может понадобиться все тело
+        if key is not None and not getattr(response, "truncated", False) and not getattr(response, "skipped", False):
+            self.cache.put(key, response, len(response.content))
+        return response
+
+    def _send(self, method: str, url: str, policy=None, throttled: bool = True, **kwargs: Any) -> requests.Response:
+        """Отправляет запрос через адаптивный ограничитель хоста (если он включен)"""
+        limiter = self.throttle.for_url(url) if self.throttle is not None and throttled else None
+        if limiter is not None:
+            limiter.acquire()
+        started = time.monotonic()
+        try:
+            if policy is None:
+                response = self.session.request(method, url, **kwargs)
+            else:
+                response = self.session.request(method, url, **dict(kwargs, stream=True))
+                self._read_body(response, *policy)
+        except (requests.Timeout, requests.ConnectionError) as e:
+            if limiter is not None:
+                limiter.release(time.monotonic() - started, error=e)
+            self._record_error(method, url, kwargs, time.monotonic() - started)
+            raise
+        except Exception:
+            if limiter is not None:
+                limiter.cancel()
+            raise
+        latency = time.monotonic() - started
+        if limiter is not None:
+            limiter.release(latency, status=response.status_code,
+                            retry_after=response.headers.get("Retry-After"))
+        self._record(response, latency)
+        return response
+
+    def _read_body(self, response: requests.Response, limit: Optional[int], content_types: tuple):
+        """Читает тело потоком с учетом политики загрузки и добавляет метаданные к ответу"""
+        declared = response.headers.get("Content-Length", "")
+        response.declared_length = int(declared) if declared.isdigit() else None
+        response.truncated = False
+        response.skipped = False
+
+        content_type = response.headers.get("Content-Type", "").lower()
+        if content_types and not content_type.startswith(content_types):
+            body = b""
+            response.skipped = True
+        else:
+            chunks, size = [], 0
+            for chunk in response.iter_content(self.CHUNK_SIZE):
+                if limit and size + len(chunk) > limit:
+                    chunks.append(chunk[:limit - size])
+                    size = limit
+                    response.truncated = True
+                    break
+                chunks.append(chunk)
+                size += len(chunk)
+            body = b"".join(chunks)
+
+        if response.truncated or response.skipped:
+            # Недочитанное соединение закрывается, а не возвращается в пул
+            response.close()
+        response._content = body
+        response._content_consumed = True
+
+    def probe(self, url: str, max_bytes: int = 4096, head_first: bool = False, **kwargs: Any) -> requests.Response:
+        """
+        Проверка существования ресурса без загрузки всего тела: GET с Range на первые
+        max_bytes байт (сервер без поддержки Range все равно прерывается на max_bytes).
+        head_first=True — сначала HEAD; 404/410 на HEAD считается ответом.
+        """
+        if head_first:
+            response = self.head(url, **kwargs)
+            if response.status_code in (404, 410):
+                return response
+        headers = dict(kwargs.pop("headers", None) or {})
+        headers.setdefault("Range", f"bytes=0-{max_bytes - 1}")
+        return self.get(url, headers=headers, max_bytes=max_bytes, **kwargs)
+
+    def _record(self, response: requests.Response, latency: float):
+        """Учитывает запрос в статистике (редиректы — отдельными запросами)"""
+        if self.stats is None:
+            return
+        for i, resp in enumerate([*response.history, response]):
+            sent = request_size(resp.request.method, resp.request.url, resp.request.headers, resp.request.body)
+            # Потоковый ответ еще не прочитан: берем заявленную длину
+            body = resp._content
+            length = len(body) if isinstance(body, bytes) else int(resp.headers.get("Content-Length") or 0)
+            received = response_size(resp.headers, length)
+            if i < len(response.history):
+                self.stats.record_request(resp.elapsed.total_seconds(), sent, received)
+            else:
+                self.stats.record_request(latency, sent, received)
+
+    def _record_error(self, method: str, url: str, kwargs: dict, latency: float):
+        if self.stats is not None:
+            self.stats.record_request(latency, request_size(method, url, kwargs.get("headers")), 0, error=True)
+
+    def _cache_key(self, method: str, url: str, cache: Optional[bool], kwargs: dict):
+        if self.cache is None or not self.cache.should_cache(
+                method, cache, kwargs.get("headers"), kwargs.get("stream", False)):
+            return None
+        return ResponseCache.make_key(method, url, kwargs.get("params"), kwargs.get("data"), kwargs.get("json"),
+                                      kwargs.get("allow_redirects", True))
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        kwargs.setdefault("allow_redirects", True)
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, data=None, json=None, **kwargs: Any) -> requests.Response:
+        return self.request("POST", url, data=data, json=json, **kwargs)
+
+    def head(self, url: str, **kwargs: Any) -> requests.Response:
+        kwargs.setdefault("allow_redirects", False)
+        return self.request("HEAD", url, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+
+@dataclass
+class AsyncResponse:
+    """Ответ асинхронного транспорта (подмножество интерфейса requests.Response)"""
+    status_code: int
+    url: str
+    headers: CaseInsensitiveDict
+    content: bytes = b""
+    encoding: Optional[str] = None
+    truncated: bool = False  # Тело обрезано политикой загрузки (max_bytes)
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding or 'utf-8', errors='replace')
+
+    @classmethod
+    def from_requests(cls, resp: requests.Response) -> "AsyncResponse":
+        return cls(
+            status_code=resp.status_code,
+            url=resp.url,
+            headers=CaseInsensitiveDict(resp.headers),
+            content=resp.content,
+            encoding=resp.encoding,
+            truncated=getattr(resp, "truncated", False),
+        )
+
+    def to_requests(self) -> requests.Response:
+        """Обратное преобразование — чтобы класть ответ в общий кэш синхронного транспорта"""
+        resp = requests.Response()
+        resp.status_code = self.status_code
+        resp.url = self.url
+        resp.headers = CaseInsensitiveDict(self.headers)
+        resp._content = self.content
+        resp.encoding = self.encoding
+        return resp
+
+
+class AsyncTransport:
+    """
+    Асинхронный HTTP-транспорт для режима engine_mode='async'.
+    Держит сотни запросов в полёте в одном event loop. Если aiohttp не установлен,
+    запросы выполняются синхронной сессией в пуле потоков.
+
+    Cookie jar один — синхронного транспорта: у aiohttp-клиента свой jar отключен,
+    заголовок Cookie собирается из общего jar перед каждым запросом, а Set-Cookie
+    всех ответов (и промежуточных редиректов) записываются обратно. Ограничение:
+    cookie, выставленная редиректом, не отправляется на следующий шаг того же редиректа.
+    """
+    def __init__(self, session: Optional[HttpTransport] = None, limit: int = 200,
+                 timeout: Optional[float] = None):
+        self.sync_session = session or HttpTransport(pool_size=limit, timeout=timeout)
+        self.limit = limit
+        self.timeout = timeout
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._client = None
+
+    @property
+    def backend(self) -> str:
+        return "aiohttp" if aiohttp is not None else "threads"
+
+    async def start(self):
+        """Создает клиент внутри работающего event loop"""
+        self._semaphore = asyncio.Semaphore(self.limit)
+        if aiohttp is not None:
+            connector = aiohttp.TCPConnector(limit=self.limit)
+            self._client = aiohttp.ClientSession(
+                connector=connector,
+                headers=dict(self.sync_session.headers),
+                cookie_jar=aiohttp.DummyCookieJar(),  # Cookie хранятся только в общем jar
+            )
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def request(self, method: str, url: str, cache: Optional[bool] = None,
+                      max_bytes: Optional[int] = None, **kwargs: Any) -> AsyncResponse:
+        """
+        Выполняет запрос. Поддерживает params, data, headers, timeout, allow_redirects.
+        Кэш ответов и предел тела (max_response_bytes) общие с синхронным транспортом.
+        """
+        if self._semaphore is None:
+            await self.start()
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+
+        response_cache = getattr(self.sync_session, "cache", None)
+        key = None
+        if response_cache is not None and response_cache.should_cache(method, cache, kwargs.get("headers")):
+            key = ResponseCache.make_key(method, url, kwargs.get("params"), kwargs.get("data"),
+                                         allow_redirects=kwargs.get("allow_redirects", True))
+            cached = response_cache.get(key)
+            if cached is not None:
+                if getattr(self.sync_session, "stats", None) is not None:
+                    self.sync_session.stats.record_cache_hit()
+                return AsyncResponse.from_requests(cached)
+
+        limit = getattr(self.sync_session, "max_response_bytes", None) if max_bytes is None else max_bytes
+        async with self._semaphore:
+            response = await self._send(method, url, limit, **kwargs)
+
+        if key is not None and not response.truncated:
+            response_cache.put(key, response.to_requests(), len(response.content))
+        return response
+
+    async def get(self, url: str, **kwargs: Any) -> AsyncResponse:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs: Any) -> AsyncResponse:
+        return await self.request("POST", url, **kwargs)
+
+    async def probe(self, url: str, max_bytes: int = 4096, **kwargs: Any) -> AsyncResponse:
+        """Аналог HttpTransport.probe: GET с Range на первые max_bytes байт"""
+        headers = dict(kwargs.pop("headers", None) or {})
+        headers.setdefault("Range", f"bytes=0-{max_bytes - 1}")
+        return await self.get(url, headers=headers, max_bytes=max_bytes, **kwargs)
+
+    async def _send(self, method: str, url: str, limit: Optional[int] = None, **kwargs: Any) -> AsyncResponse:
+        """Отправляет запрос через адаптивный ограничитель хоста (общий с синхронным транспортом)"""
+        throttle = getattr(self.sync_session, "throttle", None)
+        limiter = throttle.for_url(url) if throttle is not None else None
+        if limiter is not None:
+            while (delay := limiter.try_acquire()) > 0:
+                await asyncio.sleep(min(delay, 0.05))
+
+        started = time.monotonic()
+        stats = getattr(self.sync_session, "stats", None)
+        sent = request_size(method, url, kwargs.get("headers"), kwargs.get("data")) if stats is not None else 0
+        try:
+            if self._client is not None:
+                response = await self._request_aiohttp(method, url, limit, **kwargs)
+            else:
+                response = await self._request_threaded(method, url, limit, **kwargs)
+        except Exception as e:
+            if limiter is not None:
+                if self._is_overload_error(e):
+                    limiter.release(time.monotonic() - started, error=e)
+                else:
+                    limiter.cancel()
+            if stats is not None:
+                stats.record_request(time.monotonic() - started, sent, 0, error=True)
+            raise
+        latency = time.monotonic() - started
+        if limiter is not None:
+            limiter.release(latency, status=response.status_code,
+                            retry_after=response.headers.get("Retry-After"))
+        if stats is not None:
+            stats.record_request(latency, sent, response_size(response.headers, len(response.content)))
+        return response
+
+    @staticmethod
+    def _is_overload_error(error: Exception) -> bool:
+        if isinstance(error, (asyncio.TimeoutError, requests.Timeout, requests.ConnectionError)):
+            return True
+        return aiohttp is not None and isinstance(error, aiohttp.ClientConnectionError)
+
+    async def _request_aiohttp(self, method: str, url: str, limit: Optional[int] = None,
+                               timeout: Optional[float] = None, **kwargs: Any) -> AsyncResponse:
+        client_timeout = aiohttp.ClientTimeout(total=timeout)
+        headers = dict(kwargs.pop("headers", None) or {})
+        cookie = self._cookie_header(method, url, kwargs.get("params"))
+        if cookie and not any(name.lower() == "cookie" for name in headers):
+            headers["Cookie"] = cookie
+        async with self._client.request(method, url, timeout=client_timeout, headers=headers, **kwargs) as resp:
+            for hop in (*resp.history, resp):
+                self._store_cookies(method, str(hop.url), hop.headers.getall("Set-Cookie", []))
+            if limit:
+                # Читаем на байт больше предела, чтобы отличить обрезанный ответ от полного
+                chunks, size = [], 0
+                while size <= limit:
+                    chunk = await resp.content.read(limit + 1 - size)
+                    if not chunk:
+                        break
+                    chunks.append(chunk)
+                    size += len(chunk)
+                body = b"".join(chunks)[:limit]
+                truncated = size > limit
+            else:
+                body = await resp.read()
+                truncated = False
+            return AsyncResponse(
+                status_code=resp.status,
+                url=str(resp.url),
+                headers=CaseInsensitiveDict(resp.headers),
+                content=body,
+                encoding=resp.charset,
+                truncated=truncated,
+            )
+
+    def _cookie_header(self, method: str, url: str, params=None) -> Optional[str]:
+        """Заголовок Cookie для запроса из общего jar (с учетом домена, пути и secure)"""
+        prepared = requests.Request(method, url, params=params).prepare()
+        return get_cookie_header(self.sync_session.cookies, prepared)
+
+    def _store_cookies(self, method: str, url: str, set_cookies: Iterable[str]):
+        """Записывает Set-Cookie ответа в общий jar по правилам http.cookiejar (в т.ч. удаление)"""
+        message = email.message.Message()
+        for value in set_cookies:
+            message["Set-Cookie"] = value
+        if message.keys():
+            request = MockRequest(requests.Request(method, url).prepare())
+            self.sync_session.cookies.extract_cookies(MockResponse(message), request)
+
+    async def _request_threaded(self, method: str, url: str, limit: Optional[int] = None,
+                                **kwargs: Any) -> AsyncResponse:
+        # Кэш и ограничитель уже учтены выше, поэтому используется «сырая» requests.Session
+        def fetch():
+            resp = self.sync_session.session.request(method, url, **dict(kwargs, stream=True))
+            self.sync_session._read_body(resp, limit, ())
+            return resp
+        return AsyncResponse.from_requests(await asyncio.to_thread(fetch))
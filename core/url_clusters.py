@@ -0,0 +1,74 @@
+import re
+import threading
+from typing import Dict, Optional, Set, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from core.frontier import canonicalize_url
+
+# Сегменты пути, которые являются идентификаторами: числа, UUID, длинные hex-строки
+_ID_SEGMENT = re.compile(
+    r"^(?:\d+|[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}|[0-9a-fA-F]{16,})$"
+)
+
+UrlTemplate = Tuple[str, str, str, Tuple[str, ...]]
+
+
+def url_template(url: str) -> UrlTemplate:
+    """
+    Шаблон URL: схема, хост, форма пути (идентификаторы заменены на {id})
+    и отсортированные имена параметров. /item?id=1 и /item?id=2 дают один шаблон.
+    """
+    parts = urlsplit(canonicalize_url(url))
+    path = "/".join("{id}" if _ID_SEGMENT.match(segment) else segment for segment in parts.path.split("/"))
+    names = tuple(sorted({name for name, _ in parse_qsl(parts.query, keep_blank_values=True)}))
+    return parts.scheme, parts.netloc, path, names
+
+
+# Представителей шаблона для аудита по умолчанию (параметр конфига samples_per_template):
+# 0 — проверяются все URL, выборка включается явно
+DEFAULT_SAMPLES_PER_TEMPLATE = 0
+
+
+class UrlTemplateIndex:
+    """
+    Кластеризация найденных URL по шаблонам. Для аудита допускаются первые
+    samples_per_template URL каждого шаблона (None или 0 — все URL), поэтому число
+    запросов растет с числом разных эндпоинтов, а не идентификаторов.
+    В пределах сканирования решение по URL принимается один раз, и все плагины получают
+    одни и те же представители. Но «первые» определяются порядком обнаружения, который
+    при параллельном обходе меняется от запуска к запуску: разные запуски могут проверить
+    разные URL одного шаблона (и найти разное), поэтому выборка включается только явно.
+    """
+    def __init__(self, samples_per_template: Optional[int] = None):
+        self.samples_per_template = samples_per_template
+        self._counts: Dict[UrlTemplate, int] = {}
+        self._admitted: Set[str] = set()
+        self._skipped: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def admit(self, url: str) -> bool:
+        """True — URL нужно проверять (представитель своего шаблона)"""
+        if not self.samples_per_template:
+            return True
+        key = canonicalize_url(url)
+        with self._lock:
+            if key in self._admitted:
+                return True
+            if key in self._skipped:
+                return False
+            template = url_template(url)
+            count = self._counts.get(template, 0)
+            if count >= self.samples_per_template:
+                self._skipped.add(key)
+                return False
+            self._counts[template] = count + 1
+            self._admitted.add(key)
+            return True
+
+    @property
+    def templates(self) -> int:
+        return len(self._counts)
+
+    @property
+    def skipped(self) -> int:
+        return len(self._skipped)
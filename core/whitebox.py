@@ -0,0 +1,211 @@
+import importlib.util
+import os
+import pickle
+import time
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, List, Optional, Tuple
+from core.base_plugin import BasePlugin, ScanContext, ScanResult
+from core.source_tree import SourceTree
+
+# Кэш загруженных классов плагинов внутри дочернего процесса
+_PLUGIN_CLASSES: Dict[Tuple[str, str], type] = {}
+
+# Задача для одного плагина внутри части: (индекс плагина, файл плагина, класс, файлы)
+PluginSlice = Tuple[int, str, str, List[str]]
+
+
+def _load_plugin_class(plugin_file: str, class_name: str) -> type:
+    key = (plugin_file, class_name)
+    if key not in _PLUGIN_CLASSES:
+        module_name = "sightsec_whitebox_" + os.path.splitext(os.path.basename(plugin_file))[0]
+        spec = importlib.util.spec_from_file_location(module_name, plugin_file)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _PLUGIN_CLASSES[key] = getattr(module, class_name)
+    return _PLUGIN_CLASSES[key]
+
+
+# Время выполнения части одним плагином: (начало по time.time(), длительность, CPU, ошибка)
+SliceTiming = Tuple[float, float, float, bool]
+
+
+def _run_chunk(slices: List[PluginSlice], target_url: str, config: dict, source_root: str,
+               cache_bytes: int) -> Tuple[Dict[int, List[ScanResult]], List[str], Dict[int, SliceTiming]]:
+    """
+    Выполняется в дочернем процессе: все плагины проверяют одну часть файлов.
+    Индекс исходников общий для плагинов, поэтому каждый файл читается один раз.
+    """
+    messages: List[str] = []
+    context = ScanContext(target_url=target_url, config=config,
+                          source_tree=SourceTree(source_root, cache_bytes=cache_bytes))
+    context.log = messages.append  # Лог передаем в родительский процесс вместе с результатами
+
+    results: Dict[int, List[ScanResult]] = {}
+    timings: Dict[int, SliceTiming] = {}
+    for index, plugin_file, class_name, file_paths in slices:
+        plugin = _load_plugin_class(plugin_file, class_name)(context)
+        started_at, started, cpu_started = time.time(), time.monotonic(), time.process_time()
+        failed = False
+        try:
+            plugin.setup()
+            results[index] = plugin.scan_files(file_paths)
+            plugin.teardown()
+        except Exception as e:
+            messages.append(f"FATAL error in {plugin.meta()['name']}: {e}")
+            results[index] = []
+            failed = True
+        timings[index] = (started_at, time.monotonic() - started, time.process_time() - cpu_started, failed)
+    return results, messages, timings
+
+
+class WhiteboxExecutor:
+    """
+    Параллельное выполнение фазы White Box в пуле процессов.
+    Файлы из индекса исходников делятся на части; в одной задаче все плагины проверяют
+    свою долю файлов этой части. Результаты собираются в детерминированном порядке:
+    порядок плагинов, затем порядок частей. Плагины без source_files() выполняются
+    целиком в текущем процессе.
+    """
+    def __init__(self, max_workers: Optional[int] = None, chunk_files: int = 256,
+                 chunk_bytes: int = 4 * 1024 * 1024, log: Callable[[str], None] = print,
+                 phase: str = "whitebox"):
+        self.phase = phase
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.chunk_files = chunk_files
+        self.chunk_bytes = chunk_bytes
+        self.log = log
+
+    def run(self, plugins: List[BasePlugin], plugin_files: Dict[type, str]) -> List[ScanResult]:
+        if not plugins:
+            return []
+        context = plugins[0].context
+        tree = context.source_tree
+        config = self._picklable_config(context.config)
+
+        # 1. Какие файлы нужны каждому плагину
+        wanted: Dict[int, set] = {}
+        inline = []  # Плагины, выполняемые целиком в текущем процессе
+        for index, plugin in enumerate(plugins):
+            files = None
+            # Делятся на части только плагины со своим scan_files()
+            if tree is not None and plugin_files.get(type(plugin)) and \
+                    type(plugin).scan_files is not BasePlugin.scan_files:
+                try:
+                    files = plugin.source_files()
+                except Exception as e:
+                    self.log(f"FATAL error in {plugin.meta()['name']}: {e}")
+            if files is None:
+                inline.append((index, plugin))
+            else:
+                wanted[index] = set(files)
+
+        # 2. Разбиение на части в порядке индекса: одна задача = одна часть для всех плагинов
+        tasks: List[Tuple[int, List[PluginSlice]]] = []
+        if wanted:
+            needed = [f.path for f in tree.files if any(f.path in paths for paths in wanted.values())]
+            for chunk_index, chunk in enumerate(self._chunks(needed, tree)):
+                slices = []
+                for index, paths in wanted.items():
+                    own = [p for p in chunk if p in paths]
+                    if own:
+                        plugin = plugins[index]
+                        slices.append((index, plugin_files[type(plugin)], type(plugin).__name__, own))
+                tasks.append((chunk_index, slices))
+
+        results: Dict[Tuple[int, int], List[ScanResult]] = {}
+        futures = {}
+        executor = None
+        if tasks and self.max_workers > 1:
+            try:
+                executor = ProcessPoolExecutor(max_workers=self.max_workers)
+                for chunk_index, slices in tasks:
+                    futures[chunk_index] = executor.submit(
+                        _run_chunk, slices, context.target_url, config, tree.root, tree.cache_bytes)
+                self.log(f"White Box: {len(tasks)} частей в пуле из {self.max_workers} процессов")
+            except Exception as e:
+                # Пул процессов недоступен (например, ограничения окружения) — выполняем в текущем процессе
+                self.log(f"White Box: пул процессов недоступен ({e}), выполняю последовательно")
+
+        # 3. Пока процессы работают, выполняем неделимые плагины здесь
+        results.update(self._run_inline(inline))
+
+        done_chunks = set()
+        for chunk_index, future in futures.items():
+            try:
+                chunk_results, messages, timings = future.result()
+            except BrokenProcessPool as e:
+                self.log(f"White Box: пул процессов аварийно завершен ({e}), часть будет проверена здесь")
+                continue
+            for message in messages:
+                self.log(message)
+            for index, plugin_results in chunk_results.items():
+                results[(index, chunk_index)] = plugin_results
+            if context.stats is not None:
+                for index, (started_at, wall, cpu, failed) in timings.items():
+                    context.stats.add_time(self.phase, plugins[index].meta()['name'], started_at, wall, cpu, failed)
+            done_chunks.add(chunk_index)
+        if executor is not None:
+            executor.shutdown()
+
+        # 4. Последовательный режим (один процесс или запасной вариант)
+        for chunk_index, slices in tasks:
+            if chunk_index in done_chunks:
+                continue
+            for index, _, _, file_paths in slices:
+                results[(index, chunk_index)] = self._scan_inline(plugins[index], file_paths)
+
+        return [r for key in sorted(results) for r in results[key]]
+
+    def _run_inline(self, inline: List[Tuple[int, BasePlugin]]) -> Dict[Tuple[int, int], List[ScanResult]]:
+        results = {}
+        for index, plugin in inline:
+            try:
+                with self._track(plugin):
+                    plugin.setup()
+                    results[(index, 0)] = plugin.run()
+                    plugin.teardown()
+            except Exception as e:
+                self.log(f"FATAL error in {plugin.meta()['name']}: {e}")
+                results[(index, 0)] = []
+        return results
+
+    def _scan_inline(self, plugin: BasePlugin, file_paths: List[str]) -> List[ScanResult]:
+        try:
+            with self._track(plugin):
+                plugin.setup()
+                results = plugin.scan_files(file_paths)
+                plugin.teardown()
+            return results
+        except Exception as e:
+            self.log(f"FATAL error in {plugin.meta()['name']}: {e}")
+            return []
+
+    def _track(self, plugin: BasePlugin):
+        stats = plugin.context.stats
+        return stats.track(self.phase, plugin.meta()['name']) if stats is not None else nullcontext()
+
+    def _chunks(self, files: List[str], tree: SourceTree):
+        """Делит список файлов на части по числу файлов и суммарному размеру"""
+        chunk, chunk_size = [], 0
+        for path in files:
+            chunk.append(path)
+            chunk_size += tree.size_of(path)
+            if len(chunk) >= self.chunk_files or chunk_size >= self.chunk_bytes:
+                yield chunk
+                chunk, chunk_size = [], 0
+        if chunk:
+            yield chunk
+
+    @staticmethod
+    def _picklable_config(config: dict) -> dict:
+        """Оставляет только те параметры конфига, которые можно передать в дочерний процесс"""
+        result = {}
+        for key, value in config.items():
+            try:
+                pickle.dumps(value)
+                result[key] = value
+            except Exception:
+                continue
+        return result
@@ -0,0 +1,162 @@
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import asdict
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+
+from core.base_plugin import FormInput, TargetForm
+from core.frontier import canonicalize_url
+
+# Состояния URL в очереди обхода
+QUEUED = 0
+DONE = 1
+
+
+class CrawlStateStore:
+    """
+    Контрольные точки обхода в SQLite: очередь (frontier), посещенные URL и найденные формы.
+    Запись идет пакетами (не чаще раза в flush_interval секунд), поэтому при падении
+    теряется не больше последних секунд работы. По scan_id обход можно продолжить.
+    """
+    def __init__(self, db_name: str = "crawl_state.db", scan_id: Optional[str] = None,
+                 flush_interval: float = 1.0, batch_size: int = 500):
+        self.scan_id = scan_id or self.new_scan_id()
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.conn = sqlite3.connect(db_name, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.create_tables()
+        self._pending_urls: List[Tuple] = []
+        self._pending_forms: List[Tuple] = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def new_scan_id() -> str:
+        return datetime.now().strftime("%Y%m%d-%H%M%S-") + uuid.uuid4().hex[:6]
+
+    def create_tables(self):
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS crawl_scans (
+                scan_id TEXT PRIMARY KEY,
+                target TEXT,
+                started TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                finished INTEGER DEFAULT 0
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS crawl_urls (
+                scan_id TEXT,
+                url_key TEXT,
+                url TEXT,
+                depth INTEGER,
+                state INTEGER,
+                PRIMARY KEY (scan_id, url_key)
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS crawl_forms (
+                scan_id TEXT,
+                fingerprint TEXT,
+                source_url TEXT,
+                data TEXT,
+                PRIMARY KEY (scan_id, fingerprint, source_url)
+            )
+        ''')
+        self.conn.commit()
+
+    # --- Сканирование ---
+
+    def target(self) -> Optional[str]:
+        """Цель сохраненного обхода (None — такого scan_id нет)"""
+        row = self.conn.execute("SELECT target FROM crawl_scans WHERE scan_id = ?", (self.scan_id,)).fetchone()
+        return row[0] if row else None
+
+    def start(self, target: str):
+        self.conn.execute("INSERT OR IGNORE INTO crawl_scans (scan_id, target) VALUES (?, ?)", (self.scan_id, target))
+        self.conn.commit()
+
+    def finish(self):
+        """Отмечает обход завершенным"""
+        self.flush()
+        with self._lock:
+            self.conn.execute("UPDATE crawl_scans SET finished = 1 WHERE scan_id = ?", (self.scan_id,))
+            self.conn.commit()
+
+    # --- Инкрементальная запись ---
+
+    def queued(self, url: str, depth: int):
+        self._add_url(url, depth, QUEUED)
+
+    def page_done(self, url: str, depth: int, links: Iterable[str]):
+        """
+        Страница посещена, а ее ссылки links поставлены в очередь (глубина depth + 1).
+        Записи попадают в один сброс на диск (ссылки — раньше страницы): при падении
+        не бывает посещенной страницы без поставленных в очередь потомков.
+        """
+        with self._lock:
+            self._pending_urls.extend((self.scan_id, canonicalize_url(link), link, depth + 1, QUEUED)
+                                      for link in links)
+            self._pending_urls.append((self.scan_id, canonicalize_url(url), url, depth, DONE))
+        self._maybe_flush()
+
+    def _add_url(self, url: str, depth: int, state: int):
+        with self._lock:
+            self._pending_urls.append((self.scan_id, canonicalize_url(url), url, depth, state))
+        self._maybe_flush()
+
+    def add_form(self, form: TargetForm):
+        data = asdict(form)
+        data.pop("pages", None)
+        with self._lock:
+            self._pending_forms.append((self.scan_id, json.dumps(form.fingerprint(form.source_url or "")),
+                                        form.source_url or "", json.dumps(data, ensure_ascii=False)))
+        self._maybe_flush()
+
+    def _maybe_flush(self):
+        if (len(self._pending_urls) + len(self._pending_forms) >= self.batch_size
+                or time.monotonic() - self._last_flush >= self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            urls, self._pending_urls = self._pending_urls, []
+            forms, self._pending_forms = self._pending_forms, []
+            self._last_flush = time.monotonic()
+            if not urls and not forms:
+                return
+            # DONE не перезаписывается на QUEUED: посещенный URL не возвращается в очередь
+            self.conn.executemany('''
+                INSERT INTO crawl_urls (scan_id, url_key, url, depth, state) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (scan_id, url_key) DO UPDATE SET state = MAX(state, excluded.state)
+            ''', urls)
+            self.conn.executemany("INSERT OR IGNORE INTO crawl_forms VALUES (?, ?, ?, ?)", forms)
+            self.conn.commit()
+
+    # --- Восстановление ---
+
+    def load(self) -> Tuple[List[Tuple[str, int]], List[Tuple[str, int]], List[TargetForm]]:
+        """Возвращает (очередь, посещенные URL, формы) в порядке записи"""
+        self.flush()
+        rows = self.conn.execute(
+            "SELECT url, depth, state FROM crawl_urls WHERE scan_id = ? ORDER BY rowid", (self.scan_id,)
+        ).fetchall()
+        queued = [(url, depth) for url, depth, state in rows if state == QUEUED]
+        done = [(url, depth) for url, depth, state in rows if state == DONE]
+
+        forms = []
+        for (data,) in self.conn.execute(
+                "SELECT data FROM crawl_forms WHERE scan_id = ? ORDER BY rowid", (self.scan_id,)):
+            item = json.loads(data)
+            item["inputs"] = [FormInput(**i) for i in item["inputs"]]
+            forms.append(TargetForm(**item))
+        return queued, done, forms
+
+    def close(self):
+        self.flush()
+        self.conn.close()
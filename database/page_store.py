@@ -0,0 +1,117 @@
+import hashlib
+import json
+import sqlite3
+import threading
+from dataclasses import asdict
+from typing import Optional
+
+from core.frontier import canonicalize_url
+from core.html_parser import FormField, ParsedForm, ParsedPage
+
+
+class StoredPage:
+    """Сохраненное состояние страницы: валидаторы HTTP, хэш тела и результат разбора"""
+    __slots__ = ("etag", "last_modified", "body_hash", "page")
+
+    def __init__(self, etag: Optional[str], last_modified: Optional[str], body_hash: str, page: ParsedPage):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.body_hash = body_hash
+        self.page = page
+
+    def conditional_headers(self) -> dict:
+        """Заголовки условного запроса (If-None-Match / If-Modified-Since)"""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class PageStore:
+    """
+    Хранилище страниц между сканированиями (SQLite): ETag, Last-Modified, хэш тела
+    и извлеченные ссылки/формы по каноническому URL. Повторный обход отправляет
+    условные запросы и при 304 или совпадении хэша не разбирает страницу заново.
+    """
+    def __init__(self, db_name: str = "page_store.db"):
+        self.conn = sqlite3.connect(db_name, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.create_tables()
+
+    def create_tables(self):
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS pages (
+                url_key TEXT PRIMARY KEY,
+                url TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                body_hash TEXT,
+                links TEXT,
+                forms TEXT,
+                updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        self.conn.commit()
+
+    @staticmethod
+    def body_hash(content: bytes) -> str:
+        return hashlib.sha1(content).hexdigest()
+
+    def get(self, url: str) -> Optional[StoredPage]:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT etag, last_modified, body_hash, links, forms FROM pages WHERE url_key = ?",
+                (canonicalize_url(url),)
+            ).fetchone()
+        if row is None:
+            return None
+        etag, last_modified, body_hash, links, forms = row
+        page = ParsedPage(links=json.loads(links), forms=[
+            ParsedForm(f["action"], f["method"], [FormField(**field) for field in f["fields"]])
+            for f in json.loads(forms)
+        ])
+        return StoredPage(etag, last_modified, body_hash, page)
+
+    def put(self, url: str, headers, body_hash: str, page: ParsedPage):
+        """Сохраняет валидаторы ответа и результат разбора (запись пакетами, см. flush)"""
+        row = (canonicalize_url(url), url, headers.get("ETag"), headers.get("Last-Modified"), body_hash,
+               json.dumps(page.links, ensure_ascii=False),
+               json.dumps([asdict(form) for form in page.forms], ensure_ascii=False))
+        with self._lock:
+            self.conn.execute('''
+                INSERT OR REPLACE INTO pages (url_key, url, etag, last_modified, body_hash, links, forms)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', row)
+            self._pending += 1
+            if self._pending >= 200:
+                self._commit()
+
+    def touch(self, url: str, headers):
+        """Страница не изменилась: обновляет валидаторы, если сервер прислал новые"""
+        etag, last_modified = headers.get("ETag"), headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+        with self._lock:
+            self.conn.execute('''
+                UPDATE pages SET etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified),
+                                 updated = CURRENT_TIMESTAMP
+                WHERE url_key = ?
+            ''', (etag, last_modified, canonicalize_url(url)))
+            self._pending += 1
+
+    def _commit(self):
+        self.conn.commit()
+        self._pending = 0
+
+    def flush(self):
+        with self._lock:
+            self._commit()
+
+    def close(self):
+        self.flush()
+        self.conn.close()
@@ -1,7 +1,12 @@
 import argparse
+import os
+import re
 import sys
 from core.plugin_manager import PluginManager
 from core.engine import ScannerEngine
+from core.scope import STATIC_EXTENSIONS
+from core.url_clusters import DEFAULT_SAMPLES_PER_TEMPLATE
+from database.crawl_state import CrawlStateStore
 from reports.reporter import ReportGenerator, ConsoleReporter
 
 def main():
@@ -13,6 +18,52 @@ def main():
     scan_group.add_argument("--json", default="report.json", help="Output JSON file path")
     scan_group.add_argument("--pdf", help="Output PDF file path (optional)")
     scan_group.add_argument("--source-path", help="Path to local source code for whitebox analysis")  # <-- Новый аргумент
+    scan_group.add_argument("--engine-mode", choices=["threads", "async"], default="threads",
+                            help="Audit engine mode: thread pool or single asyncio event loop")
+    scan_group.add_argument("--pipeline", action="store_true",
+                            help="Start auditing URLs and forms while discovery is still running")
+    scan_group.add_argument("--workers", type=int, default=5, help="Audit worker threads (also sizes the HTTP connection pool)")
+    scan_group.add_argument("--whitebox-workers", type=int, help="Processes for whitebox analysis (default: CPU count)")
+    scan_group.add_argument("--max-rps", type=float, help="Requests-per-second ceiling per target host")
+    scan_group.add_argument("--no-adaptive", action="store_true",
+                            help="Disable adaptive per-host concurrency (always use --workers)")
+    scan_group.add_argument("--timeout", type=float, default=10, help="Default HTTP request timeout in seconds")
+    scan_group.add_argument("--crawl-workers", type=int, help="Concurrent crawler fetch workers (default: --workers)")
+    scan_group.add_argument("--max-depth", type=int, help="Maximum crawl depth from the target URL")
+    scan_group.add_argument("--max-pages", type=int, help="Maximum number of pages to crawl")
+    scan_group.add_argument("--html-parser", choices=["auto", "lxml", "fast", "stdlib", "bs4"], default="auto",
+                            help="HTML parser backend for discovery plugins")
+    scan_group.add_argument("--samples-per-template", type=int, default=DEFAULT_SAMPLES_PER_TEMPLATE,
+                            help="Audit at most N URLs per URL template (path shape + parameter names); "
+                                 "0 = all (default). Which N are audited depends on crawl order and may vary between runs")
+    scan_group.add_argument("--similarity", choices=["minhash", "shingle", "tokens", "difflib"], default="minhash",
+                            help="Response comparison engine for heuristic checks")
+    scan_group.add_argument("--baseline-samples", type=int, default=2,
+                            help="Baseline fetches per injection point used to detect dynamic content; 1 = no detection")
+    scan_group.add_argument("--time-sqli", action="store_true",
+                            help="Also run the time-based blind SQLi check (slow: several seconds per parameter)")
+    scan_group.add_argument("--time-sqli-delay", type=float, default=1.0,
+                            help="Minimum SLEEP() delay in seconds for time-based SQLi (raised on jittery targets)")
+    scan_group.add_argument("--scope-host", action="append", default=[], metavar="GLOB",
+                            help="In-scope host glob, e.g. '*.example.com' (repeatable; default: target host)")
+    scan_group.add_argument("--include", action="append", default=[], metavar="GLOB",
+                            help="Only scan paths matching this glob (repeatable)")
+    scan_group.add_argument("--exclude", action="append", default=[], metavar="GLOB",
+                            help="Never request paths matching this glob, e.g. '/logout*' (repeatable)")
+    scan_group.add_argument("--include-regex", action="append", default=[], metavar="REGEX",
+                            help="Only scan URLs matching this regex (repeatable)")
+    scan_group.add_argument("--exclude-regex", action="append", default=[], metavar="REGEX",
+                            help="Never request URLs matching this regex (repeatable)")
+    scan_group.add_argument("--exclude-ext", default=",".join(STATIC_EXTENSIONS),
+                            help="Comma-separated file extensions to skip (default: static assets)")
+    scan_group.add_argument("--no-sitemap", action="store_true",
+                            help="Do not seed the crawl from robots.txt and sitemap.xml")
+    scan_group.add_argument("--state-db", metavar="FILE",
+                            help="SQLite file for crawl checkpoints, e.g. crawl_state.db (default: no checkpointing)")
+    scan_group.add_argument("--page-store", metavar="FILE",
+                            help="SQLite file with page validators for conditional re-crawls of the same target, "
+                                 "e.g. page_store.db (default: disabled; do not share between concurrent scans)")
+    scan_group.add_argument("--resume", metavar="SCAN_ID", help="Resume an interrupted crawl by its scan id")
     
     plugin_group = parser.add_argument_group('Plugins Management')
     plugin_group.add_argument("--list-plugins", action="store_true", help="List plugins")
@@ -48,15 +99,62 @@ def main():
         print("... Listing plugins ...") 
         sys.exit(0)
 
+    # Ошибка в регулярном выражении scope — ошибка аргументов, а не трассировка из движка
+    for flag, patterns in (("--include-regex", args.include_regex), ("--exclude-regex", args.exclude_regex)):
+        for pattern in patterns:
+            try:
+                re.compile(pattern)
+            except re.error as e:
+                parser.error(f"{flag}: invalid regex {pattern!r}: {e}")
+
+    if args.resume and not args.state_db:
+        parser.error("--resume requires --state-db (the checkpoint file of the interrupted scan)")
+    if args.resume and not os.path.exists(args.state_db):
+        parser.error(f"--resume: crawl state file not found: {args.state_db!r}")
+
     if args.url:
         print(f"[*] Starting SightSec on {args.url}...\n")
+        scan_id = args.resume or CrawlStateStore.new_scan_id()
+        if args.state_db:
+            print(f"[*] Scan ID: {scan_id} (resume with --resume {scan_id})")
 
         # Подготовка конфигурации с путем к исходникам
-        config = {}
+        config = {
+            "engine_mode": args.engine_mode,
+            "pipeline": args.pipeline,
+            "max_workers": args.workers,
+            "timeout": args.timeout,
+            "max_rps": args.max_rps,
+            "adaptive_concurrency": not args.no_adaptive,
+            "crawl_workers": args.crawl_workers,
+            "crawl_max_depth": args.max_depth,
+            "crawl_max_pages": args.max_pages,
+            "html_parser": args.html_parser,
+            "sitemap": not args.no_sitemap,
+            "samples_per_template": args.samples_per_template,
+            "similarity": args.similarity,
+            "baseline_samples": args.baseline_samples,
+            "time_sqli_delay": args.time_sqli_delay,
+            "scope_hosts": args.scope_host,
+            "scope_include": args.include,
+            "scope_exclude": args.exclude,
+            "scope_include_regex": args.include_regex,
+            "scope_exclude_regex": args.exclude_regex,
+            "scope_exclude_extensions": [e.strip() for e in args.exclude_ext.split(",") if e.strip()],
+            "crawl_state_path": args.state_db or None,
+            "scan_id": scan_id,
+            "resume": bool(args.resume),
+            "page_store_path": args.page_store or None
+        }
         if args.source_path:
             config["local_source_path"] = args.source_path
+            config["whitebox_workers"] = args.whitebox_workers
             print(f"[*] WhiteBox analysis enabled. Source path: {args.source_path}")
 
+        if args.time_sqli and "Time-Based Blind SQLi" not in pm.enabled_plugins:
+            # Только для этого запуска: plugins_config.json не меняется
+            pm.enabled_plugins = pm.enabled_plugins + ["Time-Based Blind SQLi"]
+
         engine = ScannerEngine(plugin_manager=pm)
         # Получаем список результатов (ScanResult)
         results = engine.start_scan(target_url=args.url, config=config)
@@ -66,7 +164,7 @@ def main():
 
         # 4. Генерация отчетов
         # [cite_start]JSON (обязательный по ТЗ [cite: 10])
-        ReportGenerator.save_json(results, args.json)
+        ReportGenerator.save_json(results, args.json, stats=results.stats)
         
         # PDF (по желанию пользователя)
         if args.pdf:
@@ -220,7 +220,7 @@ QScrollBar::add-line:horizontal, QScrollBar::sub-line:horizontal {
 
 # --- WORKER THREAD ---
 class ScanWorker(QThread):
-    finished_signal = pyqtSignal(list)
+    finished_signal = pyqtSignal(object)  # ScanResultList (список + stats)
     log_signal = pyqtSignal(str)
 
     def __init__(self, engine, target_url, config):
@@ -473,6 +473,7 @@ class MainUI(QMainWindow):
         self.pm.discover_plugins()
         self.engine = ScannerEngine(self.pm)
         self.current_results = []
+        self.current_stats = None
         
         self.SEVERITY_ORDER = {"CRITICAL": 0, "HIGH": 1, "MEDIUM": 2, "LOW": 3, "INFO": 4}
 
@@ -691,6 +692,7 @@ class MainUI(QMainWindow):
         )
         
         self.current_results = sorted_results
+        self.current_stats = getattr(results, "stats", None)
         self.scan_btn.setEnabled(True)
         self.scan_btn.setText("Сканировать")
         self.status_lbl.setText(f"Готово. Найдено: {len(sorted_results)}")
@@ -715,7 +717,7 @@ class MainUI(QMainWindow):
         path, _ = QFileDialog.getSaveFileName(self, "Сохранить отчет", "report.json", "JSON Files (*.json)")
         if path:
             try:
-                ReportGenerator.save_json(self.current_results, path)
+                ReportGenerator.save_json(self.current_results, path, stats=self.current_stats)
                 QMessageBox.information(self, "Успех", f"Отчет сохранен:\n{path}")
             except Exception as e:
                 QMessageBox.critical(self, "Ошибка", f"Ошибка сохранения:\n{e}")
@@ -1,52 +1,109 @@
+import asyncio
+from functools import partial
 from core.base_plugin import BasePlugin, ScanResult
+from core.signatures import ERROR_SIGNATURES, SQL, describe
 
 class SQLInjector(BasePlugin):
     @classmethod
     def meta(cls) -> dict:
         return {
             "name": "SQL Injection Scanner",
-            "version": "1.0",
+            "version": "1.2",
             "type": "audit"
         }
 
+    # Простые пейлоады для Error-based SQLi
+    PAYLOADS = ["'", "\"", "' OR '1'='1"]
+
     def run(self):
-        results = []
-        # Простые пейлоады для Error-based SQLi
-        payloads = ["'", "\"", "' OR '1'='1"]
-        errors = ["syntax error", "mysql_fetch", "ORA-", "PostgreSQL"]
+        return [r for unit in self.work_units() for r in unit()]
 
+    def work_units(self):
+        """Единица работы — одно поле формы с одним пейлоадом"""
         # 1. Проверка найденных форм
-        for form in self.context.discovered_forms:
+        for form, inp, target_url in self._injection_points():
+            for payload in self.PAYLOADS:
+                yield partial(self._check, form, inp, target_url, payload)
+
+    def _check(self, form, inp, target_url: str, payload: str):
+        data = self._build_data(form, inp, payload)
+
+        try:
+            if form.method == 'POST':
+                res = self.context.session.post(target_url, data=data)
+            else:
+                res = self.context.session.get(target_url, params=data)
+
+            errors = self._sql_errors(res.text)
+            if errors:
+                errors = self._new_errors(form, errors)
+            return [self._report(target_url, inp, payload, errors[0])] if errors else []
+        except Exception as e:
+            self.context.log(f"SQLi check fail: {e}")
+            return []
+
+    async def run_async(self):
+        """Отправляет все комбинации форма × поле × пейлоад одновременно"""
+        if self.context.async_http is None:
+            return await super().run_async()
+
+        # Ждем конца потока форм вне event loop (актуально для режима pipeline)
+        await asyncio.to_thread(self.context.discovered_forms.wait_closed)
+
+        async def check(form, inp, target_url, payload):
+            data = self._build_data(form, inp, payload)
+            try:
+                if form.method == 'POST':
+                    res = await self.context.async_http.post(target_url, data=data)
+                else:
+                    res = await self.context.async_http.get(target_url, params=data)
+                errors = self._sql_errors(res.text)
+                if errors:
+                    errors = await asyncio.to_thread(self._new_errors, form, errors)
+                return self._report(target_url, inp, payload, errors[0]) if errors else None
+            except Exception as e:
+                self.context.log(f"SQLi check fail: {e}")
+                return None
+
+        checks = [
+            check(form, inp, target_url, payload)
+            for form, inp, target_url in self._injection_points()
+            for payload in self.PAYLOADS
+        ]
+        return [r for r in await asyncio.gather(*checks) if r]
+
+    def _injection_points(self):
+        """Перебирает пары (форма, поле), пригодные для инъекции"""
+        for form in self.context.discovered_forms.stream():
             target_url = form.get_full_url(self.context.target_url)
-            
+            if not self.context.scope.allows(target_url):
+                continue
             for inp in form.inputs:
                 if inp.type in ['submit', 'button', 'image']:
                     continue
-                
-                for payload in payloads:
-                    # Подготовка данных
-                    data = {i.name: i.value for i in form.inputs}
-                    data[inp.name] = payload # Внедряем пейлоад
-                    
-                    try:
-                        if form.method == 'POST':
-                            res = self.context.session.post(target_url, data=data)
-                        else:
-                            res = self.context.session.get(target_url, params=data)
-                        
-                        # Анализ ответа
-                        for err in errors:
-                            if err in res.text:
-                                results.append(ScanResult(
-                                    plugin_name=self.meta()['name'],
-                                    vulnerability_id="SQLI-001",
-                                    severity="CRITICAL", # Согласно ТЗ классификация критичности
-                                    url=target_url,
-                                    evidence=f"Input: {inp.name}, Payload: {payload}",
-                                    response_snippet=err
-                                ))
-                                break # Нашли - идем к следующему инпуту
-                    except Exception as e:
-                        self.context.log(f"SQLi check fail: {e}")
-        
-        return results
\ No newline at end of file
+                yield form, inp, target_url
+
+    def _sql_errors(self, text: str):
+        """Сигнатуры ошибок СУБД в ответе (core/signatures, один проход по телу)"""
+        return [m for m in ERROR_SIGNATURES.find_all(text) if m.signature.category == SQL]
+
+    def _new_errors(self, form, errors):
+        """Отбрасывает ошибки, которые есть и в исходном ответе формы — они не вызваны пейлоадом"""
+        baseline = self.context.baselines.for_form(form, self.context.target_url)
+        return baseline.new_errors(errors) if baseline is not None else errors
+
+    def _build_data(self, form, inp, payload: str) -> dict:
+        # Подготовка данных
+        data = {i.name: i.value for i in form.inputs}
+        data[inp.name] = payload # Внедряем пейлоад
+        return data
+
+    def _report(self, target_url: str, inp, payload: str, error):
+        return ScanResult(
+            plugin_name=self.meta()['name'],
+            vulnerability_id="SQLI-001",
+            severity="CRITICAL", # Согласно ТЗ классификация критичности
+            url=target_url,
+            evidence=f"Input: {inp.name}, Payload: {payload}, Signature: {describe(error)}",
+            response_snippet=error.text
+        )
@@ -1,13 +1,13 @@
 # plugins/crawler.py
 from core.base_plugin import BasePlugin, ScanResult
 from typing import List, Dict, Any
-from bs4 import BeautifulSoup
+from core.html_parser import HTML_CONTENT_TYPES, parse_html
 from urllib.parse import urljoin
 
 class SimpleCrawler(BasePlugin):
     @classmethod
     def meta(self):
-        return {"name": "Link Spider", "type": "discovery", "version": "1.0"}
+        return {"name": "Link Spider", "type": "discovery", "version": "1.1"}
 
     def run(self) -> List[ScanResult]:
         target = self.context.target_url
@@ -15,16 +15,15 @@ class SimpleCrawler(BasePlugin):
         
         try:
             # Используем общую сессию
-            response = self.context.session.get(target)
-            soup = BeautifulSoup(response.text, 'html.parser')
+            response = self.context.session.get(target, content_types=HTML_CONTENT_TYPES)
+            page = parse_html(response.text, self.context.config.get('html_parser'))
             
             count = 0
-            for link in soup.find_all('a'):
-                href = link.get('href')
+            for href in page.links:
                 if href:
                     full_url = urljoin(target, href)
-                    # Фильтруем внешние ссылки, оставляем только внутренние
-                    if target in full_url and full_url not in self.context.discovered_urls:
+                    # Оставляем только ссылки в границах сканирования (context.scope)
+                    if self.context.scope.allows(full_url) and full_url not in self.context.discovered_urls:
                         self.context.discovered_urls.add(full_url)
                         count += 1
             
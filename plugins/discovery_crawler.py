@@ -1,61 +1,263 @@
+import contextvars
+import queue
+import threading
 import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
-from core.base_plugin import BasePlugin, ScanResult, TargetForm, FormInput
+from urllib.parse import urljoin
+from core.base_plugin import BasePlugin, ScanResult, TargetForm
+from core.html_parser import HTML_CONTENT_TYPES, parse_html
+from core.frontier import CrawlFrontier
+from core.sitemap import SitemapSeeder
+from database.crawl_state import CrawlStateStore
+from database.page_store import PageStore
 
 class SimpleCrawler(BasePlugin):
     @classmethod
     def meta(cls) -> dict:
         return {
             "name": "Basic Crawler",
-            "version": "1.0",
+            "version": "1.5",
             "type": "discovery" # Важно: запускается первым
         }
 
     def run(self):
+        """
+        Параллельный обход: N потоков загружают страницы из общей очереди (frontier),
+        разбор HTML идет отдельной стадией в текущем потоке, найденные ссылки
+        возвращаются в очередь. Параметры конфига: crawl_workers, crawl_max_pages,
+        crawl_timeout; границы обхода (хосты, пути, глубина) задает context.scope.
+        С crawl_state_path очередь, посещенные URL и формы сохраняются в SQLite
+        под ключом scan_id; при resume=True обход продолжается с сохраненного места.
+        С page_store_path запросы условные (ETag / Last-Modified), а неизмененные
+        страницы не разбираются повторно.
+        С sitemap=True (по умолчанию) очередь параллельно пополняется адресами
+        из robots.txt и sitemap.xml.
+        """
+        config = self.context.config
+        workers = max(1, config.get("crawl_workers") or config.get("max_workers", 5))
+        self.scope = self.context.scope
+        self.max_pages = config.get("crawl_max_pages")
+        self.timeout = config.get("crawl_timeout", 5)
+
         start_url = self.context.target_url
-        domain = urlparse(start_url).netloc
-        visited = set()
-        queue = [start_url]
-        
-        self.context.log(f"Crawler started on {start_url}")
-
-        while queue:
-            url = queue.pop(0)
-            if url in visited:
-                continue
-            
+        # Каждый уникальный (канонический) URL попадает в очередь ровно один раз
+        self.frontier = CrawlFrontier()
+        self.state = self._open_state(start_url)
+        self.pages = PageStore(config["page_store_path"]) if config.get("page_store_path") else None
+        self.not_modified = 0  # Ответы 304
+        self.unchanged = 0     # Ответы 200 с тем же телом
+        if not (self.state and self._restore()):
+            self.frontier.add(start_url)
+            self._checkpoint_queued(start_url, 0)
+        self._cond = threading.Condition()
+        self._in_flight = 0  # Взяты из очереди, но еще не разобраны
+        self._stop = False
+        self._fetched = queue.Queue()
+        # URL из sitemap — на расстоянии одного перехода от корня
+        self._seeding = config.get("sitemap", True) and self.scope.allows_depth(1)
+
+        self.context.log(f"Crawler started on {start_url} (workers={workers})")
+
+        # Каждому потоку — своя копия контекста: запросы учитываются в статистике этого плагина
+        stages = [self._fetch_worker] * workers + ([self._seed_worker] if self._seeding else [])
+        threads = [threading.Thread(target=contextvars.copy_context().run, args=(stage,), daemon=True)
+                   for stage in stages]
+        for thread in threads:
+            thread.start()
+        try:
+            self._parse_stage()
+        finally:
+            with self._cond:
+                self._stop = True
+                self._cond.notify_all()
+            for thread in threads:
+                thread.join()
+            if self.state:
+                if not self.frontier and not self._in_flight:
+                    self.state.finish()
+                self.state.close()
+            if self.pages:
+                self.pages.close()
+
+        self.context.log(f"Crawler finished: {self.frontier.seen_count} уникальных URL")
+        if self.pages:
+            self.context.log(f"Page store: не изменено {self.not_modified} (304) + {self.unchanged} (тот же хэш)")
+        return [] # Discovery плагины обычно не возвращают уязвимости, а наполняют контекст
+
+    def _open_state(self, start_url: str):
+        """Открывает хранилище контрольных точек (None — сохранение выключено)"""
+        config = self.context.config
+        path = config.get("crawl_state_path")
+        if not path:
+            return None
+        state = CrawlStateStore(path, config.get("scan_id"))
+        target = state.target()
+        if target is not None and target != start_url:
+            self.context.log(f"Crawl state {state.scan_id} belongs to {target}, checkpointing disabled")
+            state.close()
+            return None
+        state.start(start_url)
+        self.context.log(f"Crawl state: {path}, scan id {state.scan_id}")
+        return state
+
+    def _restore(self) -> bool:
+        """Восстанавливает сохраненный обход; False — восстанавливать нечего"""
+        if not self.context.config.get("resume"):
+            return False
+        queued, done, forms = self.state.load()
+        if not queued and not done:
+            return False
+        # Посещенные страницы не загружаются повторно, но снова попадают в контекст
+        for url, _ in done:
+            self.frontier.mark_seen(url)
+            self.context.discovered_urls.add(url)
+        for url, depth in queued:
+            self.frontier.add(url, depth)
+        for form in forms:
+            self.context.discovered_forms.append(form)
+        self.context.log(f"Crawl resumed: {len(done)} посещено, {len(queued)} в очереди, {len(forms)} форм")
+        return True
+
+    def _checkpoint_queued(self, url: str, depth: int):
+        if self.state:
+            self.state.queued(url, depth)
+
+    def _fetch_worker(self):
+        """Стадия загрузки: берет URL из очереди и передает ответ на разбор"""
+        while True:
+            with self._cond:
+                while not self.frontier and not self._stop:
+                    self._cond.wait()
+                if self._stop:
+                    return
+                url, depth = self.frontier.pop()
+                self._in_flight += 1
+
+            stored = res = None
             try:
-                # Используем сессию из контекста
-                res = self.context.session.get(url, timeout=5)
-                visited.add(url)
-                self.context.discovered_urls.add(url)
-                
-                if res.headers.get('Content-Type', '').startswith('text/html'):
-                    soup = BeautifulSoup(res.text, 'html.parser')
-                    
-                    # 1. Поиск новых ссылок
-                    for a_tag in soup.find_all('a', href=True):
-                        link = urljoin(url, a_tag['href'])
-                        if urlparse(link).netloc == domain and link not in visited:
-                            queue.append(link)
-
-                    # 2. Поиск форм (для фаззинга)
-                    for form in soup.find_all('form'):
-                        action = form.get('action') or url
-                        method = form.get('method', 'GET').upper()
-                        inputs = []
-                        for inp in form.find_all(['input', 'textarea']):
-                            inputs.append(FormInput(
-                                name=inp.get('name', ''),
-                                type=inp.get('type', 'text'),
-                                value=inp.get('value', '')
-                            ))
-                        
-                        target_form = TargetForm(action, method, inputs)
-                        self.context.discovered_forms.append(target_form)
-                        
+                stored = self._stored(url)
+                # Используем сессию из контекста; тело не-HTML ответов не загружается.
+                # Условный запрос с заголовками не попадает в кэш ответов сканирования
+                res = self.context.session.get(url, timeout=self.timeout, content_types=HTML_CONTENT_TYPES,
+                                               headers=stored.conditional_headers() if stored else None)
             except Exception as e:
                 self.context.log(f"Error crawling {url}: {e}")
-        
-        return [] # Discovery плагины обычно не возвращают уязвимости, а наполняют контекст
\ No newline at end of file
+            finally:
+                # Стадия разбора ждет результат каждого URL в полёте: он передается при любой ошибке
+                self._fetched.put((url, depth, res, stored))
+
+    def _stored(self, url: str):
+        """Сохраненная версия страницы; ошибка хранилища (например, занятая база) — как ее отсутствие"""
+        if not self.pages:
+            return None
+        try:
+            return self.pages.get(url)
+        except Exception as e:
+            self.context.log(f"Page store error for {url}: {e}")
+            return None
+
+    def _seed_worker(self):
+        """Стадия посева: адреса из robots.txt и sitemap добавляются в очередь по мере чтения"""
+        seeder = SitemapSeeder(self.context.session, timeout=self.timeout, log=self.context.log,
+                               scope=self.scope)
+        added = 0
+        try:
+            for link in seeder.discover(self.context.target_url):
+                if not self.scope.allows(link, 1):
+                    continue
+                with self._cond:
+                    if self._stop or self._page_limit_reached():
+                        break
+                    if self.frontier.add(link, 1):
+                        added += 1
+                        self._checkpoint_queued(link, 1)
+                        self._cond.notify()
+        except Exception as e:
+            self.context.log(f"Sitemap error: {e}")
+        finally:
+            with self._cond:
+                self._seeding = False
+                self._cond.notify_all()
+            self._fetched.put(None)  # Будит стадию разбора, если она ждет
+            self.context.log(f"Sitemap: добавлено в очередь {added} URL")
+
+    def _page_limit_reached(self) -> bool:
+        return self.max_pages is not None and self.frontier.seen_count >= self.max_pages
+
+    def _parse_stage(self):
+        """Стадия разбора: извлекает ссылки и формы, пока есть очередь или загрузки в полёте"""
+        while True:
+            with self._cond:
+                if not self._in_flight and not self.frontier and not self._seeding:
+                    return
+            item = self._fetched.get()
+            if item is None:
+                continue
+            url, depth, res, stored = item
+
+            links = []
+            if res is not None:
+                self.context.discovered_urls.add(url)
+                try:
+                    links = self._parse(url, res, stored)
+                except Exception as e:
+                    self.context.log(f"Error crawling {url}: {e}")
+
+            with self._cond:
+                queued = []
+                if self.scope.allows_depth(depth + 1):
+                    for link in links:
+                        if self._page_limit_reached():
+                            break
+                        if self.frontier.add(link, depth + 1):
+                            queued.append(link)
+                # Страница отмечается посещенной вместе с постановкой потомков в очередь (одна запись
+                # чекпоинта). Страницы с ошибкой загрузки остаются в очереди: при возобновлении они повторяются
+                if self.state and res is not None:
+                    self.state.page_done(url, depth, queued)
+                self._in_flight -= 1
+                self._cond.notify_all()
+
+    def _parse(self, url: str, res: requests.Response, stored=None) -> list:
+        """Разбирает страницу: формы отправляет в контекст, возвращает ссылки в scope"""
+        page = self._extract(url, res, stored)
+        if page is None:
+            return []
+
+        # 1. Поиск новых ссылок
+        links = []
+        for href in page.links:
+            link = urljoin(url, href)
+            if self.scope.allows(link):
+                links.append(link)
+
+        # 2. Поиск форм (для фаззинга)
+        for form in page.forms:
+            target_form = TargetForm.from_parsed(form, url)
+            if not self.scope.allows(urljoin(url, target_form.action_url)):
+                continue  # Форма отправляется за пределы scope
+            self.context.discovered_forms.append(target_form)
+            if self.state:
+                self.state.add_form(target_form)
+
+        return links
+
+    def _extract(self, url: str, res: requests.Response, stored=None):
+        """Ссылки и формы страницы: из хранилища, если страница не изменилась, иначе разбор HTML"""
+        if stored is not None and res.status_code == 304:
+            self.not_modified += 1
+            self.pages.touch(url, res.headers)
+            return stored.page
+        if not res.headers.get('Content-Type', '').lower().startswith(HTML_CONTENT_TYPES):
+            return None
+        if self.pages is None:
+            return parse_html(res.text, self.context.config.get('html_parser'))
+
+        body_hash = PageStore.body_hash(res.content)
+        if stored is not None and stored.body_hash == body_hash:
+            self.unchanged += 1
+            self.pages.touch(url, res.headers)
+            return stored.page
+        page = parse_html(res.text, self.context.config.get('html_parser'))
+        if not getattr(res, 'truncated', False):  # Обрезанное тело не сохраняем
+            self.pages.put(url, res.headers, body_hash, page)
+        return page
@@ -1,12 +1,13 @@
 # plugins/form_finder.py
-from core.base_plugin import BasePlugin, ScanResult, TargetForm, FormInput
+from core.base_plugin import BasePlugin, ScanResult, TargetForm
 from typing import List, Dict, Any
-from bs4 import BeautifulSoup
+from core.html_parser import HTML_CONTENT_TYPES, parse_html
+from urllib.parse import urljoin
 
 class FormFinderPlugin(BasePlugin):
     @classmethod
     def meta(self):
-        return {"name": "HTML Form Finder", "type": "discovery", "version": "1.0"}
+        return {"name": "HTML Form Finder", "type": "discovery", "version": "1.1"}
 
     def run(self) -> List[ScanResult]:
         target = self.context.target_url
@@ -14,29 +15,14 @@ class FormFinderPlugin(BasePlugin):
         
         try:
             # Используем общую сессию для получения контента
-            response = self.context.session.get(target)
-            soup = BeautifulSoup(response.text, 'html.parser')
+            response = self.context.session.get(target, content_types=HTML_CONTENT_TYPES)
+            page = parse_html(response.text, self.context.config.get('html_parser'))
             
             forms_found_count = 0
-            for form in soup.find_all('form'):
-                action = form.get('action') or self.context.target_url
-                method = form.get('method', 'get').upper()
-                
-                form_data = TargetForm(
-                    action_url=action,
-                    method=method,
-                    inputs=[]
-                )
-                
-                for field in form.find_all(['input', 'textarea', 'select']):
-                    input_name = field.get('name')
-                    input_type = field.get('type', 'text')
-                    input_value = field.get('value', '')
-                    
-                    if input_name:
-                        form_data.inputs.append(
-                            FormInput(input_name, input_type, input_value)
-                        )
+            for form in page.forms:
+                form_data = TargetForm.from_parsed(form, target)
+                if not self.context.scope.allows(urljoin(target, form_data.action_url)):
+                    continue  # Форма отправляется за пределы scope
                 
                 self.context.discovered_forms.append(form_data)
                 forms_found_count += 1
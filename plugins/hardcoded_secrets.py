@@ -1,6 +1,5 @@
-import os
 import re
-from typing import List
+from typing import List, Optional
 from core.base_plugin import BasePlugin, ScanContext, ScanResult
 
 class HardcodedSecretsPlugin(BasePlugin):
@@ -15,34 +14,34 @@ class HardcodedSecretsPlugin(BasePlugin):
             'description': 'Ищет жестко закодированные пароли, API ключи и другие секреты в исходном коде'
         }
 
+    # Паттерны для поиска секретов
+    PATTERNS = {
+        'API_KEY': r'api[_-]?key\s*=\s*["\']([^"\']{10,100})["\']',
+        'PASSWORD': r'password\s*=\s*["\']([^"\']{4,50})["\']',
+        'SECRET_KEY': r'secret[_-]?key\s*=\s*["\']([^"\']{10,100})["\']',
+        'DATABASE_URL': r'(mysql|postgresql|mongodb)://[^"\'\s]+',
+        'PRIVATE_KEY': r'-----BEGIN (RSA|DSA|EC|OPENSSH) PRIVATE KEY-----',
+        'AWS_ACCESS_KEY': r'AKIA[0-9A-Z]{16}',
+        'JWT_TOKEN': r'eyJhbGciOiJ[^"\']{50,500}'
+    }
+
     def run(self) -> List[ScanResult]:
-        results = []
-        source_path = self.context.config.get("local_source_path")
-        
-        if not source_path or not os.path.exists(source_path):
+        files = self.source_files()
+        if files is None:
             self.context.log("Путь к исходному коду не указан или не существует")
-            return results
+            return []
+        return self.scan_files(files)
 
-        # Паттерны для поиска секретов
-        patterns = {
-            'API_KEY': r'api[_-]?key\s*=\s*["\']([^"\']{10,100})["\']',
-            'PASSWORD': r'password\s*=\s*["\']([^"\']{4,50})["\']',
-            'SECRET_KEY': r'secret[_-]?key\s*=\s*["\']([^"\']{10,100})["\']',
-            'DATABASE_URL': r'(mysql|postgresql|mongodb)://[^"\'\s]+',
-            'PRIVATE_KEY': r'-----BEGIN (RSA|DSA|EC|OPENSSH) PRIVATE KEY-----',
-            'AWS_ACCESS_KEY': r'AKIA[0-9A-Z]{16}',
-            'JWT_TOKEN': r'eyJhbGciOiJ[^"\']{50,500}'
-        }
-
-        for root, dirs, files in os.walk(source_path):
-            # Исключаем некоторые директории
-            dirs[:] = [d for d in dirs if d not in ['.git', 'node_modules', '__pycache__']]
-            
-            for file in files:
-                if self._is_code_file(file):
-                    file_path = os.path.join(root, file)
-                    results.extend(self._scan_file(file_path, patterns))
+    def source_files(self) -> Optional[List[str]]:
+        tree = self.context.source_tree
+        if tree is None:
+            return None
+        return [f.path for f in tree.files if self._is_code_file(f.name)]
 
+    def scan_files(self, file_paths: List[str]) -> List[ScanResult]:
+        results = []
+        for file_path in file_paths:
+            results.extend(self._scan_file(file_path, self.PATTERNS))
         return results
 
     def _is_code_file(self, filename: str) -> bool:
@@ -56,31 +55,30 @@ class HardcodedSecretsPlugin(BasePlugin):
         results = []
         
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-                lines = content.split('\n')
-                
-                for line_num, line in enumerate(lines, 1):
-                    for secret_type, pattern in patterns.items():
-                        matches = re.finditer(pattern, line, re.IGNORECASE)
-                        for match in matches:
-                            # Пропускаем короткие значения и комментарии
-                            if self._is_false_positive(line):
-                                continue
-                                
-                            secret_value = match.group(1) if match.groups() else match.group(0)
-                            # Маскируем часть секрета для вывода
-                            masked_secret = self._mask_secret(secret_value)
-                            
-                            results.append(ScanResult(
-                                plugin_name=self.meta()['name'],
-                                vulnerability_id=f"HARDCODED_{secret_type}",
-                                severity="HIGH",
-                                url=file_path,
-                                evidence=f"Обнаружен {secret_type}: {masked_secret}",
-                                response_snippet=f"Строка {line_num}: {line.strip()}"
-                            ))
+            content = self.context.source_tree.read_text(file_path)
+            lines = content.split('\n')
+            
+            for line_num, line in enumerate(lines, 1):
+                for secret_type, pattern in patterns.items():
+                    matches = re.finditer(pattern, line, re.IGNORECASE)
+                    for match in matches:
+                        # Пропускаем короткие значения и комментарии
+                        if self._is_false_positive(line):
+                            continue
                             
+                        secret_value = match.group(1) if match.groups() else match.group(0)
+                        # Маскируем часть секрета для вывода
+                        masked_secret = self._mask_secret(secret_value)
+                        
+                        results.append(ScanResult(
+                            plugin_name=self.meta()['name'],
+                            vulnerability_id=f"HARDCODED_{secret_type}",
+                            severity="HIGH",
+                            url=file_path,
+                            evidence=f"Обнаружен {secret_type}: {masked_secret}",
+                            response_snippet=f"Строка {line_num}: {line.strip()}"
+                        ))
+                        
         except Exception as e:
             self.context.log(f"Ошибка чтения файла {file_path}: {e}")
             
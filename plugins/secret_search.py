@@ -1,42 +1,45 @@
 # plugins/secret_search.py
-import os
 import re
 from core.base_plugin import BasePlugin, ScanResult
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 class SourceCodeAuditor(BasePlugin):
     @classmethod
     def meta(self):
         return {"name": "Hardcoded Secrets Scanner", "type": "whitebox", "version": "1.0"}
 
+    # Регулярки для поиска ключей (AWS, Private Keys, etc)
+    PATTERNS = {
+        "AWS Key": r"AKIA[0-9A-Z]{16}",
+        "Generic API Key": r"api_key\s*=\s*['\"][a-zA-Z0-9]{20,}['\"]"
+    }
+
     def run(self) -> List[ScanResult]:
-        # В конфиге мы ожидаем путь к локальной папке с кодом
-        source_path = self.context.config.get("local_source_path")
-        if not source_path or not os.path.exists(source_path):
+        files = self.source_files()
+        if files is None:
             return []
+        return self.scan_files(files)
 
-        results = []
-        # Регулярки для поиска ключей (AWS, Private Keys, etc)
-        patterns = {
-            "AWS Key": r"AKIA[0-9A-Z]{16}",
-            "Generic API Key": r"api_key\s*=\s*['\"][a-zA-Z0-9]{20,}['\"]"
-        }
+    def source_files(self) -> Optional[List[str]]:
+        # Индекс исходников строится движком по config["local_source_path"]
+        tree = self.context.source_tree
+        if tree is None:
+            return None
+        return [f.path for f in tree.files if f.name.endswith(('.py', '.js', '.env', '.config'))]
 
-        for root, _, files in os.walk(source_path):
-            for file in files:
-                if file.endswith(('.py', '.js', '.env', '.config')):
-                    full_path = os.path.join(root, file)
-                    with open(full_path, 'r', errors='ignore') as f:
-                        content = f.read()
-                        for name, regex in patterns.items():
-                            match = re.search(regex, content)
-                            if match:
-                                results.append(ScanResult(
-                                    plugin_name=self.meta()['name'],
-                                    vulnerability_id="SEC-CODE",
-                                    severity="CRITICAL",
-                                    url=f"file://{full_path}",
-                                    evidence=match.group(0),
-                                    response_snippet="Найден хардкод секрета в исходном коде"
-                                ))
-        return results
\ No newline at end of file
+    def scan_files(self, file_paths: List[str]) -> List[ScanResult]:
+        results = []
+        for full_path in file_paths:
+            content = self.context.source_tree.read_text(full_path)
+            for name, regex in self.PATTERNS.items():
+                match = re.search(regex, content)
+                if match:
+                    results.append(ScanResult(
+                        plugin_name=self.meta()['name'],
+                        vulnerability_id="SEC-CODE",
+                        severity="CRITICAL",
+                        url=f"file://{full_path}",
+                        evidence=match.group(0),
+                        response_snippet="Найден хардкод секрета в исходном коде"
+                    ))
+        return results
@@ -1,5 +1,7 @@
+import asyncio
 import requests
-from typing import List
+from functools import partial
+from typing import List, Optional
 from core.base_plugin import BasePlugin, ScanContext, ScanResult
 
 class SensitiveFilesPlugin(BasePlugin):
@@ -14,53 +16,88 @@ class SensitiveFilesPlugin(BasePlugin):
             'description': 'Проверяет раскрытие чувствительной информации через robots.txt, .env и другие файлы'
         }
 
+    # Список чувствительных файлов для проверки
+    SENSITIVE_FILES = [
+        'robots.txt',
+        '.env',
+        '.git/config',
+        'backup.zip',
+        'config.json',
+        'database.sql',
+        'wp-config.php',
+        'config.php',
+        'settings.py',
+        'docker-compose.yml',
+        'README.md'
+    ]
+
+    # Сколько байт файла загружать: хватает для сниппета и поиска ключевых слов
+    PROBE_BYTES = 4096
+
     def run(self) -> List[ScanResult]:
-        results = []
-        
-        # Список чувствительных файлов для проверки
-        sensitive_files = [
-            'robots.txt',
-            '.env',
-            '.git/config',
-            'backup.zip',
-            'config.json',
-            'database.sql',
-            'wp-config.php',
-            'config.php',
-            'settings.py',
-            'docker-compose.yml',
-            'README.md'
-        ]
+        return [r for unit in self.work_units() for r in unit()]
+
+    def work_units(self):
+        """Единица работы — проверка одного файла"""
+        for file_path in self._files_in_scope():
+            yield partial(self._check_file, file_path)
+
+    def _check_file(self, file_path: str) -> List[ScanResult]:
+        url = self._file_url(file_path)
         
-        for file_path in sensitive_files:
-            url = f"{self.context.target_url.rstrip('/')}/{file_path}"
-            
-            try:
-                response = self.context.session.get(url, timeout=10)
+        try:
+            # Range-запрос: архивы и дампы не загружаются целиком ради статуса
+            response = self.context.session.probe(url, max_bytes=self.PROBE_BYTES, timeout=10)
+            result = self._analyze(file_path, url, response)
+            return [result] if result else []
                 
-                # Если файл существует и доступен
-                if response.status_code == 200:
-                    severity = self._classify_severity(file_path, response.text)
-                    
-                    # Создаем сниппет ответа (первые 200 символов)
-                    snippet = response.text[:200] + "..." if len(response.text) > 200 else response.text
-                    
-                    results.append(ScanResult(
-                        plugin_name=self.meta()['name'],
-                        vulnerability_id=f"SENSITIVE_FILE_{file_path.replace('.', '_').upper()}",
-                        severity=severity,
-                        url=url,
-                        evidence=f"Обнаружен чувствительный файл: {file_path}",
-                        response_snippet=snippet
-                    ))
-                    
-                    self.context.log(f"Обнаружен чувствительный файл: {file_path}")
-                    
-            except requests.RequestException as e:
+        except requests.RequestException as e:
+            self.context.log(f"Ошибка при проверке {url}: {e}")
+            return []
+
+    async def run_async(self) -> List[ScanResult]:
+        """Проверяет все файлы одновременно через context.async_http"""
+        if self.context.async_http is None:
+            return await super().run_async()
+
+        async def probe(file_path: str):
+            url = self._file_url(file_path)
+            try:
+                response = await self.context.async_http.probe(url, max_bytes=self.PROBE_BYTES, timeout=10)
+                return self._analyze(file_path, url, response)
+            except Exception as e:
                 self.context.log(f"Ошибка при проверке {url}: {e}")
-                continue
+                return None
+
+        checked = await asyncio.gather(*(probe(f) for f in self._files_in_scope()))
+        return [r for r in checked if r]
+
+    def _files_in_scope(self) -> List[str]:
+        return [f for f in self.SENSITIVE_FILES if self.context.scope.allows(self._file_url(f))]
+
+    def _file_url(self, file_path: str) -> str:
+        return f"{self.context.target_url.rstrip('/')}/{file_path}"
+
+    def _analyze(self, file_path: str, url: str, response) -> Optional[ScanResult]:
+        """Формирует результат, если файл существует и доступен"""
+        # 206 — сервер поддерживает Range и вернул начало файла
+        if response.status_code not in (200, 206):
+            return None
+
+        severity = self._classify_severity(file_path, response.text)
+        
+        # Создаем сниппет ответа (первые 200 символов)
+        snippet = response.text[:200] + "..." if len(response.text) > 200 else response.text
         
-        return results
+        self.context.log(f"Обнаружен чувствительный файл: {file_path}")
+        return ScanResult(
+            plugin_name=self.meta()['name'],
+            vulnerability_id=f"SENSITIVE_FILE_{file_path.replace('.', '_').upper()}",
+            severity=severity,
+            url=url,
+            evidence=f"Обнаружен чувствительный файл: {file_path}",
+            response_snippet=snippet
+        )
 
     def _classify_severity(self, file_path: str, content: str) -> str:
         """Определяет уровень серьезности на основе типа файла и его содержимого"""
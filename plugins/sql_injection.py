@@ -1,92 +1,113 @@
 # plugins/sql_injection.py
 from core.base_plugin import BasePlugin, ScanResult, TargetForm # ДОБАВЛЕНО: TargetForm
 from typing import List, Dict, Any
-import difflib
-from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
+import threading
+from functools import partial
+from urllib.parse import urlparse, parse_qsl, urlencode, urlunparse
+from core.signatures import ERROR_SIGNATURES, SQL, describe
+from core.similarity import get_engine
 
 class SQLiHeuristicPlugin(BasePlugin):
     @classmethod
     def meta(cls): # ИСПРАВЛЕНО: meta() теперь @classmethod
-        return {"name": "SQLi Heuristic Scanner", "type": "audit", "version": "2.2"}
+        return {"name": "SQLi Heuristic Scanner", "type": "audit", "version": "3.3"}
 
     # Список пейлоадов, чтобы не определять его в run()
     SQLI_PAYLOADS = ["'", "' OR 1=1 --", '" OR 1=1 --']
     
     def run(self) -> List[ScanResult]:
-        results = []
-        
-        # 1. Сбор целей для тестирования
-        urls_to_test = list(self.context.discovered_urls)
-        if not urls_to_test:
-            urls_to_test = [self.context.target_url]
-
-        # 2. Тестирование URL-параметров (Heuristic Mode)
-        for url in urls_to_test:
-            if "=" in url:
-                vuln = self._check_url_params(url)
-                if vuln:
-                    results.append(vuln)
+        return [r for unit in self.work_units() for r in unit()]
+
+    def work_units(self):
+        """Единицы работы: один параметр URL или одно поле формы с одним пейлоадом."""
+        self._confirmed_forms = set()
+        self._lock = threading.Lock()
+        # Сравнение ответов: движок из core/similarity (параметры similarity, similarity_threshold)
+        self._similarity = get_engine(self.context.config.get("similarity"),
+                                      self.context.config.get("similarity_threshold"))
+
+        # 1-2. Тестирование URL-параметров (Heuristic Mode) по мере их обнаружения;
+        # из однотипных URL проверяются только представители шаблона
+        urls_seen = 0
+        for url in self.context.discovered_urls.stream():
+            urls_seen += 1
+            if "=" in url and self.context.scope.allows(url) and self.context.url_templates.admit(url):
+                yield from self._url_units(url)
+
+        # Если Discovery ничего не нашло, проверяем сам target_url
+        if not urls_seen and "=" in self.context.target_url:
+            yield from self._url_units(self.context.target_url)
         
         # 3. Тестирование Форм (Payload Mode)
-        for form in self.context.discovered_forms:
-            # ИСПРАВЛЕНО: Передаем определенный список пейлоадов
-            results.extend(self._check_form(form, self.SQLI_PAYLOADS))
-            
-        return results
+        for form in self.context.discovered_forms.stream():
+            if not self.context.scope.allows(form.get_full_url(self.context.target_url)):
+                continue
+            for input_field in form.inputs:
+                if input_field.type not in ['text', 'search', 'password', 'textarea']:
+                    continue
+                for payload in self.SQLI_PAYLOADS:
+                    yield partial(self._check_form_input, form, input_field, payload)
+
+    def _url_units(self, url: str):
+        """
+        План инъекций для URL: каждый параметр проверяется всеми пейлоадами.
+        Единица работы — один параметр (параметры и URL проверяются параллельно),
+        пейлоады идут по порядку до первой находки.
+        """
+        params = dict.fromkeys(name for name, _ in parse_qsl(urlparse(url).query, keep_blank_values=True))
+        for param in params:
+            yield partial(self._check_url_param, url, param)
 
-    def _inject_url(self, url: str, payload: str) -> str:
-        """Вставляет пейлоад в каждый параметр URL по очереди."""
+    def _check_url_param(self, url: str, param: str) -> List[ScanResult]:
+        for payload in self.SQLI_PAYLOADS:
+            vuln = self._probe_url_param(url, param, payload)
+            if vuln:
+                return [vuln]  # Параметр уязвим — остальные пейлоады не отправляем
+        return []
+
+    def _inject_param(self, url: str, param: str, payload: str) -> tuple:
+        """Дописывает пейлоад к значению параметра param; возвращает (URL, новое значение)"""
         parsed_url = urlparse(url)
-        query_params = parse_qs(parsed_url.query)
-        
-        for key in query_params:
-            # Создаем новый набор параметров для инъекции
-            temp_params = query_params.copy()
-            # Вставляем пейлоад в первое значение параметра
-            temp_params[key] = [temp_params[key][0] + payload]
-            
-            # Собираем URL обратно
-            injected_query = urlencode(temp_params, doseq=True)
-            return urlunparse(parsed_url._replace(query=injected_query))
-        return url # Если параметров не было, возвращаем оригинал
+        query_params = parse_qsl(parsed_url.query, keep_blank_values=True)
+        for i, (name, value) in enumerate(query_params):
+            if name == param:
+                query_params[i] = (name, value + payload)
+                injected_query = urlencode(query_params)
+                return urlunparse(parsed_url._replace(query=injected_query)), value + payload
+        return url, None
 
-    def _check_url_params(self, url: str) -> ScanResult | None:
-        """Тестирует URL-параметры методом эвристики и сравнения."""
-        
-        # 1. Запрос "Нормальный"
-        try:
-            original_resp = self.context.session.get(url, timeout=5)
-        except Exception:
+    def _probe_url_param(self, url: str, param: str, payload: str) -> ScanResult | None:
+        """Тестирует один параметр URL одним пейлоадом методом эвристики и сравнения."""
+        injected_url, injected_value = self._inject_param(url, param, payload)
+        if injected_value is None:
             return None
 
-        # Пейлоад для "ломающего" запроса
-        test_payload = "'" # Одинарная кавычка
-        
-        # 2. Запрос "Ломающий"
-        injected_url = self._inject_url(url, test_payload)
-        
-        # Если URL остался тем же (нет параметров), пропускаем
-        if injected_url == url:
+        # 1. Ответ "Нормальный" (общий исходный ответ URL) и "Ломающий"
+        baseline = self.context.baselines.for_url(url)
+        if baseline is None:
             return None
-            
         try:
             injected_resp = self.context.session.get(injected_url, timeout=5)
         except Exception:
             return None
 
-        # 3. Анализ
-        matcher = difflib.SequenceMatcher(None, original_resp.text, injected_resp.text)
-        similarity = matcher.ratio()
+        # 2. Анализ: динамический контент и отражение пейлоада не считаются отличием
+        differs, similarity = baseline.differs(self._similarity, injected_resp.text, ignore=[injected_value])
 
-        # Расширенный список ошибок (добавлены SQLite и кастомные)
-        errors = [
-            "SQL syntax", "mysql_fetch", "ORA-", "SQL_SYNTAX_ERROR", "sqlite3.OperationalError", "near '"
-        ]
+        # Сигнатуры ошибок (один проход по телу); ошибка, которая есть и в исходном
+        # ответе, не вызвана пейлоадом
+        errors = baseline.new_errors(ERROR_SIGNATURES.find_all(injected_resp.text))
+        sql_errors = [m for m in errors if m.signature.category == SQL]
+        is_confirmed = bool(sql_errors)
         
-        is_confirmed = any(err in injected_resp.text for err in errors)
-        
-        # Если ответы сильно отличаются ИЛИ найдена явная ошибка
-        if similarity < 0.95 or is_confirmed:
+        # Без ошибки СУБД отличие считается находкой, только если его не дает и безобидное
+        # значение той же длины (длинный ввод сам по себе может менять ответ)
+        if (differs or errors) and not is_confirmed:
+            if not self._differs_from_control(url, param, payload, baseline, injected_resp.text, injected_value):
+                return None
+
+        # Если ответы сильно отличаются, найдена явная ошибка СУБД или появилась трассировка стека
+        if differs or errors:
             
             severity = "CRITICAL" if is_confirmed else "MEDIUM"
             
@@ -95,56 +116,71 @@ class SQLiHeuristicPlugin(BasePlugin):
                 vulnerability_id="SQLI-HEUR",
                 severity=severity,
                 url=injected_url,
-                evidence=f"Similarity: {similarity:.2f}. Confirmed: {is_confirmed}",
-                response_snippet=f"Original Status: {original_resp.status_code}, Injected Status: {injected_resp.status_code}"
+                evidence=f"Param: {param}, Payload: {payload}. Similarity: {similarity:.2f}. Confirmed: {is_confirmed}"
+                         + (f". Signature: {describe((sql_errors or errors)[0])}" if errors else ""),
+                response_snippet=f"Original Status: {baseline.status_code}, Injected Status: {injected_resp.status_code}"
             )
         return None
 
-    def _check_form(self, form: TargetForm, payloads: List[str]) -> List[ScanResult]:
-        """Тестирует все текстовые поля одной формы на SQLi."""
-        form_results = []
+    def _differs_from_control(self, url: str, param: str, payload: str, baseline,
+                              injected_text: str, injected_value: str) -> bool:
+        """Ответ на пейлоад отличается и от ответа на контрольное значение той же длины"""
+        control_url, control_value = self._inject_param(url, param, "a" * len(payload))
+        try:
+            control_resp = self.context.session.get(control_url, timeout=5)
+        except Exception:
+            return False
+        if baseline.new_errors(ERROR_SIGNATURES.find_all(injected_text)) and \
+                not baseline.new_errors(ERROR_SIGNATURES.find_all(control_resp.text)):
+            return True
+        differs, _ = self._similarity.differs(baseline.mask(control_resp.text, [control_value]),
+                                              baseline.mask(injected_text, [injected_value]))
+        return differs
+
+    def _check_form_input(self, form: TargetForm, input_field, payload: str) -> List[ScanResult]:
+        """Тестирует одно текстовое поле формы одним пейлоадом на SQLi."""
+        # Как только нашли одну уязвимость в форме, остальные единицы этой формы пропускаем
+        if id(form) in self._confirmed_forms:
+            return []
+
         full_url = form.get_full_url(self.context.target_url)
         
-        # Расширенный список ошибок для форм (дублируем, чтобы быть уверенными)
-        detection_strings = [
-            "SQL_SYNTAX_ERROR", 
-            "syntax error",
-            "near '",
-            "mysql_fetch", "SQL syntax" 
-        ]
-
-        for input_field in form.inputs:
-            if input_field.type not in ['text', 'search', 'password', 'textarea']:
-                continue
+        # 1. Готовим полезную нагрузку (data)
+        data = {i.name: payload if i.name == input_field.name else i.value 
+                for i in form.inputs}
+        
+        # 2. Отправляем запрос, используя корректный метод (POST/GET)
+        try:
+            if form.method == 'POST':
+                response = self.context.session.post(full_url, data=data, timeout=5)
+            else:
+                response = self.context.session.get(full_url, params=data, timeout=5)
             
-            for payload in payloads:
-                # 1. Готовим полезную нагрузку (data)
-                data = {i.name: payload if i.name == input_field.name else i.value 
-                        for i in form.inputs}
-                
-                # 2. Отправляем запрос, используя корректный метод (POST/GET)
-                try:
-                    if form.method == 'POST':
-                        response = self.context.session.post(full_url, data=data, timeout=5)
-                    else:
-                        response = self.context.session.get(full_url, params=data, timeout=5)
-                    
-                    # 3. АНАЛИЗ ОТВЕТА
-                    if any(s in response.text for s in detection_strings):
-                        form_results.append(
-                            ScanResult(
-                                plugin_name=self.meta()['name'],
-                                vulnerability_id="SQLI-FORM-001",
-                                severity="CRITICAL",
-                                url=full_url,
-                                evidence=f"Payload '{payload[:10]}...' injected into field: {input_field.name}",
-                                response_snippet=response.text[:200]
-                            )
-                        )
-                        # Как только нашли одну уязвимость в форме, останавливаемся
-                        return form_results 
-                
-                except Exception as e:
-                    self.context.log(f"SQLi Form error at {full_url}: {e}")
+            # 3. АНАЛИЗ ОТВЕТА
+            found = [m for m in ERROR_SIGNATURES.find_all(response.text) if m.signature.category == SQL]
+            if found:
+                # Исходный ответ формы запрашивается, только если есть что с ним сверить
+                baseline = self.context.baselines.for_form(form, self.context.target_url)
+                if baseline is not None:
+                    found = baseline.new_errors(found)
+            if found:
+                with self._lock:
+                    if id(form) in self._confirmed_forms:
+                        return []
+                    self._confirmed_forms.add(id(form))
+                return [
+                    ScanResult(
+                        plugin_name=self.meta()['name'],
+                        vulnerability_id="SQLI-FORM-001",
+                        severity="CRITICAL",
+                        url=full_url,
+                        evidence=f"Payload '{payload[:10]}...' injected into field: {input_field.name}. "
+                                 f"Signature: {describe(found[0])}",
+                        response_snippet=response.text[:200]
+                    )
+                ]
+        
+        except Exception as e:
+            self.context.log(f"SQLi Form error at {full_url}: {e}")
                     
-        return form_results
\ No newline at end of file
+        return []
@@ -1,7 +1,7 @@
-import os
 import re
-from typing import List
+from typing import List, Optional
 from core.base_plugin import BasePlugin, ScanContext, ScanResult
+from core.source_tree import SourceTree
 
 class SQLInjectionStaticPlugin(BasePlugin):
     """Whitebox плагин для поиска потенциальных SQL инъекций в исходном коде"""
@@ -15,85 +15,73 @@ class SQLInjectionStaticPlugin(BasePlugin):
             'description': 'Ищет потенциальные SQL инъекции через конкатенацию строк в запросах'
         }
 
+    # Паттерны для поиска SQL запросов с конкатенацией
+    PATTERNS = {
+        'PYTHON': [
+            r'cursor\.execute\s*\(\s*["\'][^"\']*["\']\s*\+\s*[^)]+\)',
+            r'cursor\.execute\s*\(\s*f["\'][^"\']*\{[^}]+\}',
+            r'execute\s*\(\s*["\'][^"\']*\%s[^"\']*["\']\s*\%',
+            r'%\([^)]+\)s.*\%.*dict'
+        ],
+        'PHP': [
+            r'mysql_query\s*\(\s*["\'][^"\']*["\']\s*\.\s*\$.+\)',
+            r'mysqli_query\s*\(\s*["\'][^"\']*["\']\s*\.\s*\$.+\)',
+            r'query\s*\(\s*["\'][^"\']*["\']\s*\.\s*\$.+\)',
+            r'prepare\s*\(\s*["\'][^"\']*["\']\s*\.\s*\$.+\)'
+        ],
+        'JAVA': [
+            r'Statement\.executeQuery\s*\(\s*["\'][^"\']*["\']\s*\+\s*[^)]+\)',
+            r'executeQuery\s*\(\s*["\'][^"\']*["\']\s*\+\s*[^)]+\)',
+            r'createStatement\s*\(\s*\).*executeQuery\s*\(\s*["\'][^"\']*["\']\s*\+\s*'
+        ]
+    }
+
     def run(self) -> List[ScanResult]:
-        results = []
-        source_path = self.context.config.get("local_source_path")
-        
-        if not source_path or not os.path.exists(source_path):
+        files = self.source_files()
+        if files is None:
             self.context.log("Путь к исходному коду не указан или не существует")
-            return results
+            return []
+        return self.scan_files(files)
 
-        # Паттерны для поиска SQL запросов с конкатенацией
-        sql_patterns = {
-            'PYTHON': [
-                r'cursor\.execute\s*\(\s*["\'][^"\']*["\']\s*\+\s*[^)]+\)',
-                r'cursor\.execute\s*\(\s*f["\'][^"\']*\{[^}]+\}',
-                r'execute\s*\(\s*["\'][^"\']*\%s[^"\']*["\']\s*\%',
-                r'%\([^)]+\)s.*\%.*dict'
-            ],
-            'PHP': [
-                r'mysql_query\s*\(\s*["\'][^"\']*["\']\s*\.\s*\$.+\)',
-                r'mysqli_query\s*\(\s*["\'][^"\']*["\']\s*\.\s*\$.+\)',
-                r'query\s*\(\s*["\'][^"\']*["\']\s*\.\s*\$.+\)',
-                r'prepare\s*\(\s*["\'][^"\']*["\']\s*\.\s*\$.+\)'
-            ],
-            'JAVA': [
-                r'Statement\.executeQuery\s*\(\s*["\'][^"\']*["\']\s*\+\s*[^)]+\)',
-                r'executeQuery\s*\(\s*["\'][^"\']*["\']\s*\+\s*[^)]+\)',
-                r'createStatement\s*\(\s*\).*executeQuery\s*\(\s*["\'][^"\']*["\']\s*\+\s*'
-            ]
-        }
-
-        for root, dirs, files in os.walk(source_path):
-            dirs[:] = [d for d in dirs if d not in ['.git', 'node_modules', '__pycache__']]
-            
-            for file in files:
-                file_path = os.path.join(root, file)
-                file_ext = os.path.splitext(file)[1].lower()
-                
-                language = self._detect_language(file_ext)
-                if language in sql_patterns:
-                    results.extend(self._scan_file(file_path, language, sql_patterns[language]))
+    def source_files(self) -> Optional[List[str]]:
+        tree = self.context.source_tree
+        if tree is None:
+            return None
+        return [f.path for f in tree.files if f.language in self.PATTERNS]
 
+    def scan_files(self, file_paths: List[str]) -> List[ScanResult]:
+        results = []
+        for file_path in file_paths:
+            language = SourceTree.detect_language(file_path)
+            results.extend(self._scan_file(file_path, language, self.PATTERNS[language]))
         return results
 
-    def _detect_language(self, file_ext: str) -> str:
-        """Определяет язык программирования по расширению файла"""
-        extension_map = {
-            '.py': 'PYTHON',
-            '.php': 'PHP',
-            '.java': 'JAVA',
-            '.js': 'JAVASCRIPT'
-        }
-        return extension_map.get(file_ext, 'UNKNOWN')
-
     def _scan_file(self, file_path: str, language: str, patterns: list) -> List[ScanResult]:
         """Сканирует файл на наличие потенциальных SQL инъекций"""
         results = []
         
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-                lines = content.split('\n')
-                
-                for line_num, line in enumerate(lines, 1):
-                    for pattern in patterns:
-                        matches = re.finditer(pattern, line, re.IGNORECASE)
-                        for match in matches:
-                            if self._is_commented(line, language):
-                                continue
-                                
-                            sql_code = match.group(0)
-                            
-                            results.append(ScanResult(
-                                plugin_name=self.meta()['name'],
-                                vulnerability_id=f"POTENTIAL_SQLI_{language}",
-                                severity="HIGH",
-                                url=file_path,
-                                evidence=f"Потенциальная SQL инъекция: {sql_code[:100]}...",
-                                response_snippet=f"Строка {line_num}: {line.strip()}"
-                            ))
+            content = self.context.source_tree.read_text(file_path)
+            lines = content.split('\n')
+            
+            for line_num, line in enumerate(lines, 1):
+                for pattern in patterns:
+                    matches = re.finditer(pattern, line, re.IGNORECASE)
+                    for match in matches:
+                        if self._is_commented(line, language):
+                            continue
                             
+                        sql_code = match.group(0)
+                        
+                        results.append(ScanResult(
+                            plugin_name=self.meta()['name'],
+                            vulnerability_id=f"POTENTIAL_SQLI_{language}",
+                            severity="HIGH",
+                            url=file_path,
+                            evidence=f"Потенциальная SQL инъекция: {sql_code[:100]}...",
+                            response_snippet=f"Строка {line_num}: {line.strip()}"
+                        ))
+                        
         except Exception as e:
             self.context.log(f"Ошибка чтения файла {file_path}: {e}")
             
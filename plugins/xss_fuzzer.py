@@ -1,50 +1,77 @@
 # plugins/xss_fuzzer.py
+import threading
+from functools import partial
 from core.base_plugin import BasePlugin, ScanResult
 from typing import List
 
 class XSSFuzzerPlugin(BasePlugin):
     @classmethod
     def meta(self):
-        return {"name": "Basic XSS Fuzzer", "type": "audit", "version": "1.0"}
+        return {"name": "Basic XSS Fuzzer", "type": "audit", "version": "1.1"}
+
+    XSS_PAYLOAD = "<script>alert(1)</script>" # Простой, но легко детектируемый пейлоад
 
     def run(self) -> List[ScanResult]:
-        results = []
-        xss_payload = "<script>alert(1)</script>" # Простой, но легко детектируемый пейлоад
-        
-        if not self.context.discovered_forms:
-            self.context.log("Audit: Формы не найдены, XSS Fuzzer пропускается.")
-            return []
+        return [r for unit in self.work_units() for r in unit()]
+
+    def work_units(self):
+        """Единица работы — одно текстовое поле одной формы."""
+        self._confirmed_forms = set()
+        self._lock = threading.Lock()
 
-        for target_form in self.context.discovered_forms:
-            full_url = target_form.get_full_url(self.context.target_url)
-            
-            # --- Логика фаззинга ---
+        forms_seen = 0
+        for target_form in self.context.discovered_forms.stream():
+            forms_seen += 1
+            if not self.context.scope.allows(target_form.get_full_url(self.context.target_url)):
+                continue
             for field in target_form.inputs:
                 if field.type in ['text', 'textarea', 'search']:
-                    # Создаем данные для отправки, вставляя пейлоад в одно поле
-                    post_data = {i.name: xss_payload if i.name == field.name else i.value 
-                                 for i in target_form.inputs}
-                    
-                    try:
-                        if target_form.method == 'POST':
-                            response = self.context.session.post(full_url, data=post_data)
-                        else:
-                            response = self.context.session.get(full_url, params=post_data)
-                        
-                        # --- Детектирование ---
-                        # Если наш пейлоад вернулся в ответе без кодирования, это XSS
-                        if xss_payload in response.text:
-                            results.append(ScanResult(
-                                plugin_name=self.meta()['name'],
-                                vulnerability_id="XSS-REFLECT-001",
-                                severity="HIGH",
-                                url=full_url,
-                                evidence=f"Payload {xss_payload} отражен в поле {field.name}",
-                                response_snippet=f"Form Action: {target_form.action_url}"
-                            ))
-                            break # Нашли XSS, идем к следующей форме
-                    
-                    except Exception as e:
-                        self.context.log(f"XSS Fuzzer error on {full_url}: {e}")
-                
-        return results
\ No newline at end of file
+                    yield partial(self._fuzz_field, target_form, field)
+
+        if not forms_seen:
+            self.context.log("Audit: Формы не найдены, XSS Fuzzer пропускается.")
+
+    def _fuzz_field(self, target_form, field) -> List[ScanResult]:
+        # Нашли XSS в этой форме — остальные поля не проверяем
+        if id(target_form) in self._confirmed_forms:
+            return []
+
+        xss_payload = self.XSS_PAYLOAD
+        full_url = target_form.get_full_url(self.context.target_url)
+
+        # --- Логика фаззинга ---
+        # Создаем данные для отправки, вставляя пейлоад в одно поле
+        post_data = {i.name: xss_payload if i.name == field.name else i.value
+                     for i in target_form.inputs}
+
+        try:
+            if target_form.method == 'POST':
+                response = self.context.session.post(full_url, data=post_data)
+            else:
+                response = self.context.session.get(full_url, params=post_data)
+
+            # --- Детектирование ---
+            # Если наш пейлоад вернулся в ответе без кодирования, это XSS
+            if xss_payload in response.text and not self._in_baseline(target_form, xss_payload):
+                with self._lock:
+                    if id(target_form) in self._confirmed_forms:
+                        return []
+                    self._confirmed_forms.add(id(target_form)) # Нашли XSS, идем к следующей форме
+                return [ScanResult(
+                    plugin_name=self.meta()['name'],
+                    vulnerability_id="XSS-REFLECT-001",
+                    severity="HIGH",
+                    url=full_url,
+                    evidence=f"Payload {xss_payload} отражен в поле {field.name}",
+                    response_snippet=f"Form Action: {target_form.action_url}"
+                )]
+
+        except Exception as e:
+            self.context.log(f"XSS Fuzzer error on {full_url}: {e}")
+
+        return []
+
+    def _in_baseline(self, target_form, payload: str) -> bool:
+        """Пейлоад есть и в исходном ответе формы (например, сохранен ранее) — это не отражение"""
+        baseline = self.context.baselines.for_form(target_form, self.context.target_url)
+        return baseline is not None and payload in baseline.text
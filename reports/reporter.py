@@ -154,12 +154,17 @@ class PdfReporter(FPDF):
 
 class ReportGenerator:
     @staticmethod
-    def save_json(results: List[ScanResult], filename: str):
+    def save_json(results: List[ScanResult], filename: str, stats=None):
         data = {
             "scan_date": datetime.now().isoformat(),
             "tool": "SightSec",
             "results": [asdict(r) for r in results]
         }
+        # Статистика производительности: явно переданная или из ScanResultList движка
+        if stats is None:
+            stats = getattr(results, "stats", None)
+        if stats is not None:
+            data["stats"] = stats.to_dict() if hasattr(stats, "to_dict") else stats
         with open(filename, "w", encoding="utf-8") as f:
             json.dump(data, f, indent=4, ensure_ascii=False)
         print(f"[+] JSON report saved: {filename}")